@@ -1,13 +1,39 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-import requests
-from rdflib import Graph, Namespace
+import re
+import json
+import logging
+import time
+from rdflib import Namespace
 import os
 from dotenv import load_dotenv
+from intent_parser import FOLLOW_UP_WORDS, follow_up_text, parse_intent, parse_refinement, residual_text
+from market_index import MarketIndex
+from market_sql import build_market_batch_sql, build_market_sql, market_keyword_for, market_row
+from spec_rules import derive as derive_specs
+import sparql_queries
+import kg_snapshot
+import prompt_builder
+from kg_loader import KGReloader, load_knowledge_graph
+from response_cache import ResponseCache, facts_fingerprint, make_key as make_cache_key
+from session_store import Session, SessionStore, merge_constraints, narrows, refine_facts
+from singleflight import SingleFlight
+from groq_client import CircuitBreaker, CircuitOpenError, GroqClient
+import metrics
+from metrics import (STAGE_SECONDS, REQUEST_SECONDS, KG_CANDIDATES, MARKET_ROWS,
+                     FACTS_FUSED, FACTS_SELECTED, RESPONSE_CACHE, GROQ_ERRORS, FUZZY_MATCHES,
+                     PROMPT_TOKENS, FACTS_OVER_BUDGET, GROQ_TOKENS, SESSION_TURNS, COALESCED_CALLS)
 
 # Load environment variables from .env file
 load_dotenv(override=True)
 
+# Logging berlevel (LOG_LEVEL=DEBUG untuk detail per request, default INFO)
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+log = logging.getLogger("gadgetbot")
+
 # --- KONFIGURASI ---
 app = Flask(__name__)
 CORS(app) # Izinkan Frontend Next.js akses kesini
@@ -17,27 +43,88 @@ GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "")
 
 # Debug print to verify key loading
 if GROQ_API_KEY.startswith("gsk_"):
-    print(f"✅ GROQ_API_KEY loaded: {GROQ_API_KEY[:6]}...******")
+    log.info("✅ GROQ_API_KEY loaded: %s...******", GROQ_API_KEY[:6])
 else:
-    print(f"⚠️ GROQ_API_KEY NOT LOADED CORRECTLY: '{GROQ_API_KEY}'") 
+    log.warning("⚠️ GROQ_API_KEY NOT LOADED CORRECTLY: '%s'", GROQ_API_KEY)
+
+# Endpoint Groq (bisa diarahkan ke fake server lokal untuk testing)
+GROQ_API_URL = os.environ.get("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+
+# HTTP client bersama ke Groq: keep-alive, timeout, retry + circuit breaker
+groq_client = GroqClient(
+    GROQ_API_URL,
+    connect_timeout=float(os.environ.get("GROQ_CONNECT_TIMEOUT", "3.05")),
+    read_timeout=float(os.environ.get("GROQ_READ_TIMEOUT", "30")),
+    max_retries=int(os.environ.get("GROQ_MAX_RETRIES", "2")),
+    pool_size=int(os.environ.get("GROQ_POOL_SIZE", "10")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get("GROQ_BREAKER_THRESHOLD", "5")),
+        reset_timeout=float(os.environ.get("GROQ_BREAKER_RESET", "30"))
+    )
+)
 
 # URL API Toko (PHP Backend) - Pastikan ini jalan!
 URL_API_HARGA = "http://localhost:8000/api_market.php"  
-FILE_RDF = "knowledge_base.ttl"
+FILE_RDF = os.environ.get("KG_TTL", "knowledge_base.ttl")
+
+FILE_KG_SNAPSHOT = os.environ.get("KG_SNAPSHOT", kg_snapshot.DEFAULT_PATH)
+
+# Katalog flat untuk gunicorn --preload (gunicorn_shared.conf.py): page tabel
+# tetap dibagi antar worker, tidak ter-copy per worker
+SHARED_CATALOG = os.environ.get("SHARED_CATALOG", "0") == "1"
 
 # Setup RDF
 EX = Namespace("http://example.org/gadget#")
-g = Graph()
-try:
-    g.parse(FILE_RDF, format="turtle")
-    print("✅ Knowledge Base Loaded!")
-except Exception as e:
-    print(f"❌ Error loading RDF: {e}")
+
+# KG aktif (immutable, lihat kg_loader.py). Request membaca `kg` sekali;
+# reloader mengganti referensinya kalau knowledge_base.ttl berubah.
+kg = load_knowledge_graph(FILE_RDF, FILE_KG_SNAPSHOT, shared=SHARED_CATALOG)
+
+def _swap_kg(new_kg):
+    global kg
+    kg = new_kg
+
+# Hot reload: cek file KG tiap KG_RELOAD_INTERVAL detik (0 = nonaktif)
+kg_reloader = KGReloader(FILE_RDF, FILE_KG_SNAPSHOT, lambda: kg, _swap_kg,
+                         interval=float(os.environ.get("KG_RELOAD_INTERVAL", "10")),
+                         shared=SHARED_CATALOG)
+kg_reloader.start()
+
+# Cache jawaban LLM (LRU + TTL), 0 entry = nonaktif
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get("RESPONSE_CACHE_SIZE", "512")),
+    ttl=float(os.environ.get("RESPONSE_CACHE_TTL", "600"))
+)
+
+# Single-flight (singleflight.py): request identik yang datang bersamaan berbagi
+# satu query listing, satu scan KG dan satu panggilan Groq
+market_flight = SingleFlight("market", COALESCED_CALLS)
+kg_flight = SingleFlight("kg", COALESCED_CALLS)
+groq_flight = SingleFlight("groq", COALESCED_CALLS)
+
+def market_flight_key(query, max_price, limit, after, per_model):
+    """Key single-flight listing (ILIKE case-insensitive, jadi query di-lowercase)"""
+    return query.strip().lower(), float(max_price or 0), limit, tuple(after) if after else None, bool(per_model)
+
+def groq_flight_key(user_message, facts, use_case_tags, cache_key):
+    """Key single-flight Groq: key response cache kalau ada (semantik sama), kalau tidak isi prompt"""
+    if cache_key is not None:
+        return cache_key
+    return user_message, facts_fingerprint(facts), tuple(use_case_tags or ())
+
+# Keyword model di pertanyaan user (dipakai smart filtering fakta)
+MODEL_KEYWORD_PATTERN = re.compile(r'\b(17|16|15|14|13|12|11|xr|xs|se|pro|max|ultra|plus)\b')
+
+# Fakta maksimal di prompt LLM, dan listing per halaman query toko (top-K)
+FACT_LIMIT = 5
+MARKET_PAGE_SIZE = int(os.environ.get("MARKET_PAGE_SIZE", "50"))
 
 # --- LOGIC SEMANTIC (MENGGANTIKAN SEMANTIC_ENGINE.PY LAMA) ---
 
-import psycopg2
-from urllib.parse import urlparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from db_pool import ConnectionPool
+from market_mirror import MarketMirror, MirrorStale
 
 # ... (Previous imports)
 
@@ -45,16 +132,51 @@ from urllib.parse import urlparse
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
 # --- DATABASE CONNECTION ---
-def get_db_connection():
+# Satu pool per proses (dibuat saat pertama dipakai, aman setelah fork gunicorn)
+DB_POOL_MIN = int(os.environ.get("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "5"))
+DB_POOL_MAX_IDLE = float(os.environ.get("DB_POOL_MAX_IDLE", "60"))
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool():
+    global _db_pool
     if not DATABASE_URL:
-        print("❌ DATABASE_URL not set!")
+        log.error("❌ DATABASE_URL not set!")
         return None
-    try:
-        conn = psycopg2.connect(DATABASE_URL)
-        return conn
-    except Exception as e:
-        print(f"❌ Database Connection Error: {e}")
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                pool = ConnectionPool(DATABASE_URL, DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT,
+                                      max_idle=DB_POOL_MAX_IDLE)
+                # Pool dibuat pertama kali di worker (setelah fork): buka DB_POOL_MIN koneksi sekarang
+                try:
+                    pool.warmup()
+                except Exception as e:
+                    log.warning("⚠️ Warmup pool DB gagal (%s), koneksi dibuka saat dipakai", e)
+                _db_pool = pool
+    return _db_pool
+
+def get_db_connection():
+    """Context manager koneksi dari pool: `with get_db_connection() as conn:`"""
+    pool = get_db_pool()
+    if pool is None:
         return None
+    return pool.connection()
+
+# --- MARKET MIRROR (opsional) ---
+# Salinan tb_market_listings di memori, refresh incremental via updated_at
+# (jalankan migrate_add_updated_at.py dulu). Aktifkan dengan MARKET_MIRROR=1.
+market_mirror = None
+if DATABASE_URL and os.environ.get("MARKET_MIRROR", "0") == "1":
+    market_mirror = MarketMirror(
+        get_db_connection,
+        refresh_interval=float(os.environ.get("MARKET_MIRROR_REFRESH", "60")),
+        max_age=float(os.environ.get("MARKET_MIRROR_MAX_AGE", "300")),
+        full_reload_interval=float(os.environ.get("MARKET_MIRROR_FULL_RELOAD", "3600"))
+    )
 
 # --- LOGIC SEMANTIC ---
 
@@ -62,296 +184,356 @@ def get_db_connection():
 
 # --- LOGIC SEMANTIC ---
 
-def get_market_prices(query="", max_price=0):
+def get_market_prices(query="", max_price=0, limit=None, after=None, per_model=False):
     """
     Mengambil data harga real-time dari PostgreSQL.
     - query: filter berdasarkan nama produk/toko (ILIKE)
     - max_price: filter berdasarkan harga maksimal (untuk search budget-only)
+    - limit / after / per_model: top-K, keyset pagination, termurah per model
+      (lihat market_sql.build_market_sql)
     """
+    with STAGE_SECONDS.time("db"):
+        # Request bersamaan dengan lookup sama menunggu satu query (hasil dipakai bersama, read-only)
+        products = market_flight.do(market_flight_key(query, max_price, limit, after, per_model),
+                                    _get_market_prices, query, max_price, limit, after, per_model)
+    return products
+
+def _get_market_prices(query, max_price, limit, after, per_model):
     products = []
     
-    print(f"DEBUG: Connecting to PostgreSQL... (query='{query}', max_price={max_price})")
-    conn = get_db_connection()
-    if not conn:
-        print("❌ DEBUG: Failed to connect to DB")
+    if market_mirror is not None:
+        try:
+            products = market_mirror.query(query, max_price, limit, after, per_model)
+            MARKET_ROWS.inc("mirror", amount=len(products))
+            return products
+        except MirrorStale as e:
+            log.warning("⚠️ %s, fallback ke database", e)
+    
+    log.debug("Connecting to PostgreSQL... (query='%s', max_price=%s)", query, max_price)
+    db = get_db_connection()
+    if db is None:
+        log.error("❌ Failed to connect to DB")
         return []
         
     try:
-        cur = conn.cursor()
-        
-        # Build dynamic query
-        base_sql = "SELECT store_name, listing_title, price_idr, stock, item_condition FROM tb_market_listings WHERE 1=1"
-        params = []
-        
-        if query:
-            base_sql += " AND (listing_title ILIKE %s OR store_name ILIKE %s)"
-            search_term = f"%{query}%"
-            params.extend([search_term, search_term])
-            
-        if max_price > 0:
-            # Cari yang harganya di bawah budget * 1.2 (toleransi 20%)
-            base_sql += " AND price_idr <= %s"
-            params.append(max_price * 1.2)
-            
-        # Jika tidak ada filter sama sekali, batasi 50 item (diurutkan dari murah)
-        if not query and max_price == 0:
-            base_sql += " ORDER BY price_idr ASC LIMIT 50"
-        else:
-            base_sql += " ORDER BY price_idr ASC"
-            
-        print(f"DEBUG: Executing SQL: {base_sql[:100]}...")
-        cur.execute(base_sql, tuple(params))
-            
-        rows = cur.fetchall()
-        print(f"DEBUG: DB returned {len(rows)} rows")
-        
-        for row in rows:
-            products.append({
-                "store_name": row[0],
-                "listing_title": row[1],
-                "price_idr": float(row[2]),
-                "stock": int(row[3]) if row[3] is not None else 0,
-                "item_condition": row[4]
-            })
+        with db as conn, conn.cursor() as cur:
+            base_sql, params = build_market_sql(query, max_price, limit, after, per_model)
+            log.debug("Executing SQL: %.100s...", base_sql)
+            cur.execute(base_sql, tuple(params))
+                
+            rows = cur.fetchall()
+            log.debug("DB returned %d rows", len(rows))
+            MARKET_ROWS.inc("db", amount=len(rows))
             
-        cur.close()
-        conn.close()
+            for row in rows:
+                products.append(market_row(row))
     except Exception as e:
-        print(f"❌ Error query database: {e}")
+        log.error("❌ Error query database: %s", e)
         
     return products
 
+def get_market_prices_batch(lookups, limit=None, per_model=False):
+    """Halaman pertama listing untuk banyak (query, max_price) sekaligus (batch, fuzzy) -> {lookup: [listing]}"""
+    result = {lookup: [] for lookup in lookups}
+    if not lookups:
+        return result
+
+    with STAGE_SECONDS.time("db"):
+        if market_mirror is not None:
+            try:
+                for query, max_price in lookups:
+                    result[(query, max_price)] = market_mirror.query(query, max_price, limit, None, per_model)
+                MARKET_ROWS.inc("mirror", amount=sum(len(rows) for rows in result.values()))
+                return result
+            except MirrorStale as e:
+                log.warning("⚠️ %s, fallback ke database", e)
+                result = {lookup: [] for lookup in lookups}
+
+        db = get_db_connection()
+        if db is None:
+            log.error("❌ Failed to connect to DB")
+            return result
+
+        try:
+            # Satu round trip untuk semua lookup
+            with db as conn, conn.cursor() as cur:
+                base_sql, params = build_market_batch_sql(lookups, limit, per_model)
+                cur.execute(base_sql, tuple(params))
+                rows = cur.fetchall()
+            MARKET_ROWS.inc("db", amount=len(rows))
+            for row in rows:
+                result[lookups[row[0]]].append(market_row(row[1:]))
+        except Exception as e:
+            log.error("❌ Error query database (batch): %s", e)
+    return result
+
 # --- LOGIC SEMANTIC: QUERY RDF ---
 def query_knowledge_graph(brand=None, min_ram=0, feature_concert=False):
     """
-    SPARQL Query yang Lebih Pintar!
+    Cari kandidat HP di Knowledge Graph.
     Bisa cari berdasarkan Brand, RAM (Gaming), atau Fitur Konser (Zoom).
+    Dijawab dari product table (index), SPARQL hanya fallback.
     """
-    print(f"DEBUG: Querying KG for brand={brand}, min_ram={min_ram}, concert={feature_concert}")
-    
-    query_str = """
-    PREFIX ex: <http://example.org/gadget#>
-    SELECT ?sku ?nama ?ram ?prosesor ?storage
-    WHERE {
-        ?hp a ex:Smartphone ;
-            ex:hasModel ?nama ;
-            ex:hasBrand ?brand ;
-            ex:hasRAM ?ram ;
-            ex:hasProcessor ?prosesor ;
-            ex:hasStorage ?storage .
-        BIND(STRAFTER(STR(?hp), "#") AS ?sku)
-    """
-    
-    # 1. Filter Brand (Regex di Property Brand)
-    if brand:
-        query_str += f'    FILTER (regex(?brand, "{brand}", "i"))\n'
-        
-    # 2. Filter Gaming (RAM Minimal)
-    if min_ram > 0:
-        query_str += f'    FILTER (?ram >= {min_ram})\n'
-        
-    # 3. Filter Konser (Cari yang namanya ada "Ultra" atau "Pro" atau "Pro Max")
-    #    Asumsi: HP embel-embel ini punya Telephoto/Zoom bagus.
-    if feature_concert:
-        query_str += f'    FILTER (regex(?nama, "Ultra|Pro|Max", "i"))\n'
-    
-    query_str += "}"
+    log.debug("Querying KG for brand=%s, min_ram=%s, concert=%s", brand, min_ram, feature_concert)
 
-    results = g.query(query_str)
-    
-    candidates = {}
-    for row in results:
-        clean_sku = str(row.sku).replace("sku_", "")
-        candidates[clean_sku] = {
-            "model": str(row.nama),
-            "ram": int(row.ram),
-            "processor": str(row.prosesor),
-            "storage": int(row.storage)
-        }
+    current = kg  # snapshot KG untuk seluruh query ini, walau reload terjadi di tengah
+    with STAGE_SECONDS.time("kg"):
+        # id(current): scan bersamaan hanya digabung untuk versi KG yang sama
+        candidates = kg_flight.do((id(current), brand, min_ram, bool(feature_concert)),
+                                  _query_candidates, current, brand, min_ram, feature_concert)
+    KG_CANDIDATES.inc(amount=len(candidates))
     return candidates
 
+def _query_candidates(current, brand, min_ram, feature_concert):
+    if current.product_table is not None:
+        return current.product_table.query(brand, min_ram, feature_concert)
+    return query_knowledge_graph_sparql(brand, min_ram, feature_concert, current.graph)
+
+def query_knowledge_graph_sparql(brand=None, min_ram=0, feature_concert=False, graph=None):
+    """
+    SPARQL Query (prepared + initBindings, lihat sparql_queries.py).
+    Dipakai kalau product table gagal dibuat.
+    """
+    return sparql_queries.query_candidates(graph if graph is not None else kg.graph, brand, min_ram, feature_concert)
+
 # --- LOGIC UTAMA: RAG CONTROLLER ---
-def get_augmented_data(user_query):
-    print(f"DEBUG: Analyzing intent for: {user_query}")
+# --- RETRIEVAL PLAN (tanpa I/O, dipakai app.py dan app_async.py) ---
+# retrieval_plan adalah generator: logic retrieval (intent, fuzzy, fusion,
+# kapan perlu sisa listing) ada di sini, I/O-nya di-yield sebagai request dan
+# hasilnya dikirim balik lewat send(). run_plan menjalankannya dengan I/O sync,
+# app_async.run_plan dengan asyncpg / thread. Request:
+#   ("prefetch", request)                  -> None (async boleh mulai request lebih awal)
+#   ("kg", (brand, min_ram, is_concert))   -> kandidat KG
+#   ("fuzzy", user_query, candidates)      -> [(sku, skor)]
+#   ("market", (query, max_price, limit, after)) -> listing termurah per model
+#   ("markets", [(query, max_price), ...]) -> listing per lookup (limit MARKET_PAGE_SIZE)
+
+def retrieval_plan(user_query, constraints=None):
+    """Plan get_augmented_data; constraints: constraint sesi (follow-up), menimpa budget / min_ram hasil parse"""
+    log.debug("Analyzing intent for: %s", user_query)
     user_query = user_query.lower()
     
     # --- 1. INTENT PARSING (Memahami Maunya User) ---
-    brand_filter = None
-    min_ram = 0
-    budget = 0
-    is_concert = False
-    is_gaming = False
-    is_affordable = False
-    use_case_tags = []  # List untuk menyimpan konteks use-case
+    # Satu pass keyword atas tabel di intent_parser.py
+    with STAGE_SECONDS.time("intent"):
+        intent = apply_constraints(parse_intent(user_query), constraints)
+    brand_filter = intent["brand"]
+    use_case_tags = intent["use_case_tags"]  # List untuk menyimpan konteks use-case
     
-    # Keyword Brand
-    if "samsung" in user_query: brand_filter = "Samsung"
-    if "iphone" in user_query or "apple" in user_query: brand_filter = "Apple"
-    if "xiaomi" in user_query or "redmi" in user_query: brand_filter = "Xiaomi"
-    if "poco" in user_query: brand_filter = "Poco"
-    if "vivo" in user_query: brand_filter = "Vivo"
-    if "oppo" in user_query: brand_filter = "OPPO"
-    if "realme" in user_query or "narzo" in user_query: brand_filter = "Realme"
-    if "infinix" in user_query: brand_filter = "Infinix"
-    if "tecno" in user_query: brand_filter = "Tecno"
-    if "itel" in user_query: brand_filter = "Itel"
-    if "nothing" in user_query: brand_filter = "Nothing"
-    if "sony" in user_query or "xperia" in user_query: brand_filter = "Sony"
-    if "huawei" in user_query: brand_filter = "Huawei"
-    if "zte" in user_query: brand_filter = "ZTE"
-    if "nokia" in user_query: brand_filter = "Nokia"
-    if "lenovo" in user_query: brand_filter = "Lenovo"
-    if "msi" in user_query: brand_filter = "MSI"
-    if "acer" in user_query: brand_filter = "Acer"
-    if "hp" in user_query and "victus" in user_query: brand_filter = "HP"
-    if "nintendo" in user_query: brand_filter = "Nintendo"
-    if "playstation" in user_query: brand_filter = "Sony"
-    if "steam" in user_query and "deck" in user_query: brand_filter = "Valve"
-    
-    # Keyword Fitur
-    if "gaming" in user_query or "game" in user_query or "pubg" in user_query or "ml" in user_query:
-        min_ram = 8 # Gaming minimal RAM 8
-        is_gaming = True
-        use_case_tags.append("🎮 Gaming")
-        
-    if "konser" in user_query or "zoom" in user_query:
-        is_concert = True # Trigger filter HP flagship (Pro/Ultra)
-        use_case_tags.append("📸 Concert Camera")
-        
-    # --- USE CASE: OJOL (Driver Ojek Online) ---
-    # Butuh: Baterai besar, harga murah, tahan lama
-    if "ojol" in user_query or "ojek" in user_query or "gojek" in user_query or "grab" in user_query or "driver" in user_query:
-        if budget == 0: budget = 3000000 # Max 3 juta
-        is_affordable = True
-        use_case_tags.append("🚴 Ojol (Baterai Awet)")
-        
-    # --- USE CASE: KULIAH (Mahasiswa) ---
-    # Butuh: Bisa multitasking, kamera lumayan, budget friendly
-    if "kuliah" in user_query or "mahasiswa" in user_query or "campus" in user_query or "pelajar" in user_query:
-        if budget == 0: budget = 4000000 # Max 4 juta
-        min_ram = 6
-        is_affordable = True
-        use_case_tags.append("📚 Kuliah/Sekolah")
-        
-    # --- USE CASE: ORANG TUA ---
-    # Butuh: Layar besar, mudah digunakan, harga terjangkau
-    if "orang tua" in user_query or "lansia" in user_query or "ibu" in user_query or "bapak" in user_query or "ortu" in user_query:
-        if budget == 0: budget = 2500000 # Max 2.5 juta
-        is_affordable = True
-        use_case_tags.append("👴 Orang Tua (User Friendly)")
-        
-    # --- USE CASE: FOTOGRAFI ---
-    if "foto" in user_query or "kamera" in user_query or "photography" in user_query or "selfie" in user_query:
-        is_concert = True # HP flagship punya kamera bagus
-        use_case_tags.append("📷 Fotografi")
-        
-    # --- USE CASE: TAHAN AIR / OUTDOOR ---
-    if "tahan air" in user_query or "waterproof" in user_query or "ip68" in user_query or "outdoor" in user_query:
-        is_concert = True # Flagship biasanya IP68
-        use_case_tags.append("💧 Tahan Air (IP Rating)")
-        
-    # --- USE CASE: VIDEO CALL / WFH ---
-    if "video call" in user_query or "zoom meeting" in user_query or "wfh" in user_query or "kerja" in user_query:
-        min_ram = 6
-        use_case_tags.append("💼 WFH/Video Call")
-        
-    # --- USE CASE: STREAMING / ENTERTAINMENT ---
-    if "streaming" in user_query or "netflix" in user_query or "youtube" in user_query or "nonton" in user_query:
-        min_ram = 4
-        use_case_tags.append("📺 Streaming")
-        
-    # --- USE CASE: BISNIS / PROFESIONAL ---
-    if "bisnis" in user_query or "profesional" in user_query or "kantor" in user_query or "meeting" in user_query:
-        min_ram = 8
-        use_case_tags.append("💼 Bisnis/Profesional")
-        
-    # --- USE CASE: ANAK-ANAK ---
-    if "anak" in user_query or "kids" in user_query:
-        if budget == 0: budget = 2000000
-        is_affordable = True
-        use_case_tags.append("👶 Untuk Anak")
-        
-    # Affordable logic (general)
-    if "murah" in user_query or "terjangkau" in user_query or "affordable" in user_query or "budget" in user_query:
-        is_affordable = True
-        if budget == 0: budget = 5000000 # Set budget implisit 5 juta jika user tidak sebut angka
-        
-    # Keyword Budget Spesifik (misal "5 juta")
-    import re
-    price_match = re.search(r'(\d+)\s*juta', user_query)
-    if price_match:
-        budget = int(price_match.group(1)) * 1000000
-    
-    print(f"🎯 INTENT: Brand={brand_filter}, Gaming={is_gaming}, Konser={is_concert}, Budget={budget}, Tags={use_case_tags}")
+    log.debug("🎯 INTENT: Brand=%s, Gaming=%s, Konser=%s, Budget=%s, Tags=%s",
+              brand_filter, intent["is_gaming"], intent["is_concert"], intent["budget"], use_case_tags)
+
+    # Halaman listing pertama hanya bergantung pada intent (async: bersamaan dengan query KG)
+    yield ("prefetch", first_page_request(intent))
 
     # --- 2. SEMANTIC SEARCH (Cari Kandidat di Otak) ---
-    candidates = query_knowledge_graph(brand_filter, min_ram, is_concert)
+    candidates = yield ("kg", (brand_filter, intent["min_ram"], intent["is_concert"]))
     
     if not candidates:
-        print("DEBUG: No candidates from KG")
-        return []
-        
-    # --- 3. MARKET CHECK (Cek Harga di Database) ---
-    # Fix Keyword Apple
-    market_keyword = brand_filter if brand_filter else ""
-    if brand_filter == "Apple": market_keyword = "iPhone"
+        log.debug("No candidates from KG")
+        return [], use_case_tags
+
+    # --- 3. FUZZY MATCH (tanpa brand: typo / singkatan nama model) ---
+    if brand_filter is None:
+        matches = yield ("fuzzy", user_query, candidates)
+        if matches:
+            pages = yield ("markets", fuzzy_lookups(candidates, matches, intent))
+            facts = fuse_fuzzy_facts(candidates, matches, pages, intent)
+            if facts:
+                return facts, use_case_tags
         
-    market_data = get_market_prices(market_keyword, max_price=budget)
-    
-    # --- 4. DATA FUSION (Gabungin Data) ---
+    # --- 3 & 4. MARKET CHECK + DATA FUSION (halaman pertama, sisanya kalau fakta belum cukup) ---
+    facts = yield from collect_facts_plan(candidates, intent, MODEL_KEYWORD_PATTERN.findall(user_query),
+                                          constraints=constraints)
+    return facts, use_case_tags
+
+def first_page_request(intent):
+    return ("market", (market_keyword_for(intent["brand"]), intent["budget"], MARKET_PAGE_SIZE, None))
+
+def collect_facts_plan(candidates, intent, model_keywords, page=None, constraints=None):
+    """
+    Ambil halaman pertama listing (termurah per model) dan fusion dengan kandidat
+    KG; kalau fakta belum cukup, SISA listing diambil dalam satu query (maksimal
+    dua query). `page` = halaman pertama kalau sudah diambil (batch). Dengan
+    constraints (sesi), hanya fakta yang lolos refine_facts yang dihitung cukup.
+    """
+    if page is None:
+        page = yield first_page_request(intent)
+    facts = fuse_facts(candidates, page, intent)
+    after = next_market_page(page, refine_facts(facts, constraints), model_keywords)
+    if after is None:
+        return facts
+    rest = yield ("market", (market_keyword_for(intent["brand"]), intent["budget"], None, after))
+    facts.extend(fuse_facts(candidates, rest, intent))
+    return facts
+
+def run_plan(plan):
+    """Jalankan plan retrieval dengan I/O sync (request berurutan, prefetch diabaikan)"""
+    result = None
+    try:
+        while True:
+            result = execute_request(plan.send(result))
+    except StopIteration as stop:
+        return stop.value
+
+def execute_request(req):
+    kind = req[0]
+    if kind == "prefetch":
+        return None
+    if kind == "kg":
+        return query_knowledge_graph(*req[1])
+    if kind == "fuzzy":
+        return fuzzy_matches([req[1]], [req[2]])[0]
+    if kind == "market":
+        query, max_price, limit, after = req[1]
+        return get_market_prices(query, max_price=max_price, limit=limit, after=after, per_model=True)
+    if kind == "markets":
+        pages = get_market_prices_batch(req[1], limit=MARKET_PAGE_SIZE, per_model=True)
+        return [pages[lookup] for lookup in req[1]]
+    raise ValueError(f"Request retrieval tidak dikenal: {kind}")
+
+def get_augmented_data(user_query, constraints=None):
+    return run_plan(retrieval_plan(user_query, constraints))
+
+def apply_constraints(intent, constraints):
+    """Intent dengan budget / min_ram dari constraint sesi (kalau ada)"""
+    for key in ("budget", "min_ram"):
+        if constraints and key in constraints:
+            intent[key] = constraints[key]
+    return intent
+
+def collect_facts(candidates, intent, model_keywords, page=None, constraints=None):
+    """collect_facts_plan dengan I/O sync"""
+    return run_plan(collect_facts_plan(candidates, intent, model_keywords, page=page, constraints=constraints))
+
+def next_market_page(page, facts, model_keywords):
+    """
+    Keyset (harga, id) untuk sisa listing sesudah halaman pertama, atau None
+    kalau listing habis atau fakta sudah cukup untuk select_facts (halaman urut
+    harga, jadi fakta termurah yang cocok keyword model sudah pasti terkumpul).
+    Sisa diambil sekali tanpa limit, bukan per halaman: tiap halaman menghitung
+    ulang window ROW_NUMBER per model dari awal (O(N^2 / halaman)).
+    """
+    if len(page) < MARKET_PAGE_SIZE:
+        return None
+    if model_keywords:
+        matching = sum(1 for f in facts if any(kw in f['model'].lower() for kw in model_keywords))
+    else:
+        matching = len(facts)
+    if matching >= FACT_LIMIT:
+        return None
+    return page[-1]["price_idr"], page[-1]["id"]
+
+def fuse_facts(candidates, market_data, intent):
+    """Gabungkan kandidat KG dengan listing toko jadi fakta (urut harga)"""
+    with STAGE_SECONDS.time("fusion"):
+        final_facts = _fuse_facts(candidates, market_data, intent)
+    FACTS_FUSED.inc(amount=len(final_facts))
+    return final_facts
+
+def _fuse_facts(candidates, market_data, intent):
+    budget = intent["budget"]
+    is_affordable = intent["is_affordable"]
     final_facts = []
+    # Tokenize judul listing sekali, lalu cari kandidat lewat inverted index
+    market_index = MarketIndex(market_data)
     
     for sku, specs in candidates.items():
         if market_data:
-            for item in market_data:
-                # Fuzzy Match (Nama Model vs Judul Listing)
-                if specs['model'].lower() in item.get('listing_title', '').lower():
-                    price = float(item.get('price_idr', 0))
-                    
-                    # Logic Filter Budget
-                    # Jika user minta "Affordable", kita tolak yang mahal (> 5jt) KECUALI dia sebut budget sendiri
-                    if is_affordable and budget == 5000000 and price > 5000000:
-                        continue
-                        
-                    # Jika user set budget spesifik
-                    if budget > 0 and price > (budget * 1.2):
-                        continue
-                        
-                    fact = {
-                        "model": specs['model'],
-                        "specs": specs,
-                        "price": price,
-                        "store": item.get('store_name'),
-                        "condition": item.get('item_condition'),
-                        "tags": []
-                    }
+            # Atribut turunan dari nama model (tabel rule bersama spec_rules.py),
+            # dihitung saat listing pertama cocok: fusion jalan per halaman listing
+            model_specs = None
+            # Fuzzy Match (Nama Model vs Judul Listing), semantik tetap substring
+            for item in market_index.match(specs['model']):
+                price = float(item.get('price_idr', 0))
+                
+                # Logic Filter Budget
+                # Jika user minta "Affordable", kita tolak yang mahal (> 5jt) KECUALI dia sebut budget sendiri
+                if is_affordable and budget == 5000000 and price > 5000000:
+                    continue
                     
-                    # Kasih Tagging biar AI tau kelebihannya
-                    if specs['ram'] >= 12: fact['tags'].append("Gaming Beast 🎮")
-                    if "Ultra" in specs['model'] or "Pro" in specs['model']: fact['tags'].append("Pro Camera 📸")
-                    if price < 3000000: fact['tags'].append("Budget Friendly 💸")
+                # Jika user set budget spesifik
+                if budget > 0 and price > (budget * 1.2):
+                    continue
                     
-                    final_facts.append(fact)
+                fact = {
+                    "model": specs['model'],
+                    "specs": specs,
+                    "price": price,
+                    "store": item.get('store_name'),
+                    "condition": item.get('item_condition'),
+                    "tags": []
+                }
+                
+                # Kasih Tagging biar AI tau kelebihannya
+                if specs['ram'] >= 12: fact['tags'].append("Gaming Beast 🎮")
+                if model_specs is None: model_specs = derive_specs(specs['model'])
+                if model_specs['pro_camera']: fact['tags'].append("Pro Camera 📸")
+                if price < 3000000: fact['tags'].append("Budget Friendly 💸")
+                
+                final_facts.append(fact)
 
     # Sort Harga (Murah ke  Mahal) biar rapi
     final_facts.sort(key=lambda x: x['price'])
     
-    return final_facts, use_case_tags
+    return final_facts
 
-def call_groq_llm(user_message, facts, use_case_tags=None):
-    """Kirim context fakta ke Groq untuk dijabarkan"""
-    
-    if not GROQ_API_KEY:
-        return "⚠️ Server Error: GROQ_API_KEY belum diset di backend."
-    
-    # --- SMART FILTERING: Prioritize products matching user query ---
-    import re
-    
+# --- FUZZY RETRIEVAL (char n-gram TF-IDF, lihat ngram_index.py) ---
+# Intent tanpa brand ("samsong a55", "ip 15 promax"): sisa teks user dicocokkan
+# ke nama model KG. Model yang cukup mirip jadi kandidat, listing-nya diambil
+# per nama model, dan fakta diurutkan menurut skor kemiripan (rerank) lalu
+# harga. Tidak ada yang cukup mirip -> jalur biasa (termurah semua brand).
+# Ambang dikalibrasi di KG bawaan (tests/test_fuzzy.py): sebutan model
+# ("ip 15 promax", "samsong a55") >= 0.24, teks lain ("yang penting awet") <= 0.13
+FUZZY_MIN_SCORE = float(os.environ.get("FUZZY_MIN_SCORE", "0.15"))
+FUZZY_TOP_K = int(os.environ.get("FUZZY_TOP_K", "5"))
+
+def fuzzy_matches(user_queries, candidates_list):
+    """Batch: per query [(sku, skor)] model termirip di antara kandidat KG-nya (skor turun)"""
+    current = kg
+    results = [[] for _ in user_queries]
+    texts = [residual_text(q) for q in user_queries]
+    todo = [i for i, text in enumerate(texts) if text and candidates_list[i]]
+    if current.text_index is None or not todo:
+        return results
+
+    with STAGE_SECONDS.time("fuzzy"):
+        # Ambil lebih dari FUZZY_TOP_K: sebagian tersaring filter RAM/konser intent
+        hits = current.text_index.search([texts[i] for i in todo], k=FUZZY_TOP_K * 10, min_score=FUZZY_MIN_SCORE)
+        skus = current.product_table.skus
+        for i, matches in zip(todo, hits):
+            candidates = candidates_list[i]
+            results[i] = [(skus[row], score) for row, score in matches if skus[row] in candidates][:FUZZY_TOP_K]
+            FUZZY_MATCHES.inc("hit" if results[i] else "miss")
+    return results
+
+def fuzzy_lookups(candidates, matches, intent):
+    """Lookup listing (nama model, budget) untuk model hasil fuzzy"""
+    return list(dict.fromkeys((candidates[sku]["model"], intent["budget"]) for sku, _ in matches))
+
+def fuse_fuzzy_facts(candidates, matches, pages, intent):
+    """Fusion listing model hasil fuzzy, urut skor kemiripan lalu harga"""
+    listings = {}
+    for page in pages:
+        for item in page:
+            listings.setdefault(item["id"], item)
+    facts = fuse_facts({sku: candidates[sku] for sku, _ in matches}, list(listings.values()), intent)
+    model_score = {}
+    for sku, score in matches:
+        model_score.setdefault(candidates[sku]["model"], score)
+    facts.sort(key=lambda f: -model_score[f["model"]])  # sort stabil: harga tetap urutan kedua
+    return facts
+
+def select_facts(user_message, facts):
+    """
+    SMART FILTERING: pilih max FACT_LIMIT fakta, prioritaskan yang cocok dengan
+    keyword model di pertanyaan user. Return (selected_facts, model_keywords).
+    """
     # Extract potential model keywords from user message (e.g., "17", "Pro", "Ultra")
     user_query_lower = user_message.lower()
     
     # Find specific model numbers (e.g., 17, 16, 15, SE)
-    model_keywords = re.findall(r'\b(17|16|15|14|13|12|11|xr|xs|se|pro|max|ultra|plus)\b', user_query_lower)
+    model_keywords = MODEL_KEYWORD_PATTERN.findall(user_query_lower)
     
     if model_keywords and facts:
         # Split into matching and non-matching products
@@ -366,132 +548,488 @@ def call_groq_llm(user_message, facts, use_case_tags=None):
             else:
                 other_facts.append(f)
         
-        # Combine: matching first, then others (up to 5 total)
-        selected_facts = matching_facts[:5]  # Take matching ones first
-        if len(selected_facts) < 5:
-            selected_facts.extend(other_facts[:5 - len(selected_facts)])
+        # Combine: matching first, then others (up to FACT_LIMIT total)
+        selected_facts = matching_facts[:FACT_LIMIT]  # Take matching ones first
+        if len(selected_facts) < FACT_LIMIT:
+            selected_facts.extend(other_facts[:FACT_LIMIT - len(selected_facts)])
         
-        print(f"🎯 Smart Filter: {len(matching_facts)} matching, showing {len(selected_facts)}")
+        log.debug("🎯 Smart Filter: %d matching, showing %d", len(matching_facts), len(selected_facts))
     else:
-        # No specific keywords, use original top 5 cheapest
-        selected_facts = facts[:5] if facts else []
+        # No specific keywords, use original top FACT_LIMIT cheapest
+        selected_facts = facts[:FACT_LIMIT] if facts else []
     
-    # Susun System Prompt dengan Data
-    system_prompt = """Kamu adalah GadgetBot, asisten penjualan HP yang cerdas dan ramah.
-Tugasmu adalah menjawab pertanyaan user BERDASARKAN data fakta yang diberikan di bawah ini.
-JANGAN mengarang spesifikasi atau harga sendiri. Gunakan HANYA data yang tersedia.
-
-DATA FAKTA (Dari Knowledge Graph & Database Toko):
-"""
-    if not selected_facts:
-        system_prompt += "Tidak ditemukan produk yang cocok dengan kriteria dalam database kami.\n"
-    else:
-        for idx, f in enumerate(selected_facts):
-            tags_str = ", ".join(f.get('tags', [])) if f.get('tags') else ""
-            system_prompt += f"""
-{idx+1}. **{f['model']}**
-   💰 Harga: Rp {f['price']:,.0f}
-   ⚙️ Spek: RAM {f['specs']['ram']}GB, Storage {f['specs']['storage']}GB, {f['specs']['processor']}
-   🏪 Toko: {f['store']} ({f['condition']})
-   🏷️ Tags: {tags_str}
-"""
-
-    # Tambahkan konteks use case jika ada
-    use_case_context = ""
-    if use_case_tags and len(use_case_tags) > 0:
-        use_case_context = f"\nKonteks Kebutuhan User: {', '.join(use_case_tags)}"
+    return selected_facts, model_keywords
+
+def llm_cache_key(user_message, facts):
+    """Key cache jawaban: intent ter-parse + sidik jari fakta yang masuk prompt"""
+    selected_facts, model_keywords = select_facts(user_message, facts)
+    return make_cache_key(parse_intent(user_message), selected_facts, model_keywords)
+
+# Budget token system prompt (estimasi, lihat prompt_builder.py); fakta ranking
+# terbawah dilepas kalau tidak muat, minimal satu fakta tetap masuk
+PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", "1000"))
+
+def build_system_prompt(selected_facts, use_case_tags=None):
+    """Susun System Prompt dengan Data -> (prompt, fakta yang masuk, estimasi token)"""
+    return prompt_builder.assemble(selected_facts, use_case_tags, kg.prompt_snippets, PROMPT_TOKEN_BUDGET)
+
+GROQ_DEGRADED_MESSAGE = "⚠️ Layanan AI sedang gangguan, silakan coba lagi sebentar lagi."
+
+def build_groq_request(user_message, facts, use_case_tags=None, stream=False):
+    """Return (headers, payload) request chat completion ke Groq"""
+    # --- SMART FILTERING: Prioritize products matching user query ---
+    with STAGE_SECONDS.time("prompt"):
+        selected_facts, _ = select_facts(user_message, facts)
+        system_prompt, prompt_facts, system_tokens = build_system_prompt(selected_facts, use_case_tags)
+    FACTS_SELECTED.inc(amount=len(prompt_facts))
+    if len(prompt_facts) < len(selected_facts):
+        FACTS_OVER_BUDGET.inc(amount=len(selected_facts) - len(prompt_facts))
+    PROMPT_TOKENS.observe(system_tokens + prompt_builder.estimate_tokens(user_message))
+    
+    headers = {
+        "Authorization": f"Bearer {GROQ_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message}
+        ],
+        "model": "llama-3.3-70b-versatile", # Correct Model
+        "temperature": 0.5
+    }
+    if stream:
+        payload["stream"] = True
+    return headers, payload
+
+def record_groq_usage(body):
+    """Token asli dari field `usage` response Groq (pembanding estimasi PROMPT_TOKENS)"""
+    usage = body.get('usage') or {}
+    for kind in ("prompt", "completion"):
+        if usage.get(f"{kind}_tokens"):
+            GROQ_TOKENS.inc(kind, amount=usage[f"{kind}_tokens"])
+
+def call_groq_llm(user_message, facts, use_case_tags=None, cache_key=None):
+    """
+    Kirim context fakta ke Groq untuk dijabarkan.
+    Kalau cache_key diberikan, jawaban sukses disimpan ke response_cache.
+    """
+    
+    if not GROQ_API_KEY:
+        return "⚠️ Server Error: GROQ_API_KEY belum diset di backend."
     
-    system_prompt += f"""
-{use_case_context}
-
-INSTRUKSI FORMAT JAWABAN:
-Jawab dengan format yang RAPI dan TERSTRUKTUR seperti contoh berikut:
-
----
-📱 **[Nama HP]**
-💰 **Harga:** Rp X,XXX,XXX
-⚙️ **Spesifikasi:**
-   • RAM: X GB
-   • Storage: X GB  
-   • Processor: [Nama Processor]
-   • Kamera: [Info Kamera jika ada]
-
-✅ **Kenapa Cocok untuk [Kebutuhan User]:**
-[Jelaskan 2-3 alasan spesifik kenapa HP ini cocok untuk kebutuhan mereka berdasarkan speknya]
-
-🏪 **Tersedia di:** [Nama Toko] ([Kondisi: Baru/Bekas])
----
-
-ATURAN PENTING:
-1. Gunakan emoji untuk mempercantik tampilan
-2. Jelaskan ALASAN kenapa HP itu cocok untuk kebutuhan user (konser, ojol, gaming, dll)
-3. Maksimal rekomendasikan 3 HP saja, pilih yang paling relevan
-4. Jika tidak ada data, minta maaf dan tawarkan pencarian lain dengan sopan
-5. Selalu sebut toko dan kondisi barang
-6. Format harga pakai titik pemisah ribuan (Rp 12.999.000)
-"""
+    # Pertanyaan identik yang sedang dijawab: tunggu jawaban yang sama, jangan panggil Groq lagi
+    return groq_flight.do(groq_flight_key(user_message, facts, use_case_tags, cache_key),
+                          _call_groq_llm, user_message, facts, use_case_tags, cache_key)
 
+def _call_groq_llm(user_message, facts, use_case_tags, cache_key):
     try:
-        url = "https://api.groq.com/openai/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
-            "model": "llama-3.3-70b-versatile", # Correct Model
-            "temperature": 0.5
-        }
+        headers, payload = build_groq_request(user_message, facts, use_case_tags)
         
-        resp = requests.post(url, json=payload, headers=headers)
+        with STAGE_SECONDS.time("groq"):
+            resp = groq_client.post(payload, headers=headers)
         if resp.status_code == 200:
-            return resp.json()['choices'][0]['message']['content']
+            body = resp.json()
+            record_groq_usage(body)
+            answer = body['choices'][0]['message']['content']
+            if cache_key is not None:
+                response_cache.set(cache_key, answer)
+            return answer
         else:
+            GROQ_ERRORS.inc(f"http_{resp.status_code}")
             return f"Error from Groq: {resp.text}"
             
+    except CircuitOpenError:
+        GROQ_ERRORS.inc("circuit_open")
+        return GROQ_DEGRADED_MESSAGE
     except Exception as e:
+        GROQ_ERRORS.inc("exception")
+        log.error("❌ Error calling Groq: %s", e)
         return f"Error calling AI: {e}"
 
+def stream_groq_llm(user_message, facts, use_case_tags=None, cache_key=None):
+    """
+    Versi streaming call_groq_llm (stream=true, format SSE OpenAI-compatible).
+    Generator yang yield potongan teks jawaban begitu token datang dari Groq.
+    """
+    if not GROQ_API_KEY:
+        yield "⚠️ Server Error: GROQ_API_KEY belum diset di backend."
+        return
+    
+    parts = []
+    try:
+        headers, payload = build_groq_request(user_message, facts, use_case_tags, stream=True)
+        
+        # Stage groq = sampai token terakhir (termasuk waktu klien membaca stream)
+        with STAGE_SECONDS.time("groq"), groq_client.post(payload, headers=headers, stream=True) as resp:
+            if resp.status_code != 200:
+                GROQ_ERRORS.inc(f"http_{resp.status_code}")
+                yield f"Error from Groq: {resp.text}"
+                return
+            
+            for line in resp.iter_lines(decode_unicode=True):
+                # Baris SSE: "data: {json}" ... "data: [DONE]"
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                if delta:
+                    parts.append(delta)
+                    yield delta
+    except CircuitOpenError:
+        GROQ_ERRORS.inc("circuit_open")
+        yield GROQ_DEGRADED_MESSAGE
+        return
+    except Exception as e:
+        GROQ_ERRORS.inc("exception")
+        log.error("❌ Error calling Groq (stream): %s", e)
+        yield f"Error calling AI: {e}"
+        return
+    
+    if cache_key is not None and parts:
+        response_cache.set(cache_key, "".join(parts))
+
+def sse_event(event, data):
+    """Format satu event Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# --- BATCH CHAT ---
+# /chat/batch: intent di-parse semua dulu, intent identik cukup di-retrieve
+# sekali, lookup KG/listing dikelompokkan, lalu panggilan LLM paralel terbatas.
+
+BATCH_MAX_MESSAGES = int(os.environ.get("BATCH_MAX_MESSAGES", "500"))
+BATCH_LLM_CONCURRENCY = int(os.environ.get("BATCH_LLM_CONCURRENCY", "8"))
+
+def retrieval_key(intent, user_query):
+    """Semua yang menentukan fakta hasil retrieval (use_case_tags tidak)"""
+    model_keywords = tuple(sorted(set(MODEL_KEYWORD_PATTERN.findall(user_query))))
+    # Tanpa brand, sisa teks ikut menentukan (pencarian model fuzzy)
+    fuzzy_text = residual_text(user_query) if intent["brand"] is None else ""
+    return (intent["brand"], intent["min_ram"], intent["is_concert"], intent["budget"],
+            intent["is_affordable"], model_keywords, fuzzy_text)
+
+def get_augmented_data_batch(messages):
+    """Versi batch get_augmented_data: return ([(facts, use_case_tags)], stats)"""
+    parsed = []
+    unique = {}
+    for message in messages:
+        user_query = message.lower()
+        with STAGE_SECONDS.time("intent"):
+            intent = parse_intent(user_query)
+        key = retrieval_key(intent, user_query)
+        unique.setdefault(key, (intent, user_query))
+        parsed.append((key, intent["use_case_tags"]))
+
+    # KG: satu query per (brand, min_ram, concert) unik
+    kg_keys = {key: (intent["brand"], intent["min_ram"], intent["is_concert"]) for key, (intent, _) in unique.items()}
+    candidates = {kg_key: query_knowledge_graph(*kg_key) for kg_key in set(kg_keys.values())}
+
+    # Fuzzy (tanpa brand): satu pencarian n-gram untuk semua teks, listing semua model dalam satu query
+    facts_by_key = {}
+    fuzzy_keys = [key for key, (intent, _) in unique.items() if intent["brand"] is None and candidates[kg_keys[key]]]
+    matches = fuzzy_matches([unique[key][1] for key in fuzzy_keys], [candidates[kg_keys[key]] for key in fuzzy_keys])
+    fuzzy_lookup = {key: fuzzy_lookups(candidates[kg_keys[key]], key_matches, unique[key][0])
+                    for key, key_matches in zip(fuzzy_keys, matches) if key_matches}
+    lookups = sorted({lookup for key_lookups in fuzzy_lookup.values() for lookup in key_lookups})
+    fuzzy_pages = get_market_prices_batch(lookups, limit=MARKET_PAGE_SIZE, per_model=True)
+    for key, key_matches in zip(fuzzy_keys, matches):
+        if key in fuzzy_lookup:
+            pages = [fuzzy_pages[lookup] for lookup in fuzzy_lookup[key]]
+            facts_by_key[key] = fuse_fuzzy_facts(candidates[kg_keys[key]], key_matches, pages, unique[key][0])
+    facts_by_key = {key: facts for key, facts in facts_by_key.items() if facts}
+
+    # Listing: halaman pertama semua (keyword, budget) unik dalam satu query
+    todo = [key for key in unique if key not in facts_by_key]
+    first_lookups = sorted({(market_keyword_for(unique[key][0]["brand"]), unique[key][0]["budget"])
+                            for key in todo if candidates[kg_keys[key]]})
+    first_pages = get_market_prices_batch(first_lookups, limit=MARKET_PAGE_SIZE, per_model=True)
+
+    for key in todo:
+        intent, _ = unique[key]
+        cands = candidates[kg_keys[key]]
+        if not cands:
+            facts_by_key[key] = []
+            continue
+        page = first_pages[(market_keyword_for(intent["brand"]), intent["budget"])]
+        facts_by_key[key] = collect_facts(cands, intent, list(key[5]), page=page)
+
+    stats = {"messages": len(messages), "unique_intents": len(unique), "kg_queries": len(candidates),
+             "market_lookups": len(lookups) + len(first_lookups), "fuzzy_matched": len(fuzzy_lookup)}
+    return [(facts_by_key[key], tags) for key, tags in parsed], stats
+
+def chat_batch(messages):
+    """Jawab banyak pesan: retrieval bersama + panggilan Groq paralel (BATCH_LLM_CONCURRENCY)"""
+    retrieved, stats = get_augmented_data_batch(messages)
+
+    # Pesan dengan key cache sama = satu jawaban (sama seperti response_cache)
+    cache_keys = []
+    answers = {}
+    pending = {}
+    for message, (facts, use_case_tags) in zip(messages, retrieved):
+        cache_key = llm_cache_key(message, facts)
+        cache_keys.append(cache_key)
+        if cache_key in answers or cache_key in pending:
+            continue
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            RESPONSE_CACHE.inc("hit")
+            answers[cache_key] = cached
+        else:
+            RESPONSE_CACHE.inc("miss")
+            pending[cache_key] = (message, facts, use_case_tags)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(BATCH_LLM_CONCURRENCY, len(pending))) as pool:
+            futures = {cache_key: pool.submit(call_groq_llm, *args, cache_key=cache_key)
+                       for cache_key, args in pending.items()}
+            for cache_key, future in futures.items():
+                answers[cache_key] = future.result()
+
+    stats.update({"llm_calls": len(pending), "cache_hits": len(answers) - len(pending)})
+    results = [{"response": answers[cache_key], "debug_facts": facts}
+               for cache_key, (facts, _) in zip(cache_keys, retrieved)]
+    return results, stats
+
+# --- SESSION (pertanyaan lanjutan, lihat session_store.py) ---
+# /chat dengan session_id: follow-up ("yang lebih murah?", "kalau yang 256GB?")
+# disaring dari fakta giliran sebelumnya kalau cukup, tanpa query KG / database lagi.
+session_store = SessionStore(
+    max_entries=int(os.environ.get("SESSION_MAX", "10000")),
+    ttl=float(os.environ.get("SESSION_TTL", "1800"))
+)
+SESSION_ID_MAX_LENGTH = 128
+
+def is_follow_up(session, intent, refinement, user_query):
+    """
+    Pesan yang hanya menyempitkan jawaban sesi: tanpa brand, tanpa use-case di
+    luar pertanyaan sesi, dan di luar frasa refinement sisa teksnya cuma kata
+    penghubung atau keyword model. "hp ojol 3 juta" sesudah "samsung galaxy 10 juta"
+    = pertanyaan baru (use-case ojol), "kalau di bawah 10 juta?" = follow-up.
+    """
+    if intent["brand"] is not None:
+        return False
+    if not set(intent["use_case_tags"]) <= set(session.intent["use_case_tags"]):
+        return False
+    # "kalau yang pro max?" -> cukup urutkan ulang fakta sesi (select_facts)
+    words = follow_up_text(user_query).split()
+    if not words and not refinement:
+        return False
+    return all(w in FOLLOW_UP_WORDS or MODEL_KEYWORD_PATTERN.fullmatch(w) for w in words)
+
+def remember_session(session_id, user_message, query, intent, constraints, facts, refined):
+    """Simpan giliran ini: fakta retrieval + intent-nya untuk follow-up berikutnya + harga yang ditampilkan"""
+    shown = tuple(f["price"] for f in select_facts(user_message, refined)[0])
+    session_store.set(session_id, Session(query, intent, facts, constraints, shown))
+
+def plan_session_turn(user_message, session_id):
+    """
+    Return (hasil, query, constraints). hasil = (facts, tags) kalau follow-up
+    terjawab dari memori sesi; kalau None, `query` harus di-retrieve dulu dengan
+    `constraints` lalu finish_session_turn. Follow-up me-retrieve ulang
+    pertanyaan sesi dengan constraint gabungan (apply_constraints), teks
+    follow-up tidak ikut jadi query.
+    """
+    session = session_store.get(session_id)
+    if session is None:
+        SESSION_TURNS.inc("new")
+        return None, user_message, {}
+
+    intent = parse_intent(user_message.lower())
+    refinement = parse_refinement(user_message)
+    if not is_follow_up(session, intent, refinement, user_message):
+        SESSION_TURNS.inc("new")
+        return None, user_message, {}
+
+    constraints = merge_constraints(session.constraints, refinement or {}, session.shown)
+    if narrows(constraints, session.intent):
+        facts = refine_facts(session.facts, constraints)
+        if facts:
+            SESSION_TURNS.inc("follow_up")
+            remember_session(session_id, user_message, session.query, session.intent, constraints,
+                             session.facts, facts)
+            return (facts, session.intent["use_case_tags"]), session.query, constraints
+    # Constraint dilonggarkan (budget naik, "lebih mahal", ...) atau tidak ada
+    # fakta sesi yang lolos: retrieval ulang pertanyaan sesi + constraint gabungan
+    SESSION_TURNS.inc("follow_up_retrieval")
+    return None, session.query, constraints
+
+def finish_session_turn(session_id, user_message, query, constraints, facts, tags):
+    """Filter hasil retrieval dengan constraint sesi dan simpan ke sesi"""
+    refined = refine_facts(facts, constraints)
+    intent = apply_constraints(parse_intent(query.lower()), constraints)
+    remember_session(session_id, user_message, query, intent, constraints, facts, refined)
+    return refined, tags
+
+def get_session_data(user_message, session_id):
+    """get_augmented_data dengan memori sesi (session_id None = tanpa sesi)"""
+    if session_id is None:
+        return get_augmented_data(user_message)
+    served, query, constraints = plan_session_turn(user_message, session_id)
+    if served is not None:
+        return served
+    facts, tags = get_augmented_data(query, constraints)
+    return finish_session_turn(session_id, user_message, query, constraints, facts, tags)
+
+def session_id_error(session_id):
+    """Pesan error kalau session_id di body tidak valid, atau None"""
+    if session_id is None:
+        return None
+    if not isinstance(session_id, str) or not session_id or len(session_id) > SESSION_ID_MAX_LENGTH:
+        return f"session_id must be a non-empty string (max {SESSION_ID_MAX_LENGTH} chars)"
+    return None
+
 # --- ROUTE API ---
 
 @app.route('/chat', methods=['POST'])
 def chat_endpoint():
     data = request.json
     user_message = data.get('message', '')
+    session_id = data.get('session_id')
     
     if not user_message:
         return jsonify({"error": "Message is empty"}), 400
+    error = session_id_error(session_id)
+    if error:
+        return jsonify({"error": error}), 400
         
-    print(f"📩 Received: {user_message}")
+    log.debug("📩 Received: %s", user_message)
     
-    # 1. Semantic Retrieval (RAG)
-    facts, use_case_tags = get_augmented_data(user_message)
-    print(f"📊 Facts Found: {len(facts)}, Tags: {use_case_tags}")
-    
-    # 2. LLM Generation
-    ai_response = call_groq_llm(user_message, facts, use_case_tags)
+    with REQUEST_SECONDS.time("/chat"):
+        # 1. Semantic Retrieval (RAG), follow-up dari memori sesi kalau ada session_id
+        facts, use_case_tags = get_session_data(user_message, session_id)
+        log.debug("📊 Facts Found: %d, Tags: %s", len(facts), use_case_tags)
+        
+        # 2. LLM Generation (skip Groq kalau intent + fakta sama sudah pernah dijawab)
+        cache_key = llm_cache_key(user_message, facts)
+        ai_response = response_cache.get(cache_key)
+        if ai_response is not None:
+            RESPONSE_CACHE.inc("hit")
+            log.debug("⚡ Response cache hit, skip Groq")
+        else:
+            RESPONSE_CACHE.inc("miss")
+            ai_response = call_groq_llm(user_message, facts, use_case_tags, cache_key=cache_key)
     
-    return jsonify({
+    result = {
         "response": ai_response,
         "debug_facts": facts # Dikirim buat debug aja kalau mau lihat
+    }
+    if session_id is not None:
+        result["session_id"] = session_id
+    return jsonify(result)
+
+@app.route('/chat/batch', methods=['POST'])
+def chat_batch_endpoint():
+    """
+    Banyak pesan sekaligus: {"messages": ["...", ...]} ->
+    {"results": [{"response", "debug_facts"}, ...] (urutan sama), "stats": {...}}
+    """
+    data = request.json or {}
+    messages = data.get('messages')
+
+    if not isinstance(messages, list) or not messages:
+        return jsonify({"error": "messages must be a non-empty list"}), 400
+    if len(messages) > BATCH_MAX_MESSAGES:
+        return jsonify({"error": f"Too many messages (max {BATCH_MAX_MESSAGES})"}), 400
+    if not all(isinstance(m, str) and m for m in messages):
+        return jsonify({"error": "Every message must be a non-empty string"}), 400
+
+    log.debug("📩 Received batch: %d messages", len(messages))
+    started = time.perf_counter()
+    with REQUEST_SECONDS.time("/chat/batch"):
+        results, stats = chat_batch(messages)
+    stats["elapsed_s"] = round(time.perf_counter() - started, 3)
+
+    return jsonify({"results": results, "stats": stats})
+
+@app.route('/chat/stream', methods=['POST'])
+def chat_stream_endpoint():
+    """
+    Sama seperti /chat tapi jawaban di-stream (Server-Sent Events):
+    event "facts" (hasil retrieval) -> event "token" (berulang) -> event "done"
+    """
+    data = request.json
+    user_message = data.get('message', '')
+    session_id = data.get('session_id')
+    
+    if not user_message:
+        return jsonify({"error": "Message is empty"}), 400
+    error = session_id_error(session_id)
+    if error:
+        return jsonify({"error": error}), 400
+        
+    log.debug("📩 Received (stream): %s", user_message)
+    started = time.perf_counter()
+    
+    # 1. Semantic Retrieval (RAG) - selesai sebelum stream dimulai
+    facts, use_case_tags = get_session_data(user_message, session_id)
+    cache_key = llm_cache_key(user_message, facts)
+    cached = response_cache.get(cache_key)
+    RESPONSE_CACHE.inc("miss" if cached is None else "hit")
+    
+    def generate():
+        try:
+            yield sse_event("facts", {"debug_facts": facts, "use_case_tags": use_case_tags})
+            
+            # 2. LLM Generation (token demi token)
+            if cached is not None:
+                log.debug("⚡ Response cache hit, skip Groq")
+                yield sse_event("token", {"content": cached})
+            else:
+                for chunk in stream_groq_llm(user_message, facts, use_case_tags, cache_key=cache_key):
+                    yield sse_event("token", {"content": chunk})
+            yield sse_event("done", {})
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - started, "/chat/stream")
+    
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no" # Matikan buffering proxy (nginx) biar token langsung sampai
     })
 
+def kg_version_info(current):
+    """Versi KG aktif + statistik hot reload (untuk health check)"""
+    return {
+        "version": current.version,
+        "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(current.loaded_at)),
+        "load_seconds": round(current.load_seconds, 3),
+        "reloader": kg_reloader.stats()
+    }
+
 @app.route('/', methods=['GET'])
 def health_check():
+    current = kg
     return jsonify({
         "status": "running",
         "service": "GadgetBot Semantic Backend",
         "endpoints": {
-            "/chat": "POST - Main Chat Interface"
+            "/chat": "POST - Main Chat Interface (session_id opsional untuk pertanyaan lanjutan)",
+            "/chat/stream": "POST - Chat Interface (Server-Sent Events)",
+            "/chat/batch": "POST - Banyak pesan sekaligus (retrieval bersama, LLM paralel)",
+            "/metrics": "GET - Metrics Prometheus (latency per stage, jumlah baris/fakta)"
         },
-        "knowledge_graph": "Loaded" if len(g) > 0 else "Empty",
-        "market_api_url": URL_API_HARGA
+        "knowledge_graph": "Loaded" if (len(current.graph) > 0 or current.product_table is not None) else "Empty",
+        "knowledge_graph_source": current.source,
+        "knowledge_graph_version": kg_version_info(current),
+        "product_table": {
+            "products": len(current.product_table) if current.product_table is not None else 0,
+            "memory": current.memory
+        },
+        "market_api_url": URL_API_HARGA,
+        "db_pool": _db_pool.stats() if _db_pool is not None else None,
+        "response_cache": response_cache.stats(),
+        "sessions": session_store.stats(),
+        "singleflight": {flight.name: flight.stats() for flight in (market_flight, kg_flight, groq_flight)},
+        "groq_client": groq_client.stats(),
+        "market_mirror": market_mirror.stats() if market_mirror is not None else None
     })
 
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 if __name__ == '__main__':
     # Jalankan server
-    print("🚀 Semantic Backend Running on http://localhost:5001")
+    log.info("🚀 Semantic Backend Running on http://localhost:5001")
     app.run(port=5001, debug=True)
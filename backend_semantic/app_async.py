@@ -0,0 +1,294 @@
+"""
+Mode async (ASGI) GadgetBot, kontrak /chat (termasuk session_id) sama dengan app.py.
+
+Logic semantic (intent, product table, plan retrieval + fusion, sesi, prompt,
+cache jawaban) dipakai langsung dari app.py; di sini hanya I/O-nya:
+- plan retrieval app.retrieval_plan dijalankan run_plan versi async
+- Postgres lewat asyncpg (pool async), bukan psycopg2
+- Groq lewat AsyncGroqClient (httpx), bukan requests
+- Query KG dan halaman listing pertama hanya bergantung pada intent, jadi
+  dijalankan bersamaan, bukan berurutan
+
+Belum didukung di mode async: /chat/stream (SSE) dan /chat/batch. Pakai
+app.py untuk keduanya.
+
+Satu worker bisa melayani banyak chat yang sedang menunggu Groq/Postgres
+tanpa thread per request.
+
+    pip install -r requirements-async.txt
+    hypercorn app_async:app --bind 0.0.0.0:5001
+"""
+import asyncio
+import logging
+import os
+import re
+import time
+from decimal import Decimal
+
+import asyncpg
+from quart import Quart, request, jsonify
+from quart_cors import cors
+
+import app as core
+import metrics
+from groq_client import AsyncGroqClient, CircuitBreaker, CircuitOpenError
+from market_mirror import MirrorStale
+from metrics import STAGE_SECONDS, REQUEST_SECONDS, MARKET_ROWS, RESPONSE_CACHE, GROQ_ERRORS, COALESCED_CALLS
+from singleflight import AsyncSingleFlight
+
+log = logging.getLogger("gadgetbot.async")
+
+app = cors(Quart(__name__))  # Izinkan Frontend Next.js akses kesini
+
+db_pool = None
+groq_client = None
+
+# Single-flight per event loop (scan KG lewat core.kg_flight, thread-safe)
+market_flight = AsyncSingleFlight("market", COALESCED_CALLS)
+groq_flight = AsyncSingleFlight("groq", COALESCED_CALLS)
+
+
+@app.before_serving
+async def startup():
+    global db_pool, groq_client
+    # Client dibuat di dalam event loop server (httpx/asyncpg terikat ke loop)
+    groq_client = AsyncGroqClient(
+        core.GROQ_API_URL,
+        connect_timeout=float(os.environ.get("GROQ_CONNECT_TIMEOUT", "3.05")),
+        read_timeout=float(os.environ.get("GROQ_READ_TIMEOUT", "30")),
+        max_retries=int(os.environ.get("GROQ_MAX_RETRIES", "2")),
+        pool_size=int(os.environ.get("GROQ_POOL_SIZE", "100")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.environ.get("GROQ_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.environ.get("GROQ_BREAKER_RESET", "30"))
+        )
+    )
+    if core.DATABASE_URL:
+        try:
+            db_pool = await asyncpg.create_pool(
+                core.DATABASE_URL, min_size=core.DB_POOL_MIN, max_size=core.DB_POOL_MAX)
+        except Exception as e:
+            log.error("❌ Error creating async DB pool: %s", e)
+
+
+@app.after_serving
+async def shutdown():
+    if groq_client is not None:
+        await groq_client.aclose()
+    if db_pool is not None:
+        await db_pool.close()
+
+
+# --- I/O ASYNC ---
+
+_PLACEHOLDER = re.compile(r"%s")
+
+
+def to_asyncpg(sql, params):
+    """SQL psycopg2 (%s) -> asyncpg ($1, $2, ...); float -> Decimal untuk kolom NUMERIC"""
+    counter = iter(range(1, len(params) + 1))
+    sql = _PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
+    params = [Decimal(str(p)) if isinstance(p, float) else p for p in params]
+    return sql, params
+
+
+async def get_market_prices(query="", max_price=0, limit=None, after=None, per_model=False):
+    """Versi async app.get_market_prices (mirror -> asyncpg)"""
+    with STAGE_SECONDS.time("db"):
+        return await market_flight.do(core.market_flight_key(query, max_price, limit, after, per_model),
+                                      _get_market_prices, query, max_price, limit, after, per_model)
+
+
+async def _get_market_prices(query, max_price, limit, after, per_model):
+    if core.market_mirror is not None:
+        try:
+            # Refresh mirror pakai koneksi sync, jangan blok event loop
+            products = await asyncio.to_thread(core.market_mirror.query, query, max_price, limit, after, per_model)
+            MARKET_ROWS.inc("mirror", amount=len(products))
+            return products
+        except MirrorStale as e:
+            log.warning("⚠️ %s, fallback ke database", e)
+
+    if db_pool is None:
+        return []
+
+    sql, params = to_asyncpg(*core.build_market_sql(query, max_price, limit, after, per_model))
+    try:
+        async with db_pool.acquire(timeout=core.DB_POOL_TIMEOUT) as conn:
+            rows = await conn.fetch(sql, *params)
+    except Exception as e:
+        log.error("❌ Error query database: %s", e)
+        return []
+    MARKET_ROWS.inc("db", amount=len(rows))
+    return [core.market_row(row) for row in rows]
+
+
+async def run_plan(plan):
+    """
+    Versi async app.run_plan: plan retrieval sama, I/O lewat asyncpg / thread.
+    Request "prefetch" langsung dimulai sebagai task (halaman listing pertama
+    jalan bersamaan dengan query KG); kalau ternyata tidak dipakai, dibatalkan.
+    """
+    prefetched = {}
+    result = None
+    try:
+        while True:
+            req = plan.send(result)
+            if req[0] == "prefetch":
+                prefetched[req[1]] = asyncio.ensure_future(execute_request(req[1]))
+                result = None
+                continue
+            task = prefetched.pop(req, None) if req[0] == "market" else None
+            result = await (task if task is not None else execute_request(req))
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        for task in prefetched.values():
+            task.cancel()
+
+
+async def execute_request(req):
+    kind = req[0]
+    if kind == "kg":
+        # Product table / SPARQL = CPU; di thread supaya loop tetap melayani request lain
+        return await asyncio.to_thread(core.query_knowledge_graph, *req[1])
+    if kind == "fuzzy":
+        return (await asyncio.to_thread(core.fuzzy_matches, [req[1]], [req[2]]))[0]
+    if kind == "market":
+        query, max_price, limit, after = req[1]
+        return await get_market_prices(query, max_price=max_price, limit=limit, after=after, per_model=True)
+    if kind == "markets":
+        # Listing per model hasil fuzzy, bersamaan
+        return await asyncio.gather(*(
+            get_market_prices(query, max_price=max_price, limit=core.MARKET_PAGE_SIZE, per_model=True)
+            for query, max_price in req[1]))
+    raise ValueError(f"Request retrieval tidak dikenal: {kind}")
+
+
+async def get_augmented_data(user_query, constraints=None):
+    """Versi async app.get_augmented_data (plan retrieval yang sama, core.retrieval_plan)"""
+    return await run_plan(core.retrieval_plan(user_query, constraints))
+
+
+async def get_session_data(user_message, session_id):
+    """Versi async app.get_session_data (memori sesi sama dengan mode sync)"""
+    if session_id is None:
+        return await get_augmented_data(user_message)
+    served, query, constraints = core.plan_session_turn(user_message, session_id)
+    if served is not None:
+        return served
+    facts, tags = await get_augmented_data(query, constraints)
+    return core.finish_session_turn(session_id, user_message, query, constraints, facts, tags)
+
+
+async def call_groq_llm(user_message, facts, use_case_tags=None, cache_key=None):
+    """Versi async app.call_groq_llm"""
+    if not core.GROQ_API_KEY:
+        return "⚠️ Server Error: GROQ_API_KEY belum diset di backend."
+
+    return await groq_flight.do(core.groq_flight_key(user_message, facts, use_case_tags, cache_key),
+                                _call_groq_llm, user_message, facts, use_case_tags, cache_key)
+
+
+async def _call_groq_llm(user_message, facts, use_case_tags, cache_key):
+    try:
+        headers, payload = core.build_groq_request(user_message, facts, use_case_tags)
+
+        with STAGE_SECONDS.time("groq"):
+            resp = await groq_client.post(payload, headers=headers)
+        if resp.status_code == 200:
+            body = resp.json()
+            core.record_groq_usage(body)
+            answer = body['choices'][0]['message']['content']
+            if cache_key is not None:
+                core.response_cache.set(cache_key, answer)
+            return answer
+        else:
+            GROQ_ERRORS.inc(f"http_{resp.status_code}")
+            return f"Error from Groq: {resp.text}"
+
+    except CircuitOpenError:
+        GROQ_ERRORS.inc("circuit_open")
+        return core.GROQ_DEGRADED_MESSAGE
+    except Exception as e:
+        GROQ_ERRORS.inc("exception")
+        log.error("❌ Error calling Groq: %s", e)
+        return f"Error calling AI: {e}"
+
+
+# --- ROUTE API ---
+
+@app.route('/chat', methods=['POST'])
+async def chat_endpoint():
+    data = await request.get_json()
+    user_message = data.get('message', '')
+    session_id = data.get('session_id')
+
+    if not user_message:
+        return jsonify({"error": "Message is empty"}), 400
+    error = core.session_id_error(session_id)
+    if error:
+        return jsonify({"error": error}), 400
+
+    started = time.perf_counter()
+
+    # 1. Semantic Retrieval (RAG), follow-up dari memori sesi kalau ada session_id
+    facts, use_case_tags = await get_session_data(user_message, session_id)
+
+    # 2. LLM Generation (skip Groq kalau intent + fakta sama sudah pernah dijawab)
+    cache_key = core.llm_cache_key(user_message, facts)
+    ai_response = core.response_cache.get(cache_key)
+    if ai_response is None:
+        RESPONSE_CACHE.inc("miss")
+        ai_response = await call_groq_llm(user_message, facts, use_case_tags, cache_key=cache_key)
+    else:
+        RESPONSE_CACHE.inc("hit")
+    REQUEST_SECONDS.observe(time.perf_counter() - started, "/chat")
+
+    result = {
+        "response": ai_response,
+        "debug_facts": facts
+    }
+    if session_id is not None:
+        result["session_id"] = session_id
+    return jsonify(result)
+
+
+@app.route('/', methods=['GET'])
+async def health_check():
+    current = core.kg
+    return jsonify({
+        "status": "running",
+        "service": "GadgetBot Semantic Backend (async)",
+        "endpoints": {
+            "/chat": "POST - Main Chat Interface",
+            "/metrics": "GET - Metrics Prometheus (latency per stage, jumlah baris/fakta)"
+        },
+        "knowledge_graph_source": current.source,
+        "knowledge_graph_version": core.kg_version_info(current),
+        "product_table": {
+            "products": len(current.product_table) if current.product_table is not None else 0,
+            "memory": current.memory
+        },
+        "db_pool": {
+            "size": db_pool.get_size(),
+            "idle": db_pool.get_idle_size(),
+            "min": db_pool.get_min_size(),
+            "max": db_pool.get_max_size(),
+        } if db_pool is not None else None,
+        "response_cache": core.response_cache.stats(),
+        "sessions": core.session_store.stats(),
+        "singleflight": {flight.name: flight.stats() for flight in (market_flight, core.kg_flight, groq_flight)},
+        "groq_client": groq_client.stats() if groq_client is not None else None,
+        "market_mirror": core.market_mirror.stats() if core.market_mirror is not None else None
+    })
+
+
+@app.route('/metrics', methods=['GET'])
+async def metrics_endpoint():
+    return metrics.REGISTRY.render(), 200, {"Content-Type": metrics.CONTENT_TYPE}
+
+
+if __name__ == '__main__':
+    log.info("🚀 Semantic Backend (async) Running on http://localhost:5001")
+    app.run(host='0.0.0.0', port=5001)
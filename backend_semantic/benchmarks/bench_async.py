@@ -0,0 +1,134 @@
+"""
+Benchmark serving mode: Flask (gunicorn sync / gthread) vs ASGI (app_async).
+
+Tiap server jalan sebagai subprocess dengan SATU worker, Groq diganti
+fake_groq_server (latency tetap), response cache dimatikan supaya setiap
+chat benar-benar menunggu LLM. Load generator closed-loop: C user
+bersamaan, masing-masing kirim /chat lagi begitu jawaban datang.
+
+Output: request/detik + p50/p99 per level concurrency, lalu throughput
+terbaik per worker yang p99-nya masih <= SLO.
+
+Jalankan dari folder backend_semantic (butuh requirements-async.txt):
+    python benchmarks/bench_async.py [durasi_detik] [slo_ms]
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CONCURRENCY = [1, 4, 16, 32, 64]
+QUERIES = ["hp gaming 5 juta", "hp ojol", "iphone 15 pro", "samsung kamera bagus buat konser"]
+
+SERVERS = {
+    "flask gunicorn sync": ["gunicorn", "-w", "1", "app:app"],
+    "flask gunicorn gthread x16": ["gunicorn", "-w", "1", "-k", "gthread", "--threads", "16", "app:app"],
+    "async hypercorn": ["hypercorn", "-w", "1", "app_async:app"],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server {url} tidak siap")
+
+
+def start(cmd, port, env):
+    bind = ["-b", f"127.0.0.1:{port}"]
+    return subprocess.Popen([sys.executable, "-m", *cmd[:1], *bind, *cmd[1:]], cwd=BASE_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def run_load(url, concurrency, duration):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def user(i, client):
+        nonlocal errors
+        n = i
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                resp = await client.post(url, json={"message": QUERIES[n % len(QUERIES)]})
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - t0)
+            except httpx.HTTPError:
+                errors += 1
+            n += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(user(i, client) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else float("nan")
+
+    return {"rps": len(latencies) / elapsed, "p50": pct(0.50), "p99": pct(0.99), "errors": errors}
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    slo_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    groq_port = free_port()
+    fake_groq = subprocess.Popen(
+        [sys.executable, "fake_groq_server.py", "--port", str(groq_port),
+         "--tokens", "10", "--token-delay", "0.01", "--first-token-delay", "0.2"],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL)
+    env = dict(os.environ,
+               GROQ_API_URL=f"http://127.0.0.1:{groq_port}/openai/v1/chat/completions",
+               GROQ_API_KEY="gsk_bench", RESPONSE_CACHE_SIZE="0", DATABASE_URL="")
+
+    print(f"Fake Groq ~300 ms/jawaban, {duration:.0f}s per level, 1 worker per server, SLO p99 <= {slo_ms:.0f} ms\n")
+    summary = {}
+    try:
+        for name, cmd in SERVERS.items():
+            port = free_port()
+            proc = start(cmd, port, env)
+            try:
+                wait_ready(f"http://127.0.0.1:{port}/")
+                print(f"▶ {name}")
+                best = 0.0
+                for c in CONCURRENCY:
+                    r = asyncio.run(run_load(f"http://127.0.0.1:{port}/chat", c, duration))
+                    ok = r["p99"] <= slo_ms
+                    if ok:
+                        best = max(best, r["rps"])
+                    print(f"   c={c:<3} {r['rps']:7.1f} req/s   p50 {r['p50']:7.0f} ms   p99 {r['p99']:7.0f} ms"
+                          f"   err {r['errors']}{'' if ok else '   (lewat SLO)'}")
+                summary[name] = best
+            finally:
+                proc.terminate()
+                proc.wait()
+    finally:
+        fake_groq.terminate()
+
+    print(f"\nThroughput per worker dengan p99 <= {slo_ms:.0f} ms:")
+    for name, rps in summary.items():
+        print(f"   {name:<28} {rps:7.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Benchmark skala katalog untuk pipeline retrieval (get_augmented_data).
+
+Untuk tiap ukuran katalog (default 1k, 10k, 100k, 1M produk):
+1. Generate baris tb_market_listings sintetis ke SQLite (stand-in Postgres:
+   SQL dari market_sql.build_market_sql dijalankan dengan ILIKE -> LIKE, %s -> ?)
+2. Bangun Knowledge Graph dari baris yang sama lewat jalur generator
+   (generate_rdf_postgres.row_product / row_triples): product table selalu,
+   file Turtle + SPARQL hanya sampai --ttl-max produk (rdflib tidak muat 1M)
+3. Jalankan korpus pertanyaan tetap, timing per stage: intent, kg, db,
+   fusion, total (+ kg_sparql kalau ada Turtle), lalu peak memory
+
+Tiap ukuran jalan di subprocess sendiri supaya angka memori tidak tercampur.
+Hasil disimpan sebagai JSON di benchmarks/results/ dan bisa dibandingkan
+dengan run sebelumnya (--compare) supaya regresi kelihatan.
+
+Jalankan dari folder backend_semantic:
+    python benchmarks/bench_catalog.py --sizes 1k,10k,100k
+    python benchmarks/bench_catalog.py --sizes 1k,10k --compare benchmarks/results/catalog-XXXX.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+
+QUERIES = [
+    "hp gaming 5 juta",
+    "hp ojol",
+    "iphone 15 pro",
+    "samsung kamera bagus buat konser",
+    "hp murah buat kuliah",
+    "xiaomi redmi note 8/256",
+    "hp buat orang tua 2 juta",
+    "rekomendasi hp 10 juta",
+]
+
+STAGES = ["intent", "kg", "db", "fusion", "total"]
+
+SERIES = [
+    "Samsung Galaxy S", "Samsung Galaxy A", "Samsung Galaxy M", "iPhone", "Xiaomi Redmi Note",
+    "Xiaomi", "Poco F", "Poco X", "OPPO Reno", "OPPO A", "Vivo V", "Vivo Y", "Infinix Note",
+    "Infinix Hot", "Realme GT", "Realme C", "Tecno Camon", "Tecno Spark", "Google Pixel", "Nothing Phone",
+]
+TIERS = ["", " Pro", " Ultra", " Plus", " Pro Max", " Lite", " 5G"]
+MEMORY = [(4, 64), (6, 128), (8, 128), (8, 256), (12, 256), (12, 512), (16, 512)]
+STORES = ["Erafone Jakarta", "iBox Official", "Toko Batam Jaya", "Digimap", "Roxy Mas Cell",
+          "Promo Gadget Official", "Surabaya Phone", "Mangga Dua Seluler"]
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    if text.endswith("m"):
+        return int(float(text[:-1]) * 1_000_000)
+    if text.endswith("k"):
+        return int(float(text[:-1]) * 1_000)
+    return int(text)
+
+
+def synthetic_rows(n, seed=42):
+    """Baris format SELECT generate_rdf_postgres (id, title, store, price, processor, ...)"""
+    from spec_rules import derive, suitable_for
+
+    rng = random.Random(seed)
+    for i in range(1, n + 1):
+        ram, storage = rng.choice(MEMORY)
+        gen = rng.randint(1, max(2, n // 40))
+        title = f"{rng.choice(SERIES)} {gen}{rng.choice(TIERS)} {ram}/{storage}GB"
+        specs = derive(title)
+        price = rng.randrange(900_000, 25_000_000, 50_000)
+        yield (i, title, rng.choice(STORES), price, specs["processor"], specs["camera_mp"],
+               specs["telephoto"], specs["refresh_rate"], ",".join(suitable_for(specs, price)),
+               rng.randint(0, 20), rng.choice(["Baru", "Bekas"]))
+
+
+class SQLiteStandIn:
+    """Koneksi SQLite yang dipakai get_market_prices seperti koneksi pool psycopg2"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return _SQLiteCursor(self.conn.cursor())
+
+
+class _SQLiteCursor:
+    def __init__(self, cur):
+        self.cur = cur
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cur.close()
+        return False
+
+    def execute(self, sql, params=()):
+        # LIKE SQLite sudah case-insensitive untuk ASCII (setara ILIKE)
+        self.cur.execute(sql.replace("ILIKE", "LIKE").replace("%s", "?"), params)
+
+    def fetchall(self):
+        return self.cur.fetchall()
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    return {"p50_ms": pct(0.50), "p90_ms": pct(0.90), "p99_ms": pct(0.99),
+            "mean_ms": statistics.fmean(ordered) * 1000, "n": len(ordered)}
+
+
+# --- WORKER (satu ukuran katalog, di subprocess) ---
+
+def run_size(n, repeat, ttl_max, seed):
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        import app
+        import generate_rdf_postgres as gen
+        import kg_loader
+        import prompt_builder
+        import sparql_queries
+        from intent_parser import parse_intent
+        from market_sql import model_key
+        from metrics import KG_CANDIDATES, MARKET_ROWS, STAGE_SECONDS
+        from product_table import ProductTable
+        from rdflib import Graph
+
+    result = {"products": n}
+    workdir = tempfile.mkdtemp(prefix="bench_catalog_")
+
+    # 1. tb_market_listings sintetis di SQLite
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(os.path.join(workdir, "market.db"), check_same_thread=False)
+    conn.execute("""
+        CREATE TABLE tb_market_listings (
+            id INTEGER PRIMARY KEY, listing_title TEXT, store_name TEXT, price_idr NUMERIC,
+            processor TEXT, camera_mp INTEGER, telephoto BOOLEAN, refresh_rate INTEGER,
+            suitable_for TEXT, stock INTEGER, item_condition TEXT)
+    """)
+    conn.executemany("INSERT INTO tb_market_listings VALUES (?,?,?,?,?,?,?,?,?,?,?)", synthetic_rows(n, seed))
+    # Pengganti kolom generated model_key Postgres (migrate_add_model_key.py)
+    conn.create_function("model_key", 1, model_key, deterministic=True)
+    conn.execute("ALTER TABLE tb_market_listings ADD COLUMN model_key TEXT")
+    conn.execute("UPDATE tb_market_listings SET model_key = model_key(listing_title)")
+    conn.execute("CREATE INDEX idx_price ON tb_market_listings (price_idr)")
+    conn.commit()
+    result["db_build_s"] = time.perf_counter() - t0
+
+    # 2. Knowledge Graph dari baris yang sama (jalur generate_rdf_postgres)
+    t0 = time.perf_counter()
+    products = {}
+    rows = conn.execute(gen.SELECT_ROWS)
+    for row in rows:
+        product = gen.row_product(row)
+        products[product["sku"]] = product
+    table = ProductTable()
+    for product in products.values():
+        table.add(**product)
+    result["kg_build_s"] = time.perf_counter() - t0
+    result["kg_products"] = len(table)
+
+    graph = None
+    if n <= ttl_max:
+        ttl_path = os.path.join(workdir, "knowledge_base.ttl")
+        with open(ttl_path, "wb") as out:
+            out.write(gen.nt_block(gen.ONTOLOGY))
+            for row in conn.execute(gen.SELECT_ROWS):
+                out.write(gen.nt_block(gen.row_triples(row, gen.row_product(row))))
+        t0 = time.perf_counter()
+        graph = Graph()
+        graph.parse(ttl_path, format="turtle")
+        sparql_queries.add_brand_keys(graph)
+        result["ttl_parse_s"] = time.perf_counter() - t0
+        result["ttl_triples"] = len(graph)
+        result["ttl_bytes"] = os.path.getsize(ttl_path)
+
+    # 3. Pasang backend sintetis ke app
+    app.kg = app.kg._replace(product_table=table, source="synthetic", version=f"synthetic-{n}",
+                             text_index=kg_loader.build_text_index(table),
+                             prompt_snippets=prompt_builder.build_snippets(table))
+    app.market_mirror = None
+    app.get_db_connection = lambda: SQLiteStandIn(conn)
+
+    samples = {stage: [] for stage in STAGES}
+    if graph is not None:
+        samples["kg_sparql"] = []
+    rows_returned = []
+
+    def one_pass(record):
+        # Stage diambil dari histogram metrics (selisih sum per query): yang diukur
+        # persis jalur get_augmented_data, termasuk halaman listing berikutnya
+        for query in QUERIES:
+            stage_before = [STAGE_SECONDS.snapshot(stage)[1] for stage in STAGES[:-1]]
+            kg_before, rows_before = KG_CANDIDATES.value(), MARKET_ROWS.value("db")
+            t0 = time.perf_counter()
+            facts, _ = app.get_augmented_data(query)
+            total = time.perf_counter() - t0
+            if not record:
+                continue
+            for stage, before in zip(STAGES, stage_before):
+                samples[stage].append(STAGE_SECONDS.snapshot(stage)[1] - before)
+            samples["total"].append(total)
+            rows_returned.append((KG_CANDIDATES.value() - kg_before, MARKET_ROWS.value("db") - rows_before, len(facts)))
+            if graph is not None:
+                intent = parse_intent(query.lower())
+                t5 = time.perf_counter()
+                sparql_queries.query_candidates(graph, intent["brand"], intent["min_ram"], intent["is_concert"])
+                samples["kg_sparql"].append(time.perf_counter() - t5)
+
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        one_pass(record=False)  # warmup (compile regex, cache SQLite)
+        for _ in range(repeat):
+            one_pass(record=True)
+
+        # Peak memory alokasi Python selama satu pass korpus (terpisah: tracemalloc memperlambat)
+        tracemalloc.start()
+        one_pass(record=False)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    result["stages"] = {stage: percentiles(values) for stage, values in samples.items()}
+    result["rows"] = {
+        "kg_candidates_avg": statistics.fmean(r[0] for r in rows_returned),
+        "market_rows_avg": statistics.fmean(r[1] for r in rows_returned),
+        "facts_avg": statistics.fmean(r[2] for r in rows_returned),
+    }
+    result["query_peak_alloc_mb"] = peak / 1e6
+    result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    conn.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+# --- PARENT ---
+
+def compare(current, baseline_path, threshold=0.2):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nDibanding {baseline_path} (regresi = p50/p99 naik > {threshold:.0%}):")
+    regressions = 0
+    for size, result in current["results"].items():
+        old = baseline["results"].get(size)
+        if not old:
+            continue
+        for stage, stats in result["stages"].items():
+            old_stats = old["stages"].get(stage)
+            if not old_stats:
+                continue
+            for key in ("p50_ms", "p99_ms"):
+                before, after = old_stats[key], stats[key]
+                change = (after - before) / before if before else 0.0
+                flag = "  ⚠️ REGRESI" if change > threshold else ""
+                regressions += bool(flag)
+                print(f"   {size:>8} {stage:<10} {key:<7} {before:9.3f} -> {after:9.3f} ms ({change:+6.1%}){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline retrieval vs ukuran katalog")
+    parser.add_argument("--sizes", default="1k,10k,100k,1m")
+    parser.add_argument("--repeat", type=int, default=20, help="pengulangan korpus per ukuran")
+    parser.add_argument("--ttl-max", default="1k", help="ukuran terbesar yang dibuatkan Turtle + SPARQL")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compare", help="file hasil sebelumnya untuk deteksi regresi")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_size(args.worker, args.repeat, parse_size(args.ttl_max), args.seed)))
+        return
+
+    output = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "queries": QUERIES,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+    for label in args.sizes.split(","):
+        n = parse_size(label)
+        print(f"▶ {label} produk ...", flush=True)
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", str(n), "--repeat", str(args.repeat),
+             "--ttl-max", args.ttl_max, "--seed", str(args.seed)],
+            cwd=BASE_DIR, capture_output=True, text=True, check=True)
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        output["results"][label] = result
+
+        build = f"db {result['db_build_s']:.1f}s, kg {result['kg_build_s']:.1f}s"
+        if "ttl_parse_s" in result:
+            build += f", ttl parse {result['ttl_parse_s']:.1f}s ({result['ttl_triples']} triple)"
+        print(f"   build: {build}")
+        for stage, s in result["stages"].items():
+            print(f"   {stage:<10} p50 {s['p50_ms']:9.3f} ms   p90 {s['p90_ms']:9.3f} ms   p99 {s['p99_ms']:9.3f} ms")
+        rows = result["rows"]
+        print(f"   rows: kandidat {rows['kg_candidates_avg']:.0f}, listing {rows['market_rows_avg']:.0f}, "
+              f"fakta {rows['facts_avg']:.0f} (rata-rata)   peak alloc query {result['query_peak_alloc_mb']:.1f} MB, "
+              f"max RSS {result['max_rss_mb']:.0f} MB")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"catalog-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"\n💾 Hasil: {path}")
+
+    if args.compare:
+        compare(output, args.compare)
+
+
+if __name__ == "__main__":
+    main()
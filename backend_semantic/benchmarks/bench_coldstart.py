@@ -0,0 +1,66 @@
+"""
+Benchmark cold start KG: parse Turtle + compile product table vs load snapshot.
+
+Tiap percobaan jalan di subprocess baru (import + load dari nol, seperti
+cold start serverless). Yang diukur: waktu import modul + load sampai
+product table siap dipakai.
+
+Jalankan dari folder backend_semantic:
+    python benchmarks/bench_coldstart.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOADERS = {
+    "turtle": """
+import time
+t0 = time.perf_counter()
+from rdflib import Graph
+from product_table import ProductTable
+g = Graph()
+g.parse("knowledge_base.ttl", format="turtle")
+table = ProductTable.from_graph(g)
+print(time.perf_counter() - t0, len(table))
+""",
+    "snapshot": """
+import time
+t0 = time.perf_counter()
+import kg_snapshot
+table, _ = kg_snapshot.load_snapshot("knowledge_base.kgsnap", source_path="knowledge_base.ttl")
+print(time.perf_counter() - t0, len(table))
+""",
+}
+
+
+def run_once(code):
+    out = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR,
+                         capture_output=True, text=True, check=True).stdout
+    elapsed, rows = out.split()
+    return float(elapsed), int(rows)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Cold start KG, {runs} subprocess per format\n")
+
+    results = {}
+    for name, code in LOADERS.items():
+        times = []
+        for _ in range(runs):
+            elapsed, rows = run_once(code)
+            times.append(elapsed)
+        results[name] = statistics.median(times)
+        print(f"  {name:<9} median {results[name] * 1000:8.1f} ms   "
+              f"min {min(times) * 1000:8.1f} ms   ({rows} produk)")
+
+    print(f"\n  speedup snapshot: {results['turtle'] / results['snapshot']:.0f}x")
+    for path in ("knowledge_base.ttl", "knowledge_base.kgsnap"):
+        print(f"  {path:<22} {os.path.getsize(os.path.join(BASE_DIR, path)) / 1024:8.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
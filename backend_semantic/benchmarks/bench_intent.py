@@ -0,0 +1,214 @@
+"""
+Micro-benchmark intent parser: if-chain lama vs intent_parser.parse_intent.
+
+Hasil keduanya sama untuk QUERIES, KECUALI perubahan brand yang disengaja
+(EXPECTED_DIFFERENCES):
+- alias baru di BRAND_ALIASES: "ipad", "macbook" -> Apple, "galaxy" -> Samsung,
+  "ps5" -> Sony, " pixel" -> Google, "asus"/" rog " -> Asus (lama: tanpa brand)
+- prioritas: kalau beberapa brand disebut, if-chain lama memakai brand yang
+  dicek TERAKHIR, parser baru brand PERTAMA di tabel ("samsung atau iphone"
+  lama Apple, baru Samsung)
+Pesan acak dengan banyak keyword juga dicek: yang boleh beda hanya brand.
+
+Jalankan dari folder backend_semantic:
+    python benchmarks/bench_intent.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_parser import parse_intent  # noqa: E402
+
+QUERIES = [
+    "hp gaming 5 juta",
+    "hp ojol murah",
+    "iphone 15 pro",
+    "rekomendasi hp buat kuliah dong, budget 4 juta",
+    "hp untuk orang tua yang layarnya besar",
+    "samsung kamera bagus buat konser",
+    "hp tahan air buat outdoor",
+    "hp buat wfh dan zoom meeting",
+    "mau nonton netflix sama youtube seharian",
+    "xiaomi redmi note murah",
+    "hp buat anak sekolah",
+    "halo, apa kabar?",
+    "Saya mencari smartphone dengan kamera selfie terbaik, baterai awet untuk driver gojek, "
+    "RAM besar untuk main PUBG dan ML, harga maksimal 7 juta, merk apa saja boleh asal bagus",
+]
+
+# (pesan, brand if-chain lama, brand parser baru): perbedaan yang disengaja
+EXPECTED_DIFFERENCES = [
+    # Alias baru
+    ("ipad buat kuliah", None, "Apple"),
+    ("macbook buat kerja", None, "Apple"),
+    ("galaxy s24 ultra", None, "Samsung"),
+    ("ps5 murah", None, "Sony"),
+    ("google pixel 8 kamera", None, "Google"),
+    ("asus rog phone", None, "Asus"),
+    # Prioritas beberapa brand: lama = dicek terakhir, baru = urutan tabel
+    ("samsung atau iphone yang bagus", "Apple", "Samsung"),
+    ("bandingin xiaomi sama oppo", "OPPO", "Xiaomi"),
+    ("redmi vs poco buat gaming", "Poco", "Xiaomi"),
+    ("itel vs infinix", "Itel", "Infinix"),
+]
+
+
+def legacy_parse_intent(user_query):
+    """Salinan if-chain lama dari get_augmented_data (sebagai pembanding)"""
+    user_query = user_query.lower()
+    brand_filter = None
+    min_ram = 0
+    budget = 0
+    is_concert = False
+    is_gaming = False
+    is_affordable = False
+    use_case_tags = []
+
+    if "samsung" in user_query: brand_filter = "Samsung"
+    if "iphone" in user_query or "apple" in user_query: brand_filter = "Apple"
+    if "xiaomi" in user_query or "redmi" in user_query: brand_filter = "Xiaomi"
+    if "poco" in user_query: brand_filter = "Poco"
+    if "vivo" in user_query: brand_filter = "Vivo"
+    if "oppo" in user_query: brand_filter = "OPPO"
+    if "realme" in user_query or "narzo" in user_query: brand_filter = "Realme"
+    if "infinix" in user_query: brand_filter = "Infinix"
+    if "tecno" in user_query: brand_filter = "Tecno"
+    if "itel" in user_query: brand_filter = "Itel"
+    if "nothing" in user_query: brand_filter = "Nothing"
+    if "sony" in user_query or "xperia" in user_query: brand_filter = "Sony"
+    if "huawei" in user_query: brand_filter = "Huawei"
+    if "zte" in user_query: brand_filter = "ZTE"
+    if "nokia" in user_query: brand_filter = "Nokia"
+    if "lenovo" in user_query: brand_filter = "Lenovo"
+    if "msi" in user_query: brand_filter = "MSI"
+    if "acer" in user_query: brand_filter = "Acer"
+    if "hp" in user_query and "victus" in user_query: brand_filter = "HP"
+    if "nintendo" in user_query: brand_filter = "Nintendo"
+    if "playstation" in user_query: brand_filter = "Sony"
+    if "steam" in user_query and "deck" in user_query: brand_filter = "Valve"
+
+    if "gaming" in user_query or "game" in user_query or "pubg" in user_query or "ml" in user_query:
+        min_ram = 8
+        is_gaming = True
+        use_case_tags.append("🎮 Gaming")
+    if "konser" in user_query or "zoom" in user_query:
+        is_concert = True
+        use_case_tags.append("📸 Concert Camera")
+    if "ojol" in user_query or "ojek" in user_query or "gojek" in user_query or "grab" in user_query or "driver" in user_query:
+        if budget == 0: budget = 3000000
+        is_affordable = True
+        use_case_tags.append("🚴 Ojol (Baterai Awet)")
+    if "kuliah" in user_query or "mahasiswa" in user_query or "campus" in user_query or "pelajar" in user_query:
+        if budget == 0: budget = 4000000
+        min_ram = 6
+        is_affordable = True
+        use_case_tags.append("📚 Kuliah/Sekolah")
+    if "orang tua" in user_query or "lansia" in user_query or "ibu" in user_query or "bapak" in user_query or "ortu" in user_query:
+        if budget == 0: budget = 2500000
+        is_affordable = True
+        use_case_tags.append("👴 Orang Tua (User Friendly)")
+    if "foto" in user_query or "kamera" in user_query or "photography" in user_query or "selfie" in user_query:
+        is_concert = True
+        use_case_tags.append("📷 Fotografi")
+    if "tahan air" in user_query or "waterproof" in user_query or "ip68" in user_query or "outdoor" in user_query:
+        is_concert = True
+        use_case_tags.append("💧 Tahan Air (IP Rating)")
+    if "video call" in user_query or "zoom meeting" in user_query or "wfh" in user_query or "kerja" in user_query:
+        min_ram = 6
+        use_case_tags.append("💼 WFH/Video Call")
+    if "streaming" in user_query or "netflix" in user_query or "youtube" in user_query or "nonton" in user_query:
+        min_ram = 4
+        use_case_tags.append("📺 Streaming")
+    if "bisnis" in user_query or "profesional" in user_query or "kantor" in user_query or "meeting" in user_query:
+        min_ram = 8
+        use_case_tags.append("💼 Bisnis/Profesional")
+    if "anak" in user_query or "kids" in user_query:
+        if budget == 0: budget = 2000000
+        is_affordable = True
+        use_case_tags.append("👶 Untuk Anak")
+    if "murah" in user_query or "terjangkau" in user_query or "affordable" in user_query or "budget" in user_query:
+        is_affordable = True
+        if budget == 0: budget = 5000000
+
+    import re as _re
+    price_match = _re.search(r'(\d+)\s*juta', user_query)
+    if price_match:
+        budget = int(price_match.group(1)) * 1000000
+
+    return {
+        "brand": brand_filter,
+        "min_ram": min_ram,
+        "budget": budget,
+        "is_concert": is_concert,
+        "is_gaming": is_gaming,
+        "is_affordable": is_affordable,
+        "use_case_tags": use_case_tags,
+    }
+
+
+def bench(fn, number):
+    best = min(timeit.repeat(lambda: [fn(q) for q in QUERIES], number=number, repeat=5))
+    return best / (number * len(QUERIES)) * 1e6
+
+
+def check_expected_differences():
+    """Perbedaan yang disengaja: hanya brand yang beda, dan persis seperti EXPECTED_DIFFERENCES"""
+    unexpected = 0
+    for q, legacy_brand, new_brand in EXPECTED_DIFFERENCES:
+        old, new = legacy_parse_intent(q), parse_intent(q)
+        if (old["brand"], new["brand"]) != (legacy_brand, new_brand) or dict(old, brand=None) != dict(new, brand=None):
+            unexpected += 1
+            print(f"⚠️ Perbedaan tidak sesuai dokumentasi untuk {q!r}:\n   lama={old}\n   baru={new}")
+    return unexpected
+
+
+def check_random(count=20000, seed=1):
+    """Pesan acak 2-4 keyword: hitung beda per field (yang boleh hanya brand)"""
+    from intent_parser import _all_keywords
+
+    keywords = sorted(_all_keywords())
+    rng = random.Random(seed)
+    differences = {}
+    for _ in range(count):
+        q = " ".join(rng.sample(keywords, rng.randint(2, 4))) + rng.choice(["", " 5 juta"])
+        old, new = legacy_parse_intent(q), parse_intent(q)
+        for field in old:
+            if old[field] != new[field]:
+                differences[field] = differences.get(field, 0) + 1
+    return differences
+
+
+def main():
+    mismatches = 0
+    for q in QUERIES:
+        old, new = legacy_parse_intent(q), parse_intent(q)
+        if old != new:
+            mismatches += 1
+            print(f"⚠️ Beda hasil untuk {q!r}:\n   lama={old}\n   baru={new}")
+    unexpected = check_expected_differences()
+    random_count = 20000
+    random_diff = check_random(random_count)
+
+    number = 2000
+    legacy_us = bench(legacy_parse_intent, number)
+    engine_us = bench(parse_intent, number)
+    long_q = QUERIES[-1]
+
+    print(f"📊 {len(QUERIES)} pesan x {number} iterasi (best of 5)")
+    print(f"   if-chain lama  : {legacy_us:8.2f} µs/pesan")
+    print(f"   intent engine  : {engine_us:8.2f} µs/pesan")
+    print(f"   pesan panjang ({len(long_q)} char): "
+          f"lama {timeit.timeit(lambda: legacy_parse_intent(long_q), number=number) / number * 1e6:.2f} µs, "
+          f"baru {timeit.timeit(lambda: parse_intent(long_q), number=number) / number * 1e6:.2f} µs")
+    print(f"   hasil berbeda  : {mismatches}/{len(QUERIES)}")
+    print(f"   perbedaan disengaja (alias/prioritas brand) sesuai dokumentasi: "
+          f"{len(EXPECTED_DIFFERENCES) - unexpected}/{len(EXPECTED_DIFFERENCES)}")
+    print(f"   {random_count} pesan acak multi-keyword, beda per field: {random_diff}"
+          f"{'' if set(random_diff) <= {'brand'} else '   ⚠️ field selain brand berubah'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark index n-gram (ngram_index.py) untuk pencarian model fuzzy.
+
+Untuk tiap ukuran katalog (default 1k, 10k, 100k model dari generator yang
+sama dengan bench_catalog.py):
+1. Build index (kg_loader.build_text_index): waktu + memori matrix
+2. Query dengan typo/singkatan dari nama model asli ("samsng galaxy s 12"):
+   latency satu query dan batch (satu perkalian sparse untuk semua query)
+3. Recall@k: nama model asli ada di top-k hasil; pembanding = substring biasa
+   (jalur fusion lama), yang hampir selalu gagal untuk teks ber-typo
+
+Jalankan dari folder backend_semantic (butuh requirements-vector.txt):
+    python benchmarks/bench_ngram.py --sizes 1k,10k,100k
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from bench_catalog import RESULTS_DIR, parse_size, percentiles, synthetic_rows  # noqa: E402
+
+
+def typo(text, rng):
+    """Satu kesalahan ketik: hapus, tukar atau ganti satu huruf di kata yang cukup panjang"""
+    words = text.split()
+    candidates = [i for i, word in enumerate(words) if len(word) > 3 and word.isalpha()]
+    if not candidates:
+        return text
+    i = rng.choice(candidates)
+    word = words[i]
+    pos = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(["delete", "swap", "replace"])
+    if kind == "delete":
+        word = word[:pos] + word[pos + 1:]
+    elif kind == "swap":
+        word = word[:pos - 1] + word[pos] + word[pos - 1] + word[pos + 1:]
+    else:
+        word = word[:pos] + rng.choice("aeiouy") + word[pos + 1:]
+    words[i] = word
+    return " ".join(words)
+
+
+def make_queries(models, count, rng):
+    """(query ber-typo, row model asli); konfigurasi memori dibuang seperti user mengetik"""
+    queries = []
+    for row in rng.sample(range(len(models)), min(count, len(models))):
+        name = " ".join(w for w in models[row].split() if "/" not in w and not w.endswith("GB"))
+        queries.append((typo(name.lower(), rng), row))
+    return queries
+
+
+def run_size(n, query_count, k, seed):
+    import kg_loader
+    from product_table import ProductTable
+
+    rng = random.Random(seed)
+    table = ProductTable()
+    for row in synthetic_rows(n, seed):
+        table.add(sku=f"SYN{row[0]}", model=row[1], brand=row[1].split()[0], ram=8, processor=row[4], storage=128)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    index = kg_loader.build_text_index(table)
+    build_s = time.perf_counter() - t0
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    queries = make_queries(table.models, query_count, rng)
+    texts = [q for q, _ in queries]
+    index.search(texts[:5], k=k)  # warmup
+
+    single = []
+    hits = []
+    for text, row in queries:
+        t0 = time.perf_counter()
+        result = index.search([text], k=k)[0]
+        single.append(time.perf_counter() - t0)
+        # Nama sama di row lain (katalog punya judul kembar) tetap dihitung benar
+        hits.append(any(table.models[r] == table.models[row] for r, _ in result))
+
+    t0 = time.perf_counter()
+    index.search(texts, k=k)
+    batch_s = time.perf_counter() - t0
+
+    # Pembanding: scan substring case-insensitive ke semua model (semantik fusion lama)
+    models_lower = [m.lower() for m in table.models]
+    substring = []
+    substring_hits = 0
+    for text, row in queries:
+        t0 = time.perf_counter()
+        matched = [i for i, model in enumerate(models_lower) if text in model]
+        substring.append(time.perf_counter() - t0)
+        substring_hits += any(table.models[i] == table.models[row] for i in matched)
+
+    return {
+        "models": len(table),
+        "build_s": build_s,
+        "index_mb": index.memory_bytes() / 1e6,
+        "build_rss_delta_mb": (rss_after - rss_before) / 1024,
+        "single_query": percentiles(single),
+        "batch_total_ms": batch_s * 1000,
+        "batch_per_query_ms": batch_s * 1000 / len(queries),
+        f"recall_at_{k}": sum(hits) / len(hits),
+        "substring_hit_rate": substring_hits / len(queries),
+        "substring_query": percentiles(substring),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark index n-gram pencarian model fuzzy")
+    parser.add_argument("--sizes", default="1k,10k,100k")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    import ngram_index
+    if not ngram_index.AVAILABLE:
+        sys.exit("numpy + scipy belum terpasang: pip install -r requirements-vector.txt")
+
+    results = []
+    for size in args.sizes.split(","):
+        result = run_size(parse_size(size), args.queries, args.k, args.seed)
+        results.append(result)
+        print(f"{result['models']:>8} model  build {result['build_s']:.2f}s  index {result['index_mb']:.1f} MB  "
+              f"query p50 {result['single_query']['p50_ms']:.2f} ms p99 {result['single_query']['p99_ms']:.2f} ms  "
+              f"batch {result['batch_per_query_ms']:.2f} ms/query  "
+              f"recall@{args.k} {result[f'recall_at_{args.k}']:.0%}  "
+              f"(substring scan p50 {result['substring_query']['p50_ms']:.2f} ms, hit {result['substring_hit_rate']:.0%})")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"ngram-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"args": vars(args), "results": results}, f, indent=2)
+    print(f"💾 {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Benchmark estimasi spek: if-chain lama (estimate_* per atribut) vs
+spec_rules.derive (satu scan per judul, semua atribut sekaligus).
+
+Korpus judul sintetis (brand/seri/varian/noise acak) supaya mirip judul
+listing marketplace. Semua hasil juga dicek sama dengan versi lama.
+
+Jalankan dari folder backend_semantic:
+    python benchmarks/bench_rules.py [jumlah_judul]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_parser import detect_brand  # noqa: E402
+from spec_rules import derive, suitable_for  # noqa: E402
+
+
+# --- SALINAN IF-CHAIN LAMA (pembanding) ---
+
+def legacy_processor(model_name):
+    m = model_name.lower()
+    if "s24 ultra" in m: return "Snapdragon 8 Gen 3"
+    if "s24" in m: return "Exynos 2400"
+    if "s23 ultra" in m: return "Snapdragon 8 Gen 2"
+    if "s23" in m: return "Snapdragon 8 Gen 2"
+    if "iphone 17" in m: return "A19 Pro"
+    if "iphone 16 pro" in m: return "A18 Pro"
+    if "iphone 16" in m: return "A18"
+    if "iphone 15 pro" in m: return "A17 Pro"
+    if "iphone 15" in m: return "A16 Bionic"
+    if "iphone 14" in m: return "A15 Bionic"
+    if "iphone 13" in m: return "A15 Bionic"
+    if "pixel 9" in m: return "Tensor G4"
+    if "pixel 8" in m: return "Tensor G3"
+    if "poco f5" in m: return "Snapdragon 7+ Gen 2"
+    if "poco" in m: return "MediaTek Dimensity"
+    if "redmi note 14" in m: return "MediaTek Dimensity 7025"
+    if "redmi" in m: return "MediaTek Helio"
+    if "realme gt" in m: return "Snapdragon 8 Gen 4"
+    if "realme 14 pro" in m: return "MediaTek Dimensity 7300"
+    if "realme" in m: return "MediaTek Helio G99"
+    if "infinix gt" in m: return "MediaTek Dimensity 8200"
+    if "infinix" in m: return "MediaTek Helio G88"
+    if "tecno camon" in m: return "MediaTek Dimensity 8020"
+    if "tecno" in m: return "MediaTek Helio G85"
+    if "itel" in m: return "Unisoc SC9863A"
+    if "vivo x100" in m: return "MediaTek Dimensity 9300"
+    if "vivo v" in m: return "Snapdragon 7 Gen 3"
+    if "vivo" in m: return "MediaTek Dimensity"
+    if "oppo find x" in m: return "MediaTek Dimensity 9400"
+    if "oppo reno" in m: return "MediaTek Dimensity 8100"
+    if "oppo" in m: return "Snapdragon 680"
+    if "nothing phone" in m: return "Snapdragon 8+ Gen 1"
+    if "nothing" in m: return "N/A (Aksesori)"
+    if "galaxy z flip" in m: return "Snapdragon 8 Gen 3"
+    if "galaxy z fold" in m: return "Snapdragon 8 Gen 3"
+    if "galaxy a" in m: return "MediaTek Helio G99"
+    if "samsung" in m or "galaxy" in m: return "Exynos / Snapdragon"
+    if "macbook m4" in m: return "Apple M4 Pro"
+    if "macbook m2" in m: return "Apple M2"
+    if "macbook m1" in m: return "Apple M1"
+    if "ipad" in m: return "Apple M-Series"
+    if "nintendo switch" in m: return "NVIDIA Tegra X1+"
+    if "playstation" in m: return "AMD Zen 2 + RDNA 2"
+    if "steam deck" in m: return "AMD Zen 2 APU"
+    if "rog ally" in m: return "AMD Ryzen Z1 Extreme"
+    if "legion go" in m: return "AMD Ryzen Z1 Extreme"
+    if "xperia" in m: return "Snapdragon 8 Gen 2"
+    return "Unknown"
+
+
+def legacy_camera(model_name):
+    m = model_name.lower()
+    if "s24 ultra" in m or "s23 ultra" in m: return 200
+    if "s24" in m or "s23" in m: return 50
+    if "iphone 16 pro" in m or "iphone 15 pro" in m: return 48
+    if "iphone" in m: return 12
+    if "pixel 9 pro" in m: return 50
+    if "pixel" in m: return 50
+    if "200mp" in m: return 200
+    if "108mp" in m: return 108
+    if "64mp" in m: return 64
+    if "50mp" in m: return 50
+    if "pro" in m or "ultra" in m: return 108
+    if "poco" in m: return 64
+    if "redmi note" in m: return 108
+    if "redmi" in m: return 50
+    if "vivo x100" in m: return 50
+    if "oppo find" in m: return 50
+    if "realme gt" in m: return 50
+    if "nothing phone" in m: return 50
+    if "ipad" in m or "macbook" in m: return 12
+    if "ear" in m or "buds" in m or "watch" in m: return 0
+    return 48
+
+
+def legacy_telephoto(model_name):
+    m = model_name.lower()
+    if any(x in m for x in ["ultra", "pro max", "pro+", "s24", "s23", "s22", "find x", "x100", "pixel 9 pro", "iphone 15 pro", "iphone 16 pro", "iphone 17 pro"]):
+        return True
+    if any(x in m for x in ["note 14 pro", "poco f5", "poco f6", "realme gt"]):
+        return True
+    return False
+
+
+def legacy_refresh_rate(model_name):
+    m = model_name.lower()
+    if any(x in m for x in ["ultra", "pro", "gaming", "rog", "poco f", "realme gt", "s24", "s23", "iphone 16", "iphone 15", "pixel 9", "pixel 8", "nothing phone", "z flip", "z fold"]):
+        return 120
+    if any(x in m for x in ["redmi note", "poco m", "realme", "infinix note", "tecno camon", "vivo v", "oppo reno"]):
+        return 90
+    return 60
+
+
+def legacy_suitable_for(model_name, price, battery, telephoto, refresh_rate):
+    tags = []
+    m = model_name.lower()
+    if battery >= 5000 and price < 3000000:
+        tags.append("Ojol")
+    if telephoto:
+        tags.append("ConcertPhotography")
+    if refresh_rate >= 120 and any(x in m for x in ["gaming", "rog", "poco f", "realme gt", "ultra"]):
+        tags.append("Gaming")
+    if price < 2500000:
+        tags.append("Elderly")
+    if 2000000 <= price <= 5000000:
+        tags.append("Student")
+    if price > 15000000:
+        tags.append("Professional")
+    return tags
+
+
+def legacy_ram_storage(model_name):
+    m = model_name.lower()
+    ram = 8
+    storage = 128
+    ram_match = re.search(r'(\d+)\s*(?:gb|/)\s*', m)
+    if ram_match:
+        val = int(ram_match.group(1))
+        if val < 64:
+            ram = val
+    storage_match = re.search(r'(?:/|)(\d+)\s*gb', m)
+    if storage_match:
+        val = int(storage_match.group(1))
+        if val > 16:
+            storage = val
+    return ram, storage
+
+
+def legacy_all(title, price):
+    """Semua estimasi lama untuk satu judul (6 fungsi, masing-masing lower() + if-chain)"""
+    telephoto = legacy_telephoto(title)
+    refresh_rate = legacy_refresh_rate(title)
+    ram, storage = legacy_ram_storage(title)
+    return {
+        "brand": detect_brand(title) or "Unknown",
+        "processor": legacy_processor(title),
+        "camera_mp": legacy_camera(title),
+        "telephoto": telephoto,
+        "refresh_rate": refresh_rate,
+        "ram": ram,
+        "storage": storage,
+        "suitable_for": legacy_suitable_for(title, price, 5000, telephoto, refresh_rate),
+    }
+
+
+def engine_all(title, price):
+    specs = derive(title)
+    return {
+        "brand": specs["brand"],
+        "processor": specs["processor"],
+        "camera_mp": specs["camera_mp"],
+        "telephoto": specs["telephoto"],
+        "refresh_rate": specs["refresh_rate"],
+        "ram": specs["ram"],
+        "storage": specs["storage"],
+        "suitable_for": suitable_for(specs, price),
+    }
+
+
+# --- KORPUS SINTETIS ---
+
+SERIES = [
+    "Samsung Galaxy S24 Ultra", "Samsung Galaxy S23", "Galaxy A55", "Galaxy Z Flip 6", "Galaxy Z Fold 5",
+    "iPhone 17 Pro Max", "iPhone 16 Pro", "iPhone 16", "iPhone 15 Pro Max", "iPhone 15", "iPhone 14", "iPhone 13",
+    "Google Pixel 9 Pro", "Pixel 8", "Poco F5", "Poco F6 Pro", "Poco M6", "Poco X6 Pro",
+    "Xiaomi Redmi Note 14 Pro+", "Redmi 13C", "Realme GT 6", "Realme 14 Pro", "Realme C67", "Narzo 70",
+    "Infinix GT 20 Pro", "Infinix Note 40", "Infinix Hot 40", "Tecno Camon 30", "Tecno Spark 20", "Itel A70",
+    "Vivo X100 Pro", "Vivo V30", "Vivo Y28", "OPPO Find X8", "OPPO Reno 12", "OPPO A79",
+    "Nothing Phone (2a)", "Nothing Ear (2)", "MacBook M4 Pro", "MacBook M2 Air", "iPad Air M2",
+    "Nintendo Switch OLED", "PlayStation 5 Slim", "Steam Deck OLED", "ASUS ROG Ally", "ROG Phone 8",
+    "Lenovo Legion Go", "Sony Xperia 1 VI", "Huawei Matepad 11", "ZTE Blade A75", "Nokia G42",
+    "HP Victus 15", "Acer Nitro V 16", "MSI Katana", "Galaxy Buds 3 Pro", "Galaxy Watch 7",
+]
+VARIANTS = ["", "8/256", "12/512GB", "8GB 128GB", "4/64", "16GB/1TB", "256GB", "6/128 GB"]
+NOISE = ["", "Garansi Resmi", "Second Mulus", "NEW", "Bonus Case", "108MP", "50MP Camera", "5G",
+         "Gaming Edition", "BNIB", "iBox", "Ex Inter", "Promo", "Pro Max Look"]
+
+
+def make_corpus(n, seed=42):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        parts = [rng.choice(SERIES), rng.choice(VARIANTS), rng.choice(NOISE)]
+        title = " ".join(p for p in parts if p)
+        if rng.random() < 0.3:
+            title = title.upper() if rng.random() < 0.5 else title.lower()
+        corpus.append((title, rng.choice([1500000, 2900000, 4500000, 9000000, 21000000])))
+    return corpus
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    corpus = make_corpus(n)
+
+    mismatches = 0
+    for title, price in corpus[:20000]:
+        old, new = legacy_all(title, price), engine_all(title, price)
+        if old != new:
+            mismatches += 1
+            if mismatches <= 5:
+                diff = {k: (old[k], new[k]) for k in old if old[k] != new[k]}
+                print(f"⚠️ Beda hasil untuk {title!r}: {diff}")
+
+    results = {}
+    for name, fn in (("if-chain lama", legacy_all), ("spec_rules", engine_all)):
+        t0 = time.perf_counter()
+        for title, price in corpus:
+            fn(title, price)
+        results[name] = time.perf_counter() - t0
+
+    print(f"📊 {n} judul sintetis, semua atribut per judul")
+    for name, elapsed in results.items():
+        print(f"   {name:<14}: {elapsed:6.2f} s  {n / elapsed:10,.0f} judul/s  {elapsed / n * 1e6:6.2f} µs/judul")
+    print(f"   hasil berbeda : {mismatches}/{min(n, 20000)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark query KG: SPARQL ad-hoc (f-string lama) vs prepared vs product table.
+
+Jalankan dari folder backend_semantic:
+    python benchmarks/bench_sparql.py [path/knowledge_base.ttl]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rdflib import Graph  # noqa: E402
+from rdflib.plugins.sparql import prepareQuery  # noqa: E402
+
+import sparql_queries  # noqa: E402
+from product_table import ProductTable  # noqa: E402
+
+CASES = [
+    ("Samsung", 8, False),
+    ("Apple", 0, True),
+    # Sebagian nama / huruf campur: substring case-insensitive di semua jalur
+    ("sung", 0, False),
+    ("APPLE", 8, False),
+    ("o", 0, False),
+    (None, 8, False),
+    (None, 0, True),
+    (None, 0, False),
+]
+
+
+def adhoc_query_text(brand=None, min_ram=0, feature_concert=False):
+    """Teks SPARQL versi lama (f-string per request)"""
+    query_str = """
+    PREFIX ex: <http://example.org/gadget#>
+    SELECT ?sku ?nama ?ram ?prosesor ?storage
+    WHERE {
+        ?hp a ex:Smartphone ;
+            ex:hasModel ?nama ;
+            ex:hasBrand ?brand ;
+            ex:hasRAM ?ram ;
+            ex:hasProcessor ?prosesor ;
+            ex:hasStorage ?storage .
+        BIND(STRAFTER(STR(?hp), "#") AS ?sku)
+    """
+    if brand:
+        query_str += f'    FILTER (regex(?brand, "{brand}", "i"))\n'
+    if min_ram > 0:
+        query_str += f'    FILTER (?ram >= {min_ram})\n'
+    if feature_concert:
+        query_str += '    FILTER (regex(?nama, "Ultra|Pro|Max", "i"))\n'
+    return query_str + "}"
+
+
+def adhoc_query(graph, brand=None, min_ram=0, feature_concert=False):
+    candidates = {}
+    for row in graph.query(adhoc_query_text(brand, min_ram, feature_concert)):
+        candidates[str(row.sku).replace("sku_", "")] = {
+            "model": str(row.nama),
+            "ram": int(row.ram),
+            "processor": str(row.prosesor),
+            "storage": int(row.storage)
+        }
+    return candidates
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in CASES:
+            fn(*case)
+    return (time.perf_counter() - start) / (repeat * len(CASES)) * 1000
+
+
+def main():
+    ttl = sys.argv[1] if len(sys.argv) > 1 else "knowledge_base.ttl"
+    g = Graph()
+    g.parse(ttl, format="turtle")
+    sparql_queries.add_brand_keys(g)
+    table = ProductTable.from_graph(g)
+    print(f"📦 {ttl}: {len(g)} triples, {len(table)} produk")
+
+    for case in CASES:
+        old = adhoc_query(g, *case)
+        new = sparql_queries.query_candidates(g, *case)
+        fast = table.query(*case)
+        status = "✅" if old == new == fast else "⚠️ BEDA"
+        print(f"   {status} {case}: adhoc={len(old)} prepared={len(new)} table={len(fast)}")
+
+    repeat = 5
+    parse_ms = timed(lambda *c: prepareQuery(adhoc_query_text(*c)), repeat)
+    sparql_queries._prepared.clear()
+    start = time.perf_counter()
+    sparql_queries.prepare_all()
+    prepare_all_ms = (time.perf_counter() - start) * 1000
+
+    print(f"⏱️ rata-rata per query ({repeat}x{len(CASES)} query):")
+    print(f"   parse+algebra ad-hoc        : {parse_ms:9.3f} ms (dibayar tiap request)")
+    print(f"   prepare_all (4 bentuk)      : {prepare_all_ms:9.3f} ms (sekali saat load)")
+    print(f"   SPARQL ad-hoc               : {timed(lambda *c: adhoc_query(g, *c), repeat):9.3f} ms")
+    print(f"   SPARQL prepared+initBindings: {timed(lambda *c: sparql_queries.query_candidates(g, *c), repeat):9.3f} ms")
+    print(f"   product table               : {timed(table.query, repeat * 100):9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Time-to-first-byte /chat vs /chat/stream terhadap fake Groq lokal.
+
+Jalankan dari folder backend_semantic (DB tidak wajib, fakta bisa kosong):
+    python benchmarks/bench_stream.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_groq_server  # noqa: E402
+
+server, url = fake_groq_server.start(tokens=40, token_delay=0.02, first_token_delay=0.2)
+os.environ["GROQ_API_URL"] = url
+os.environ.setdefault("GROQ_API_KEY", "gsk_fake_local_key")
+os.environ["RESPONSE_CACHE_SIZE"] = "0"  # Supaya tiap request benar-benar ke (fake) Groq
+
+import app  # noqa: E402
+
+MESSAGE = "hp gaming 5 juta"
+
+
+def measure_chat(client):
+    start = time.perf_counter()
+    resp = client.post("/chat", json={"message": MESSAGE})
+    total = time.perf_counter() - start
+    assert resp.status_code == 200, resp.data
+    return total, total  # JSON: byte pertama = setelah generasi selesai
+
+
+def measure_stream(client):
+    start = time.perf_counter()
+    resp = client.post("/chat/stream", json={"message": MESSAGE}, buffered=False)
+    first_facts = first_token = None
+    for chunk in resp.response:
+        now = time.perf_counter() - start
+        if first_facts is None and b"event: facts" in chunk:
+            first_facts = now
+        if first_token is None and b"event: token" in chunk:
+            first_token = now
+    resp.close()
+    return first_facts, first_token, time.perf_counter() - start
+
+
+def main():
+    client = app.app.test_client()
+    runs = 5
+    chat = [measure_chat(client) for _ in range(runs)]
+    stream = [measure_stream(client) for _ in range(runs)]
+
+    avg = lambda xs: sum(xs) / len(xs) * 1000  # noqa: E731
+    print(f"📊 {runs} run, fake Groq: 200 ms ke token pertama + 40 token x 20 ms")
+    print(f"   /chat        TTFB {avg([c[0] for c in chat]):7.1f} ms | total {avg([c[1] for c in chat]):7.1f} ms")
+    print(f"   /chat/stream facts {avg([s[0] for s in stream]):6.1f} ms | token pertama {avg([s[1] for s in stream]):7.1f} ms"
+          f" | total {avg([s[2] for s in stream]):7.1f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
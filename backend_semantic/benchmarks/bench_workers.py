@@ -0,0 +1,218 @@
+"""
+Benchmark memori per worker gunicorn: katalog per worker vs dibagi dari master.
+
+Katalog sintetis (default 100k produk, generator bench_catalog.py) ditulis
+jadi knowledge_base.ttl + snapshot di folder sementara, lalu app.py dijalankan
+dengan gunicorn -w N dalam tiga mode:
+
+1. tanpa preload      : tiap worker load snapshot + bangun index sendiri
+2. --preload          : load sekali di master, worker mewarisi (copy-on-write)
+3. gunicorn_shared    : preload + SHARED_CATALOG=1 (kolom flat) + gc.freeze()
+
+Per worker dibaca /proc/<pid>/smaps_rollup sesudah boot dan sesudah traffic
+/chat (query yang men-scan seluruh katalog): Rss, Pss (Rss dibagi rata dengan
+proses yang berbagi page), Private (page milik worker sendiri) dan Shared.
+Pss total master + worker = memori fisik sebenarnya. Hanya Linux.
+
+Groq diganti fake_groq_server, DATABASE_URL dikosongkan (listing toko tidak
+ikut diukur). Jalankan dari folder backend_semantic:
+    python benchmarks/bench_workers.py --size 100k --workers 4
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from bench_catalog import RESULTS_DIR, parse_size, synthetic_rows  # noqa: E402
+
+# Tanpa brand / brand besar: query yang membaca banyak row katalog
+QUERIES = ["hp buat konser", "hp ram 12gb", "samsung kamera bagus", "iphone 15 pro", "hp gaming 5 juta"]
+
+MODES = {
+    "tanpa preload": [],
+    "preload": ["--preload"],
+    "preload + shared": ["-c", "gunicorn_shared.conf.py"],
+}
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def build_catalog(n, seed, workdir):
+    """knowledge_base.ttl + snapshot sintetis (jalur generate_rdf_postgres)"""
+    import generate_rdf_postgres as gen
+    import kg_snapshot
+    from product_table import ProductTable
+
+    ttl_path = os.path.join(workdir, "knowledge_base.ttl")
+    snapshot_path = os.path.join(workdir, "knowledge_base.kgsnap")
+    products = {}
+    with open(ttl_path, "wb") as out:
+        out.write(gen.nt_block(gen.ONTOLOGY))
+        for row in synthetic_rows(n, seed):
+            row = row[:9]  # kolom gen.SELECT_ROWS
+            product = gen.row_product(row)
+            products[product["sku"]] = product
+            out.write(gen.nt_block(gen.row_triples(row, product)))
+    table = ProductTable()
+    for product in products.values():
+        table.add(**product)
+    kg_snapshot.write_snapshot(table, snapshot_path, source_path=ttl_path)
+    return ttl_path, snapshot_path, len(table)
+
+
+def smaps(pid):
+    """Field smaps_rollup (KB) satu proses"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in SMAPS_FIELDS:
+                values[key] = int(rest.split()[0])
+    return {
+        "rss_mb": values["Rss"] / 1024,
+        "pss_mb": values["Pss"] / 1024,
+        "shared_mb": (values["Shared_Clean"] + values["Shared_Dirty"]) / 1024,
+        "private_mb": (values["Private_Clean"] + values["Private_Dirty"]) / 1024,
+    }
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def cpu_ticks(pids):
+    ticks = 0
+    for pid in pids:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks += int(fields[11]) + int(fields[12])  # utime + stime
+    return ticks
+
+
+def wait_workers(master, workers, port, timeout):
+    """Tunggu semua worker hidup, server menjawab, dan CPU worker diam (load KG selesai)"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        pids = children(master)
+        if len(pids) == workers:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5).read()
+                before = cpu_ticks(pids)
+                time.sleep(1)
+                if cpu_ticks(pids) == before:
+                    return pids
+                continue
+            except (urllib.error.URLError, OSError):
+                pass
+        time.sleep(0.5)
+    raise RuntimeError("Worker gunicorn tidak siap")
+
+
+def post_chat(port, message):
+    req = urllib.request.Request(f"http://127.0.0.1:{port}/chat", data=json.dumps({"message": message}).encode(),
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        resp.read()
+
+
+def summarize(per_worker):
+    keys = per_worker[0].keys()
+    return {key: sum(w[key] for w in per_worker) / len(per_worker) for key in keys}
+
+
+def run_mode(name, args, env, workers, requests, boot_timeout):
+    port = free_port()
+    cmd = [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", *args, "app:app"]
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        t0 = time.perf_counter()
+        pids = wait_workers(proc.pid, workers, port, boot_timeout)
+        boot_s = time.perf_counter() - t0
+        idle = [smaps(pid) for pid in pids]
+
+        # Traffic merata ke semua worker (lebih banyak koneksi paralel dari worker)
+        with ThreadPoolExecutor(max_workers=workers * 2) as pool:
+            list(pool.map(lambda i: post_chat(port, QUERIES[i % len(QUERIES)]), range(requests)))
+        busy = [smaps(pid) for pid in pids]
+        master = smaps(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    return {
+        "mode": name,
+        "boot_s": boot_s,
+        "master": master,
+        "worker_idle": summarize(idle),
+        "worker_after_traffic": summarize(busy),
+        "workers": busy,
+        "total_pss_mb": master["pss_mb"] + sum(w["pss_mb"] for w in busy),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RSS/PSS per worker gunicorn (katalog shared vs per worker)")
+    parser.add_argument("--size", default="100k")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--boot-timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("Butuh Linux (/proc/<pid>/smaps_rollup)")
+
+    workdir = tempfile.mkdtemp(prefix="bench_workers_")
+    groq_port = free_port()
+    fake_groq = subprocess.Popen(
+        [sys.executable, "fake_groq_server.py", "--port", str(groq_port), "--tokens", "5", "--first-token-delay", "0.01"],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    results = []
+    try:
+        t0 = time.perf_counter()
+        ttl_path, snapshot_path, products = build_catalog(parse_size(args.size), args.seed, workdir)
+        print(f"Katalog sintetis {products} produk ({time.perf_counter() - t0:.1f}s), "
+              f"{args.workers} worker, {args.requests} request /chat per mode\n")
+        env = dict(os.environ, KG_TTL=ttl_path, KG_SNAPSHOT=snapshot_path, KG_RELOAD_INTERVAL="0",
+                   GROQ_API_URL=f"http://127.0.0.1:{groq_port}/openai/v1/chat/completions",
+                   GROQ_API_KEY="gsk_bench", RESPONSE_CACHE_SIZE="0", DATABASE_URL="", LOG_LEVEL="WARNING")
+        env.pop("SHARED_CATALOG", None)
+
+        for name, mode_args in MODES.items():
+            r = run_mode(name, mode_args, env, args.workers, args.requests, args.boot_timeout)
+            results.append(r)
+            idle, busy = r["worker_idle"], r["worker_after_traffic"]
+            print(f"▶ {name:<18} boot {r['boot_s']:5.1f}s  per worker RSS {idle['rss_mb']:6.1f} -> {busy['rss_mb']:6.1f} MB"
+                  f"  private {idle['private_mb']:6.1f} -> {busy['private_mb']:6.1f} MB"
+                  f"  PSS {busy['pss_mb']:6.1f} MB   total PSS {r['total_pss_mb']:7.1f} MB")
+    finally:
+        fake_groq.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"workers-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"args": vars(args), "results": results}, f, indent=2)
+    print(f"💾 {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Connection pool PostgreSQL untuk seluruh proses.
+
+Menggantikan psycopg2.connect() per request (TCP + TLS + auth ke Neon tiap chat).
+- Ukuran min/max, checkout menunggu sampai `timeout` detik kalau pool penuh;
+  warmup() membuka minconn koneksi, koneksi idle di atas minconn yang tidak
+  dipakai lebih dari `max_idle` detik ditutup lagi
+- Liveness check saat checkout (koneksi idle lama di-ping dulu)
+- Koneksi rusak dibuang & diganti koneksi baru
+- Aman dipakai setelah fork (gunicorn worker): koneksi milik parent tidak disentuh
+- stats() untuk sizing: jumlah checkout, waktu tunggu, timeout, reconnect
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+
+
+class PoolTimeout(Exception):
+    """Semua koneksi sedang dipakai dan tidak ada yang kembali sebelum timeout"""
+
+
+class ConnectionPool:
+    def __init__(self, dsn, minconn=1, maxconn=10, timeout=5.0, check_idle_after=30.0, max_idle=60.0):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Ukuran pool tidak valid: min={minconn}, max={maxconn}")
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.check_idle_after = check_idle_after
+        self.max_idle = max_idle
+        self._reset_state()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._cond = threading.Condition(threading.Lock())
+        self._idle = []      # [(conn, waktu_dikembalikan)]
+        self._size = 0       # koneksi yang dimiliki pool (idle + dipakai)
+        self._in_use = 0
+        self._closed = False
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time_total_s": 0.0,
+            "wait_time_max_s": 0.0,
+            "timeouts": 0,
+            "created": 0,
+            "reconnects": 0,
+            "discarded": 0,
+            "trimmed": 0,
+        }
+
+    def _after_fork(self):
+        # Socket koneksi parent ikut ter-copy ke child. Jangan di-close di sini
+        # (PQfinish akan memutus koneksi milik parent); simpan referensinya
+        # supaya tidak di-GC, lalu child mulai dengan pool kosong.
+        orphans = [conn for conn, _ in self._idle]
+        self._reset_state()
+        self._orphans = orphans
+
+    def warmup(self):
+        """Buka koneksi sampai minconn (opsional, biasanya dipanggil di worker)"""
+        while True:
+            with self._cond:
+                if self._size >= self.minconn:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            self._putconn(conn)
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        with self._cond:
+            self._stats["created"] += 1
+        return conn
+
+    def _is_alive(self, conn, idle_since):
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.check_idle_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def getconn(self):
+        """Ambil koneksi sehat dari pool (pakai connection() kalau bisa)"""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+
+        with self._cond:
+            if self._closed:
+                raise PoolTimeout("Pool sudah ditutup")
+            while not self._idle and self._size >= self.maxconn:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"Tidak ada koneksi bebas dalam {self.timeout}s (max={self.maxconn})")
+                waited = True
+                self._cond.wait(remaining)
+            if self._idle:
+                conn, idle_since = self._idle.pop()
+            else:
+                conn, idle_since = None, None
+                self._size += 1
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            if waited:
+                wait = time.monotonic() - start
+                self._stats["waits"] += 1
+                self._stats["wait_time_total_s"] += wait
+                self._stats["wait_time_max_s"] = max(self._stats["wait_time_max_s"], wait)
+
+        try:
+            if conn is not None and not self._is_alive(conn, idle_since):
+                self._discard(conn)
+                conn = None
+                with self._cond:
+                    self._stats["reconnects"] += 1
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def putconn(self, conn, broken=False):
+        """Kembalikan koneksi; broken=True kalau koneksi rusak (akan dibuang)"""
+        with self._cond:
+            self._in_use -= 1
+        if not broken and not conn.closed:
+            try:
+                conn.rollback()  # Bersihkan transaksi yang masih terbuka
+            except psycopg2.Error:
+                broken = True
+        if broken or conn.closed:
+            self._discard(conn)
+            with self._cond:
+                self._size -= 1
+                self._stats["discarded"] += 1
+                self._cond.notify()
+            return
+        self._putconn(conn)
+
+    def _putconn(self, conn):
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                self._discard(conn)
+                return
+            self._idle.append((conn, now))
+            self._cond.notify()
+            # Idle dipakai LIFO: yang paling lama tidak dipakai ada di depan.
+            # Tutup yang melewati max_idle selama pool masih di atas minconn.
+            stale = []
+            while (self._size > self.minconn and len(self._idle) > 1
+                   and now - self._idle[0][1] > self.max_idle):
+                stale.append(self._idle.pop(0)[0])
+                self._size -= 1
+                self._stats["trimmed"] += 1
+        for old in stale:
+            self._discard(old)
+
+    @contextmanager
+    def connection(self):
+        """with pool.connection() as conn: ... (otomatis dikembalikan ke pool)"""
+        conn = self.getconn()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, broken=broken)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "min": self.minconn,
+                "max": self.maxconn,
+                "pid": self._pid,
+            })
+        stats["wait_time_avg_s"] = stats["wait_time_total_s"] / stats["waits"] if stats["waits"] else 0.0
+        return stats
@@ -0,0 +1,182 @@
+"""
+Enrichment spek tb_market_listings dalam satu command.
+
+Pengganti loop `UPDATE ... WHERE id = %s` per baris di migrate_add_specs.py
+dan migrate_complete_specs.py (N round trip ke Neon):
+- Hanya baris yang listing_title / price_idr-nya berubah sejak enrichment
+  terakhir yang diambil (kolom enriched_title / enriched_price)
+- Semua estimator (spec_rules: processor, camera, telephoto, refresh rate,
+  suitable_for) dihitung di process pool, satu scan per judul
+- Hasil di-COPY ke temp table lalu ditulis balik dengan SATU UPDATE set-based
+
+    python enrich_specs.py              # hanya baris berubah
+    python enrich_specs.py --all        # enrich ulang semua baris
+    python enrich_specs.py --workers 4
+"""
+import argparse
+import io
+import os
+import time
+from multiprocessing import Pool
+
+import psycopg2
+from dotenv import load_dotenv
+
+from spec_rules import derive, suitable_for
+
+load_dotenv()
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+BATCH_SIZE = 5000     # baris per batch (fetch + COPY)
+MIN_PARALLEL = 2000   # batch lebih kecil dihitung langsung, tidak lewat pool
+DEFAULT_BATTERY = 5000
+
+SPEC_COLUMNS = [
+    ("processor", "VARCHAR(100)"),
+    ("camera_mp", "INTEGER"),
+    ("telephoto", "BOOLEAN DEFAULT FALSE"),
+    ("refresh_rate", "INTEGER DEFAULT 60"),
+    ("suitable_for", "TEXT"),
+    # Input terakhir yang sudah di-enrich (untuk skip baris yang tidak berubah)
+    ("enriched_title", "TEXT"),
+    ("enriched_price", "NUMERIC"),
+]
+
+
+def enrich_row(row):
+    """(id, listing_title, price_idr) -> baris hasil untuk temp table"""
+    db_id, model_name, price_idr = row
+    model_name = model_name or ""
+    price = float(price_idr) if price_idr else 0
+    specs = derive(model_name)
+    return (
+        db_id,
+        specs["processor"],
+        specs["camera_mp"],
+        specs["telephoto"],
+        specs["refresh_rate"],
+        ",".join(suitable_for(specs, price, DEFAULT_BATTERY)),
+        row[1],
+        price_idr,
+    )
+
+
+def _copy_value(value):
+    """Satu nilai dalam format COPY text"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def _copy_buffer(results):
+    buf = io.StringIO()
+    for result in results:
+        buf.write("\t".join(_copy_value(v) for v in result))
+        buf.write("\n")
+    buf.seek(0)
+    return buf
+
+
+def ensure_columns(conn):
+    with conn.cursor() as cur:
+        for name, col_type in SPEC_COLUMNS:
+            cur.execute(f"ALTER TABLE tb_market_listings ADD COLUMN IF NOT EXISTS {name} {col_type}")
+    conn.commit()
+
+
+def enrich(full=False, workers=None, conn=None):
+    """Jalankan enrichment, return dict statistik"""
+    workers = workers or os.cpu_count() or 1
+    own_conn = conn is None
+    if own_conn:
+        print("🔌 Connecting to Neon...")
+        conn = psycopg2.connect(DATABASE_URL)
+
+    stats = {"rows": 0, "fetch_s": 0.0, "compute_s": 0.0, "write_s": 0.0}
+    started = time.perf_counter()
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        ensure_columns(conn)
+
+        with conn.cursor() as cur:
+            cur.execute("""
+                CREATE TEMP TABLE enrich_tmp ON COMMIT DROP AS
+                SELECT id, processor, camera_mp, telephoto, refresh_rate, suitable_for,
+                       enriched_title, enriched_price
+                FROM tb_market_listings WITH NO DATA
+            """)
+
+        where = "" if full else """
+            WHERE enriched_title IS DISTINCT FROM listing_title
+               OR enriched_price IS DISTINCT FROM price_idr
+        """
+        # Server-side cursor: baris diambil per batch, tidak fetchall()
+        with conn.cursor(name="enrich_rows") as src, conn.cursor() as cur:
+            src.itersize = BATCH_SIZE
+            src.execute(f"SELECT id, listing_title, price_idr FROM tb_market_listings {where}")
+            while True:
+                t0 = time.perf_counter()
+                batch = src.fetchmany(BATCH_SIZE)
+                t1 = time.perf_counter()
+                stats["fetch_s"] += t1 - t0
+                if not batch:
+                    break
+
+                if pool and len(batch) >= MIN_PARALLEL:
+                    results = pool.map(enrich_row, batch, chunksize=max(1, len(batch) // (workers * 4)))
+                else:
+                    results = [enrich_row(row) for row in batch]
+                t2 = time.perf_counter()
+                stats["compute_s"] += t2 - t1
+
+                cur.copy_expert("COPY enrich_tmp FROM STDIN", _copy_buffer(results))
+                stats["write_s"] += time.perf_counter() - t2
+                stats["rows"] += len(batch)
+
+        t0 = time.perf_counter()
+        with conn.cursor() as cur:
+            cur.execute("""
+                UPDATE tb_market_listings t
+                SET processor = e.processor,
+                    camera_mp = e.camera_mp,
+                    telephoto = e.telephoto,
+                    refresh_rate = e.refresh_rate,
+                    suitable_for = e.suitable_for,
+                    enriched_title = e.enriched_title,
+                    enriched_price = e.enriched_price
+                FROM enrich_tmp e
+                WHERE t.id = e.id
+            """)
+            stats["updated"] = cur.rowcount
+        conn.commit()
+        stats["write_s"] += time.perf_counter() - t0
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if own_conn:
+            conn.close()
+
+    stats["total_s"] = time.perf_counter() - started
+    stats["rows_per_s"] = stats["rows"] / stats["total_s"] if stats["total_s"] else 0.0
+    stats["workers"] = workers
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enrichment spek tb_market_listings (bulk)")
+    parser.add_argument("--all", action="store_true", help="enrich ulang semua baris")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default: jumlah CPU)")
+    args = parser.parse_args()
+
+    result = enrich(full=args.all, workers=args.workers)
+    print(f"✅ Done! Enriched {result['rows']} rows ({result['updated']} updated) "
+          f"in {result['total_s']:.2f}s -> {result['rows_per_s']:,.0f} rows/s "
+          f"[fetch {result['fetch_s']:.2f}s, compute {result['compute_s']:.2f}s "
+          f"x{result['workers']}, write {result['write_s']:.2f}s]")
@@ -0,0 +1,93 @@
+"""
+Fake Groq API lokal (OpenAI-compatible /chat/completions) untuk testing.
+
+Mendukung mode biasa dan stream=true (SSE), dengan delay per token supaya
+beda time-to-first-byte /chat vs /chat/stream kelihatan.
+
+    python fake_groq_server.py --port 8787 --tokens 40 --token-delay 0.05
+    GROQ_API_URL=http://127.0.0.1:8787/openai/v1/chat/completions python app.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(tokens=40, token_delay=0.05, first_token_delay=0.2):
+    words = [f"kata{i} " for i in range(tokens)]
+
+    class FakeGroqHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass  # Jangan spam stdout
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                time.sleep(first_token_delay)
+                for word in words:
+                    chunk = {"choices": [{"index": 0, "delta": {"content": word}}]}
+                    self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+                    time.sleep(token_delay)
+                self._write_chunk("data: [DONE]\n\n")
+                self._write_chunk("")
+                return
+
+            time.sleep(first_token_delay + token_delay * len(words))
+            # usage seperti Groq; prompt_tokens kasar (4 karakter per token)
+            prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4
+            payload = json.dumps({
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(words)}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                          "total_tokens": prompt_tokens + len(words)}
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _write_chunk(self, text):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+    return FakeGroqHandler
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    # Backlog default (5) bikin koneksi drop saat load test concurrency tinggi
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def start(port=0, **kwargs):
+    """Jalankan fake server di thread background, return (server, url)"""
+    server = FakeGroqServer(("127.0.0.1", port), make_handler(**kwargs))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/openai/v1/chat/completions"
+    return server, url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Groq API lokal")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = FakeGroqServer(("127.0.0.1", args.port), make_handler(
+        args.tokens, args.token_delay, args.first_token_delay))
+    print(f"🤖 Fake Groq running on http://127.0.0.1:{args.port}/openai/v1/chat/completions")
+    server.serve_forever()
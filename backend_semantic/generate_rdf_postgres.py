@@ -1,14 +1,41 @@
+"""
+Generate knowledge_base.ttl (+ snapshot biner) dari tb_market_listings.
+
+Mode incremental (default): baris dibaca lewat server-side cursor, tiap
+baris di-hash dan dibandingkan dengan manifest run sebelumnya. Triple baris
+yang tidak berubah disalin apa adanya dari file lama, hanya baris baru /
+berubah yang di-generate ulang. File ditulis sebagai N-Triples (subset valid
+Turtle) per blok baris, jadi memori tetap datar berapapun besar katalognya.
+
+    python generate_rdf_postgres.py          # incremental
+    python generate_rdf_postgres.py --full   # abaikan manifest, generate ulang semua
+"""
 import psycopg2
 import os
+import sys
+import json
+import time
+import hashlib
 from dotenv import load_dotenv
-from rdflib import Graph, Literal, RDF, URIRef, Namespace
+from rdflib import Literal, RDF, Namespace
 from rdflib.namespace import XSD, RDFS
+from spec_rules import derive
+from sparql_queries import brand_key
+from product_table import ProductTable
+from kg_snapshot import write_snapshot, file_sha256
 
 # Load environment variables
 load_dotenv()
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 OUTPUT_FILE = "knowledge_base.ttl"
+SNAPSHOT_FILE = "knowledge_base.kgsnap"
+MANIFEST_FILE = "knowledge_base.manifest.json"
+
+# Naikkan kalau rule spec_rules / bentuk triple berubah -> manifest lama
+# dianggap tidak valid dan semua baris di-generate ulang
+GENERATOR_VERSION = 1
+FETCH_BATCH = 2000  # itersize server-side cursor
 
 # Namespaces
 EX = Namespace("http://example.org/gadget#")
@@ -29,150 +56,230 @@ def estimate_location(store_name):
     if "mangga dua" in store: return "Jakarta Utara"
     return "Indonesia"
 
-def estimate_brand(model_name):
-    """Tebak brand dari nama model"""
-    m = model_name.lower()
-    if "samsung" in m or "galaxy" in m: return "Samsung"
-    elif "iphone" in m or "apple" in m or "ipad" in m or "macbook" in m: return "Apple"
-    elif "xiaomi" in m or "redmi" in m: return "Xiaomi"
-    elif "poco" in m: return "Poco"
-    elif "oppo" in m: return "OPPO"
-    elif "vivo" in m: return "Vivo"
-    elif "infinix" in m: return "Infinix"
-    elif "pixel" in m: return "Google"
-    elif "asus" in m or "rog" in m: return "Asus"
-    elif "realme" in m or "narzo" in m: return "Realme"
-    elif "tecno" in m: return "Tecno"
-    elif "itel" in m: return "Itel"
-    elif "nothing" in m: return "Nothing"
-    elif "sony" in m or "xperia" in m: return "Sony"
-    elif "huawei" in m or "matepad" in m: return "Huawei"
-    elif "zte" in m or "blade" in m: return "ZTE"
-    elif "nokia" in m: return "Nokia"
-    elif "lenovo" in m: return "Lenovo"
-    elif "msi" in m: return "MSI"
-    elif "nintendo" in m: return "Nintendo"
-    elif "playstation" in m or "ps5" in m: return "Sony"
-    elif "steam deck" in m: return "Valve"
-    return "Unknown"
-
-def estimate_ram_storage(model_name):
-    """Tebak RAM & Storage dari nama model"""
-    import re
-    m = model_name.lower()
-    ram = 8
-    storage = 128
-    
-    # Pattern: 8/256 or 8GB
-    ram_match = re.search(r'(\d+)\s*(?:gb|/)\s*', m)
-    if ram_match:
-        val = int(ram_match.group(1))
-        if val < 64:
-            ram = val
-    
-    storage_match = re.search(r'(?:/|)(\d+)\s*gb', m)
-    if storage_match:
-        val = int(storage_match.group(1))
-        if val > 16:
-            storage = val
-            
-    return ram, storage
-
-def generate_rdf():
+# --- N-TRIPLES ---
+
+ONTOLOGY = [
+    (EX.Smartphone, RDF.type, RDFS.Class),
+    (EX.hasModel, RDF.type, RDF.Property),
+    (EX.hasBrand, RDF.type, RDF.Property),
+    (EX.hasBrandKey, RDF.type, RDF.Property),    # Brand lowercase (filter SPARQL)
+    (EX.hasRAM, RDF.type, RDF.Property),
+    (EX.hasStorage, RDF.type, RDF.Property),
+    (EX.hasProcessor, RDF.type, RDF.Property),
+    (EX.hasMainCamera, RDF.type, RDF.Property),
+    (EX.hasTelephoto, RDF.type, RDF.Property),      # NEW
+    (EX.hasRefreshRate, RDF.type, RDF.Property),    # NEW
+    (EX.suitableFor, RDF.type, RDF.Property),       # NEW
+    (EX.batteryCapacity, RDF.type, RDF.Property),
+    (EX.soldBy, RDF.type, RDF.Property),
+    (EX.locatedIn, RDF.type, RDF.Property),
+    (EX.hasPrice, RDF.type, RDF.Property),
+]
+
+_NT_ESCAPES = {"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"}
+
+
+def nt_term(term):
+    """Satu term rdflib dalam sintaks N-Triples"""
+    if isinstance(term, Literal):
+        text = "".join(_NT_ESCAPES.get(ch, ch) for ch in str(term))
+        if term.language:
+            return f'"{text}"@{term.language}'
+        if term.datatype:
+            return f'"{text}"^^<{term.datatype}>'
+        return f'"{text}"'
+    return f"<{term}>"
+
+
+def nt_block(triples):
+    return "".join(f"{nt_term(s)} {nt_term(p)} {nt_term(o)} .\n" for s, p, o in triples).encode("utf-8")
+
+
+# --- ROW -> TRIPLES ---
+
+SELECT_ROWS = """
+    SELECT id, listing_title, store_name, price_idr,
+           processor, camera_mp, telephoto, refresh_rate, suitable_for
+    FROM tb_market_listings
+"""
+
+
+def row_hash(row):
+    """Hash isi baris (berubah kalau kolom apapun berubah)"""
+    return hashlib.blake2b(json.dumps(row, default=str).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def row_product(row):
+    """Nilai product table satu baris (murah, dihitung untuk semua baris)"""
+    model_name = row[1]
+    specs = derive(model_name)
+    # Satu subject bisa muncul di beberapa baris (model sama, toko beda);
+    # di Graph triple-nya digabung, di product table baris terakhir menang
+    return {
+        "sku": f"sku_{clean_string(model_name)}".replace("sku_", ""),
+        "model": model_name,
+        "brand": specs["brand"],
+        "ram": specs["ram"],
+        "processor": row[4] if row[4] else "Unknown",
+        "storage": specs["storage"],
+    }
+
+
+def row_triples(row, product):
+    """Triple satu baris listing (hanya untuk baris baru / berubah)"""
+    model_name = row[1]
+    store_name = row[2] if row[2] else "Unknown Store"
+    price = float(row[3]) if row[3] else 0
+    db_camera = row[5] if row[5] else 0
+    db_telephoto = row[6] if row[6] is not None else False
+    db_refresh_rate = row[7] if row[7] else 60
+    db_suitable_for = row[8] if row[8] else ""
+
+    # Buat Subject URI
+    subject = EX[f"sku_{clean_string(model_name)}"]
+    brand = product["brand"]
+    location = estimate_location(store_name)
+
+    # Triples (LENGKAP)
+    triples = [
+        (subject, RDF.type, EX.Smartphone),
+        (subject, RDFS.label, Literal(model_name)),
+        (subject, EX.hasModel, Literal(model_name)),
+        (subject, EX.hasBrand, Literal(brand)),
+        (subject, EX.hasBrandKey, Literal(brand_key(brand))),
+        (subject, EX.hasPrice, Literal(int(price), datatype=XSD.integer)),
+        (subject, EX.soldBy, Literal(store_name)),
+        (subject, EX.locatedIn, Literal(location)),
+        (subject, EX.hasRAM, Literal(product["ram"], datatype=XSD.integer)),
+        (subject, EX.hasStorage, Literal(product["storage"], datatype=XSD.integer)),
+        (subject, EX.hasProcessor, Literal(product["processor"])),
+        (subject, EX.hasMainCamera, Literal(db_camera, datatype=XSD.integer)),
+        (subject, EX.hasTelephoto, Literal(db_telephoto)),
+        (subject, EX.hasRefreshRate, Literal(db_refresh_rate, datatype=XSD.integer)),
+        (subject, EX.batteryCapacity, Literal(5000, datatype=XSD.integer)),  # Default
+    ]
+
+    # Add suitableFor tags (multiple values possible)
+    if db_suitable_for:
+        for tag in db_suitable_for.split(","):
+            if tag.strip():
+                triples.append((subject, EX.suitableFor, Literal(tag.strip())))
+    return triples
+
+
+# --- MANIFEST ---
+
+def load_manifest():
+    """Manifest run sebelumnya, None kalau tidak ada / tidak cocok dengan file output"""
+    try:
+        with open(MANIFEST_FILE, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("generator_version") != GENERATOR_VERSION:
+        return None
+    try:
+        if manifest.get("output_sha256") != file_sha256(OUTPUT_FILE):
+            return None  # File output diedit / diganti di luar generator
+    except OSError:
+        return None
+    return manifest
+
+
+def write_manifest(rows, output_sha256):
+    tmp_path = f"{MANIFEST_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "generator_version": GENERATOR_VERSION,
+            "output_sha256": output_sha256,
+            "rows": rows,  # id -> [hash, offset, length] blok di file output
+        }, f)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+
+def generate_rdf(full=False):
     print(f"🔌 Connecting to DB to fetch products...")
-    
+    started = time.perf_counter()
+
+    manifest = None if full else load_manifest()
+    old_rows = manifest["rows"] if manifest else {}
+    if manifest:
+        print(f"📒 Manifest found: {len(old_rows)} rows, incremental mode")
+    else:
+        print("📒 No usable manifest, full regeneration")
+
     try:
         conn = psycopg2.connect(DATABASE_URL)
-        cur = conn.cursor()
-        
-        # FETCH SEMUA KOLOM LENGKAP
-        cur.execute("""
-            SELECT id, listing_title, store_name, price_idr, 
-                   processor, camera_mp, telephoto, refresh_rate, suitable_for
-            FROM tb_market_listings
-        """)
-        rows = cur.fetchall()
-        
-        # Init Graph
-        g = Graph()
-        g.bind("ex", EX)
-        g.bind("schema", SCHEMA)
-        
-        # Definisi Ontology Lengkap
-        g.add((EX.Smartphone, RDF.type, RDFS.Class))
-        g.add((EX.hasModel, RDF.type, RDF.Property))
-        g.add((EX.hasBrand, RDF.type, RDF.Property))
-        g.add((EX.hasRAM, RDF.type, RDF.Property))
-        g.add((EX.hasStorage, RDF.type, RDF.Property))
-        g.add((EX.hasProcessor, RDF.type, RDF.Property))
-        g.add((EX.hasMainCamera, RDF.type, RDF.Property))
-        g.add((EX.hasTelephoto, RDF.type, RDF.Property))      # NEW
-        g.add((EX.hasRefreshRate, RDF.type, RDF.Property))    # NEW
-        g.add((EX.suitableFor, RDF.type, RDF.Property))       # NEW
-        g.add((EX.batteryCapacity, RDF.type, RDF.Property))
-        g.add((EX.soldBy, RDF.type, RDF.Property))
-        g.add((EX.locatedIn, RDF.type, RDF.Property))
-        g.add((EX.hasPrice, RDF.type, RDF.Property))
-
-        print(f"🔄 Processing {len(rows)} products...")
-        
-        count = 0
-        for row in rows:
-            db_id = row[0]
-            model_name = row[1]
-            store_name = row[2] if row[2] else "Unknown Store"
-            price = float(row[3]) if row[3] else 0
-            db_processor = row[4] if row[4] else "Unknown"
-            db_camera = row[5] if row[5] else 0
-            db_telephoto = row[6] if row[6] is not None else False
-            db_refresh_rate = row[7] if row[7] else 60
-            db_suitable_for = row[8] if row[8] else ""
-            
-            # Buat Subject URI
-            clean_id = clean_string(model_name)
-            subject = EX[f"sku_{clean_id}"]
-            
-            # Estimate yang tidak ada di DB
-            brand = estimate_brand(model_name)
-            location = estimate_location(store_name)
-            ram, storage = estimate_ram_storage(model_name)
-            
-            # Tambahkan Triples (LENGKAP)
-            g.add((subject, RDF.type, EX.Smartphone))
-            g.add((subject, RDFS.label, Literal(model_name)))
-            g.add((subject, EX.hasModel, Literal(model_name)))
-            g.add((subject, EX.hasBrand, Literal(brand)))
-            g.add((subject, EX.hasPrice, Literal(int(price), datatype=XSD.integer)))
-            g.add((subject, EX.soldBy, Literal(store_name)))
-            g.add((subject, EX.locatedIn, Literal(location)))
-            g.add((subject, EX.hasRAM, Literal(ram, datatype=XSD.integer)))
-            g.add((subject, EX.hasStorage, Literal(storage, datatype=XSD.integer)))
-            g.add((subject, EX.hasProcessor, Literal(db_processor)))
-            g.add((subject, EX.hasMainCamera, Literal(db_camera, datatype=XSD.integer)))
-            g.add((subject, EX.hasTelephoto, Literal(db_telephoto)))
-            g.add((subject, EX.hasRefreshRate, Literal(db_refresh_rate, datatype=XSD.integer)))
-            g.add((subject, EX.batteryCapacity, Literal(5000, datatype=XSD.integer)))  # Default
-            
-            # Add suitableFor tags (multiple values possible)
-            if db_suitable_for:
-                for tag in db_suitable_for.split(","):
-                    if tag.strip():
-                        g.add((subject, EX.suitableFor, Literal(tag.strip())))
-            
-            count += 1
-
-        # Save to file
-        g.serialize(destination=OUTPUT_FILE, format="turtle")
-        print(f"✅ Success! Generated {count} items into '{OUTPUT_FILE}'")
-        print("💡 Restart your backend app (`python app.py`) to load these changes.")
-        
+        # Server-side (named) cursor: baris di-stream per batch, bukan fetchall()
+        cur = conn.cursor(name="rdf_export")
+        cur.itersize = FETCH_BATCH
+        cur.execute(SELECT_ROWS + " ORDER BY id")
+
+        new_rows = {}
+        products = {}
+        stats = {"rows": 0, "regenerated": 0, "copied": 0}
+        tmp_path = f"{OUTPUT_FILE}.tmp"
+        old_file = open(OUTPUT_FILE, "rb") if manifest else None
+        try:
+            with open(tmp_path, "wb") as out:
+                out.write(nt_block(ONTOLOGY))
+
+                for row in cur:
+                    key = str(row[0])
+                    digest = row_hash(row)
+                    product = row_product(row)
+                    products.pop(product["sku"], None)  # Baris terakhir menang (urutan id)
+                    products[product["sku"]] = product
+
+                    old = old_rows.get(key)
+                    if old and old[0] == digest:
+                        old_file.seek(old[1])
+                        block = old_file.read(old[2])
+                        stats["copied"] += 1
+                    else:
+                        block = nt_block(row_triples(row, product))
+                        stats["regenerated"] += 1
+
+                    new_rows[key] = [digest, out.tell(), len(block)]
+                    out.write(block)
+                    stats["rows"] += 1
+        except BaseException:
+            # File .tmp setengah jadi jangan tertinggal di disk
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            if old_file:
+                old_file.close()
+
         cur.close()
         conn.close()
 
+        stats["deleted"] = len(old_rows.keys() - new_rows.keys())
+        if manifest and stats["regenerated"] == 0 and stats["deleted"] == 0:
+            os.remove(tmp_path)
+            print(f"✅ No changes ({stats['rows']} rows), '{OUTPUT_FILE}' untouched")
+            return stats
+
+        os.replace(tmp_path, OUTPUT_FILE)
+        write_manifest(new_rows, file_sha256(OUTPUT_FILE))
+        print(f"✅ Success! {stats['rows']} rows into '{OUTPUT_FILE}' "
+              f"({stats['regenerated']} regenerated, {stats['copied']} unchanged, "
+              f"{stats['deleted']} deleted) in {time.perf_counter() - started:.1f}s")
+
+        # Snapshot biner untuk cold start cepat (app.py fallback ke Turtle kalau basi)
+        table = ProductTable()
+        for product in products.values():
+            table.add(**product)
+        write_snapshot(table, SNAPSHOT_FILE, source_path=OUTPUT_FILE)
+        print(f"✅ Snapshot written to '{SNAPSHOT_FILE}'")
+        print("💡 Backend yang sedang jalan memuat versi baru otomatis (KG_RELOAD_INTERVAL).")
+        return stats
+
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
         traceback.print_exc()
 
 if __name__ == "__main__":
-    generate_rdf()
+    generate_rdf(full="--full" in sys.argv)
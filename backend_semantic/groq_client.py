@@ -0,0 +1,247 @@
+"""
+HTTP client bersama untuk Groq API.
+
+- Satu requests.Session keep-alive (connection pool) untuk seluruh proses,
+  jadi TLS handshake tidak diulang tiap chat
+- Timeout connect/read, request yang hang tidak menahan worker selamanya
+- Retry terbatas dengan exponential backoff + jitter untuk 429/5xx
+  (menghormati header Retry-After)
+- Circuit breaker: setelah beberapa kegagalan beruntun, request langsung
+  ditolak (fail fast) sampai masa reset lewat, lalu dicoba satu request uji
+
+AsyncGroqClient = kebijakan yang sama di atas httpx.AsyncClient (mode ASGI,
+app_async.py). httpx opsional, lihat requirements-async.txt.
+"""
+import asyncio
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Groq dianggap sedang bermasalah, request ditolak tanpa dikirim"""
+
+
+class CircuitBreaker:
+    """closed -> (gagal >= threshold) -> open -> (reset_timeout) -> half_open"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._stats = {"opened": 0, "rejected": 0}
+
+    def allow(self):
+        """True kalau request boleh dikirim sekarang"""
+        with self._lock:
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self._stats["rejected"] += 1
+                    return False
+                self._state = "half_open"
+                self._trial_running = False
+            if self._state == "half_open":
+                # Hanya satu request uji; sisanya tetap ditolak
+                if self._trial_running:
+                    self._stats["rejected"] += 1
+                    return False
+                self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._trial_running = False
+
+    def release_trial(self):
+        """Request uji half-open batal tanpa hasil (dibatalkan): request berikutnya boleh jadi uji"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self._stats["opened"] += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, state=self._state, consecutive_failures=self._failures)
+
+
+class _RetryingClient:
+    """Konfigurasi retry/backoff + statistik bersama untuk client sync & async"""
+
+    def __init__(self, url, connect_timeout=3.05, read_timeout=30.0, max_retries=2,
+                 backoff_base=0.5, backoff_max=8.0, breaker=None):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "failures": 0, "timeouts": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _backoff(self, attempt, resp=None):
+        """Full jitter: sleep acak 0..min(max, base * 2^attempt), atau Retry-After"""
+        if resp is not None:
+            retry_after = resp.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max)
+                except ValueError:
+                    pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["circuit"] = self.breaker.stats()
+        return stats
+
+
+class GroqClient(_RetryingClient):
+    def __init__(self, url, pool_size=10, **kwargs):
+        super().__init__(url, **kwargs)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, payload, headers=None, stream=False):
+        """
+        POST ke Groq dengan retry + circuit breaker.
+        Return Response terakhir (status apapun); raise CircuitOpenError kalau
+        breaker terbuka, atau exception requests kalau semua percobaan gagal.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("Groq sedang gangguan, request ditolak sementara (circuit open)")
+
+        try:
+            return self._post(payload, headers, stream)
+        except Exception:
+            # Exception apapun (ChunkedEncodingError, JSON rusak, ...) dicatat gagal,
+            # supaya request uji half-open tidak menggantung breaker selamanya
+            self._count("failures")
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release_trial()
+            raise
+
+    def _post(self, payload, headers, stream):
+        attempt = 0
+        while True:
+            self._count("requests")
+            try:
+                resp = self.session.post(self.url, json=payload, headers=headers,
+                                         timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if isinstance(e, requests.Timeout):
+                    self._count("timeouts")
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                self._count("retries")
+                continue
+
+            if resp.status_code in RETRY_STATUS:
+                if attempt >= self.max_retries:
+                    self._count("failures")
+                    self.breaker.record_failure()
+                    return resp
+                delay = self._backoff(attempt, resp)
+                resp.close()
+                time.sleep(delay)
+                attempt += 1
+                self._count("retries")
+                continue
+
+            # 2xx / 4xx lain: Groq sehat (4xx = salah request kita, bukan gangguan)
+            self.breaker.record_success()
+            return resp
+
+
+class AsyncGroqClient(_RetryingClient):
+    """Sama dengan GroqClient, tapi non-blocking (httpx.AsyncClient)"""
+
+    def __init__(self, url, pool_size=100, **kwargs):
+        import httpx  # Dependency opsional mode async
+
+        super().__init__(url, **kwargs)
+        self._httpx = httpx
+        connect_timeout, read_timeout = self.timeout
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def post(self, payload, headers=None):
+        """POST ke Groq dengan retry + circuit breaker (lihat GroqClient.post)"""
+        if not self.breaker.allow():
+            raise CircuitOpenError("Groq sedang gangguan, request ditolak sementara (circuit open)")
+
+        try:
+            return await self._post(payload, headers)
+        except Exception:
+            self._count("failures")
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # CancelledError (client putus): bukan kegagalan Groq, tapi slot uji dilepas
+            self.breaker.release_trial()
+            raise
+
+    async def _post(self, payload, headers):
+        httpx = self._httpx
+        attempt = 0
+        while True:
+            self._count("requests")
+            try:
+                resp = await self.client.post(self.url, json=payload, headers=headers)
+            except httpx.TransportError as e:
+                if isinstance(e, httpx.TimeoutException):
+                    self._count("timeouts")
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                self._count("retries")
+                continue
+
+            if resp.status_code in RETRY_STATUS:
+                if attempt >= self.max_retries:
+                    self._count("failures")
+                    self.breaker.record_failure()
+                    return resp
+                await asyncio.sleep(self._backoff(attempt, resp))
+                attempt += 1
+                self._count("retries")
+                continue
+
+            self.breaker.record_success()
+            return resp
+
+    async def aclose(self):
+        await self.client.aclose()
@@ -0,0 +1,55 @@
+"""
+Konfigurasi gunicorn: katalog dibangun SEKALI di master lalu dibagi ke worker.
+
+    gunicorn -c gunicorn_shared.conf.py app:app
+
+Tanpa --preload tiap worker load KG + bangun index sendiri (N salinan).
+Dengan preload saja, salinan dari master pelan-pelan ter-copy lagi
+(copy-on-write) karena CPython menulis ke object yang hanya dibaca:
+refcount naik-turun tiap string di-loop, dan GC menulis header object
+saat koleksi generasi tua. Di sini:
+
+- SHARED_CATALOG=1: product table pakai kolom flat (product_table.FlatStrings),
+  Graph rdflib dibuang -> hampir tidak ada object Python per produk
+- gc.freeze() sebelum fork: object master dipindah ke generasi permanen,
+  GC worker tidak menyentuh page-nya
+- hot reload KG (KG_RELOAD_INTERVAL) hanya di master: kalau tiap worker
+  reload sendiri, tiap worker memegang salinan privat dan sharing hilang
+  setelah reload pertama. Master load KG baru lalu kirim SIGHUP ke dirinya
+  sendiri: gunicorn menyalakan worker baru (fork dari master yang sudah
+  memegang KG baru) dan mematikan worker lama dengan graceful. Request yang
+  sedang jalan di worker lama selesai dengan KG lama.
+
+Ukur RSS/PSS per worker: benchmarks/bench_workers.py. Nama file sengaja
+bukan gunicorn.conf.py supaya tidak otomatis dipakai `gunicorn app:app`.
+"""
+import gc
+import os
+import signal
+
+os.environ.setdefault("SHARED_CATALOG", "1")
+
+preload_app = True
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+
+
+def _recycle_workers(server):
+    master_pid = os.getpid()
+
+    def recycle():
+        server.log.info("♻️ KG baru dimuat di master, worker di-recycle (SIGHUP)")
+        os.kill(master_pid, signal.SIGHUP)
+    return recycle
+
+
+def when_ready(server):
+    server.log.info("🧊 Katalog dimuat di master (preload, SHARED_CATALOG=%s)", os.environ["SHARED_CATALOG"])
+    # Modul app sudah di-import master (preload); app_async memakai reloader yang sama
+    import app
+    app.kg_reloader.restart_after_fork = False
+    app.kg_reloader.on_reload = _recycle_workers(server)
+
+
+def pre_fork(server, worker):
+    # Object hasil preload tidak akan di-scan / ditulis GC worker
+    gc.freeze()
@@ -0,0 +1,305 @@
+"""
+Intent engine untuk pesan user.
+
+Semua keyword (brand, use-case, budget) ada di SATU tabel deklaratif di bawah.
+Tabel itu di-compile jadi index keyword -> brand/rule. Scan = cek substring
+tiap keyword lalu lookup index, jadi menambah brand / use case cukup satu
+baris tabel (bukan if-chain baru). Ini soal maintainability, bukan
+kecepatan: jumlah cek `in` sama dengan if-chain lama, hasil
+benchmarks/bench_intent.py sedikit lebih lambat. Satu regex trie besar
+lebih lambat lagi (engine regex CPython mencoba alternation di tiap posisi).
+
+Tabel brand juga dipakai spec_rules (brand produk di Knowledge Graph) supaya
+brand di KG dan brand dari pertanyaan user selalu sinkron.
+
+Catatan matching: keyword dicocokkan sebagai substring dari teks lowercase yang
+diberi spasi di awal & akhir. Spasi di keyword berarti batas kata, contoh
+" rog " tidak match "program", " pixel" tidak match "megapixel".
+"""
+import re
+
+# --- TABEL BRAND ---
+# Urutan = prioritas (brand pertama yang match menang).
+# Alias berupa tuple artinya SEMUA kata harus muncul (misal "hp" + "victus").
+BRAND_ALIASES = [
+    ("Samsung", ["samsung", "galaxy"]),
+    ("Apple", ["iphone", "apple", "ipad", "macbook"]),
+    ("Xiaomi", ["xiaomi", "redmi"]),
+    ("Poco", ["poco"]),
+    ("OPPO", ["oppo"]),
+    ("Vivo", ["vivo"]),
+    ("Infinix", ["infinix"]),
+    ("Google", [" pixel"]),
+    ("Asus", ["asus", " rog "]),
+    ("Realme", ["realme", "narzo"]),
+    ("Tecno", ["tecno"]),
+    ("Itel", ["itel"]),
+    ("Nothing", ["nothing"]),
+    ("Sony", ["sony", "xperia", "playstation", "ps5"]),
+    ("Huawei", ["huawei", "matepad"]),
+    ("ZTE", ["zte", "blade"]),
+    ("Nokia", ["nokia"]),
+    ("Lenovo", ["lenovo"]),
+    ("MSI", ["msi"]),
+    ("Acer", ["acer"]),
+    ("HP", [("hp", "victus")]),
+    ("Nintendo", ["nintendo"]),
+    ("Valve", [("steam", "deck")]),
+]
+
+# --- TABEL USE CASE ---
+# Dievaluasi berurutan (sama seperti if-chain lama):
+# - min_ram: menimpa nilai sebelumnya
+# - budget: hanya dipakai kalau budget masih 0
+USE_CASE_RULES = [
+    {"keywords": ["gaming", "game", "pubg", "ml"], "tag": "🎮 Gaming",
+     "min_ram": 8, "is_gaming": True},
+    {"keywords": ["konser", "zoom"], "tag": "📸 Concert Camera",
+     "is_concert": True},
+    {"keywords": ["ojol", "ojek", "gojek", "grab", "driver"], "tag": "🚴 Ojol (Baterai Awet)",
+     "budget": 3000000, "is_affordable": True},
+    {"keywords": ["kuliah", "mahasiswa", "campus", "pelajar"], "tag": "📚 Kuliah/Sekolah",
+     "budget": 4000000, "min_ram": 6, "is_affordable": True},
+    {"keywords": ["orang tua", "lansia", "ibu", "bapak", "ortu"], "tag": "👴 Orang Tua (User Friendly)",
+     "budget": 2500000, "is_affordable": True},
+    {"keywords": ["foto", "kamera", "photography", "selfie"], "tag": "📷 Fotografi",
+     "is_concert": True},
+    {"keywords": ["tahan air", "waterproof", "ip68", "outdoor"], "tag": "💧 Tahan Air (IP Rating)",
+     "is_concert": True},
+    {"keywords": ["video call", "zoom meeting", "wfh", "kerja"], "tag": "💼 WFH/Video Call",
+     "min_ram": 6},
+    {"keywords": ["streaming", "netflix", "youtube", "nonton"], "tag": "📺 Streaming",
+     "min_ram": 4},
+    {"keywords": ["bisnis", "profesional", "kantor", "meeting"], "tag": "💼 Bisnis/Profesional",
+     "min_ram": 8},
+    {"keywords": ["anak", "kids"], "tag": "👶 Untuk Anak",
+     "budget": 2000000, "is_affordable": True},
+    # Affordable umum: budget implisit 5 juta kalau user tidak sebut angka
+    {"keywords": ["murah", "terjangkau", "affordable", "budget"], "tag": None,
+     "budget": 5000000, "is_affordable": True},
+]
+
+# Budget eksplisit ("5 juta") selalu menimpa budget dari use case
+BUDGET_PATTERN = r"(?P<juta>\d+)\s*juta"
+BUDGET_UNIT = 1000000
+
+
+def _all_keywords():
+    keywords = set()
+    for _, aliases in BRAND_ALIASES:
+        for alias in aliases:
+            keywords.update(alias if isinstance(alias, tuple) else (alias,))
+    for rule in USE_CASE_RULES:
+        keywords.update(rule["keywords"])
+    return keywords
+
+
+def trie_regex(words):
+    """Gabungkan kata-kata jadi satu regex berbentuk trie (match terpanjang)"""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+def overlap_partners(keywords):
+    """
+    Pasangan (a, b) di mana akhiran a = awalan b (dan b bukan substring a).
+    Scan regex non-overlapping bisa melewatkan b kalau a match duluan, jadi
+    untuk pasangan ini dicek ulang dengan `b in text` (jarang terjadi).
+    """
+    partners = {}
+    for a in keywords:
+        for b in keywords:
+            if b in a:
+                continue
+            if any(a.endswith(b[:i]) for i in range(1, min(len(a), len(b)))):
+                partners.setdefault(a, []).append(b)
+    return partners
+
+
+def compile_matcher():
+    """Compile tabel keyword jadi tuple keyword untuk scan + tabel aksi per keyword"""
+    keywords = _all_keywords()
+
+    # keyword -> rule USE_CASE_RULES yang dipicu
+    rule_index = {}
+    for idx, rule in enumerate(USE_CASE_RULES):
+        for kw in rule["keywords"]:
+            rule_index.setdefault(kw, set()).add(idx)
+
+    # keyword -> prioritas brand (alias tunggal); alias tuple dicek terpisah
+    brand_index = {}
+    brand_combos = []
+    for priority, (_, aliases) in enumerate(BRAND_ALIASES):
+        for alias in aliases:
+            if isinstance(alias, tuple):
+                brand_combos.append((priority, frozenset(alias)))
+            else:
+                brand_index.setdefault(alias, priority)
+
+    return {
+        "keywords": tuple(sorted(keywords)),
+        "actions": {kw: (brand_index.get(kw), frozenset(rule_index.get(kw, ()))) for kw in keywords},
+        "budget": re.compile(BUDGET_PATTERN),
+        "brand_combos": brand_combos,
+    }
+
+
+_MATCHER = compile_matcher()
+
+
+def _scan(text):
+    """Satu pass keyword -> (keyword, prioritas brand terbaik, index rule, angka budget)"""
+    text = f" {text.lower()} "
+    actions = _MATCHER["actions"]
+    # Substring, sama seperti if-chain lama: keyword di dalam keyword lain
+    # ("zoom" di "zoom meeting") otomatis ikut ketemu
+    found = {kw for kw in _MATCHER["keywords"] if kw in text}
+    brand = None
+    rules = set()
+    for kw in found:
+        kw_brand, kw_rules = actions[kw]
+        if kw_rules:
+            rules |= kw_rules
+        if kw_brand is not None and (brand is None or kw_brand < brand):
+            brand = kw_brand
+
+    for priority, combo in _MATCHER["brand_combos"]:
+        if (brand is None or priority < brand) and combo <= found:
+            brand = priority
+    budget_match = _MATCHER["budget"].search(text)
+    budget_value = int(budget_match.group("juta")) if budget_match else None
+    return found, brand, rules, budget_value
+
+
+def find_keywords(text):
+    """Set keyword yang muncul di teks + angka budget pertama (atau None)"""
+    found, _, _, budget_value = _scan(text)
+    return found, budget_value
+
+
+def detect_brand(text):
+    """Brand pertama (urut prioritas tabel) yang disebut di teks, atau None"""
+    brand = _scan(text)[1]
+    return BRAND_ALIASES[brand][0] if brand is not None else None
+
+
+def parse_intent(user_query):
+    """Ekstrak brand, use-case tags, RAM minimal dan budget dalam satu pass"""
+    _, brand, rules, budget_value = _scan(user_query)
+
+    intent = {
+        "brand": BRAND_ALIASES[brand][0] if brand is not None else None,
+        "min_ram": 0,
+        "budget": 0,
+        "is_concert": False,
+        "is_gaming": False,
+        "is_affordable": False,
+        "use_case_tags": [],
+    }
+
+    for idx in sorted(rules):
+        rule = USE_CASE_RULES[idx]
+        if "min_ram" in rule:
+            intent["min_ram"] = rule["min_ram"]
+        if "budget" in rule and intent["budget"] == 0:
+            intent["budget"] = rule["budget"]
+        for flag in ("is_concert", "is_gaming", "is_affordable"):
+            if rule.get(flag):
+                intent[flag] = True
+        if rule["tag"]:
+            intent["use_case_tags"].append(rule["tag"])
+
+    if budget_value is not None:
+        intent["budget"] = budget_value * BUDGET_UNIT
+
+    return intent
+
+
+# --- TEKS SISA (pencarian model fuzzy, lihat ngram_index.py) ---
+# Kata percakapan yang bukan nama produk. Jangan masukkan kata yang ada di
+# nama model ("pro", "max", "plus", "ultra", "mini", "note", ...).
+FILLER_WORDS = frozenset([
+    "hp", "hape", "handphone", "ponsel", "smartphone", "buat", "untuk", "yang", "yg", "dan",
+    "atau", "rekomendasi", "rekomen", "saran", "cari", "carikan", "mau", "pengen", "ingin",
+    "ada", "dong", "ya", "kak", "gan", "min", "tolong", "apa", "harga", "berapa", "bagus",
+    "terbaik", "paling", "di", "ke", "dengan", "sama", "aja", "saja", "sekitar", "kisaran",
+    "dibawah", "bawah", "maksimal", "jt", "rb", "ribu", "juta", "baru", "bekas", "second",
+])
+
+_USE_CASE_WORDS = re.compile(r"\b(?:" + "|".join(sorted(
+    (re.escape(kw) for rule in USE_CASE_RULES for kw in rule["keywords"]), key=len, reverse=True)) + r")\b")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def residual_text(user_query):
+    """Teks user tanpa budget, keyword use-case dan kata filler (sisanya sebutan produk)"""
+    text = re.sub(BUDGET_PATTERN, " ", user_query.lower())
+    text = _USE_CASE_WORDS.sub(" ", text)
+    return " ".join(word for word in _WORD.findall(text) if word not in FILLER_WORDS)
+
+
+# --- FOLLOW-UP (pertanyaan lanjutan dalam session, lihat session_store.py) ---
+# "yang lebih murah?", "kalau yang 256gb?", "ram 12 aja", "di bawah 4 juta dong"
+_CHEAPER = re.compile(r"\b(?:lebih\s+(?:murah|hemat)|termurah|murahan|(?:yang|yg)\s+murah)\b")
+_PRICIER = re.compile(r"\b(?:lebih\s+(?:mahal|bagus|tinggi)|termahal|upgrade)\b")
+_MEMORY_SIZE = re.compile(r"\b(?P<size>\d{1,4})\s*(?P<unit>gb|tb)\b")
+_RAM_SIZE = re.compile(r"\bram\s*(?P<size>\d{1,2})\b|\b(?P<size2>\d{1,2})\s*gb\s*ram\b")
+# Ukuran >= ini dianggap storage, di bawahnya RAM ("12gb" vs "256gb")
+MIN_STORAGE_GB = 32
+
+# Kata penghubung percakapan di follow-up ("kalau yang pro max?")
+FOLLOW_UP_WORDS = frozenset([
+    "kalau", "kalo", "klo", "gimana", "bagaimana", "itu", "tadi", "lain", "lainnya",
+    "versi", "varian", "tipe", "seri", "lebih", "lagi", "gb", "tb", "ram",
+])
+
+
+def parse_refinement(user_query):
+    """
+    Constraint tambahan dari pesan follow-up: cheaper/pricier, storage, min_ram,
+    budget. None kalau pesan tidak menyempitkan apa-apa.
+    """
+    text = user_query.lower()
+    refinement = {}
+    if _CHEAPER.search(text):
+        refinement["cheaper"] = True
+    elif _PRICIER.search(text):
+        refinement["pricier"] = True
+
+    for match in _RAM_SIZE.finditer(text):
+        refinement["min_ram"] = int(match.group("size") or match.group("size2"))
+    for match in _MEMORY_SIZE.finditer(text):
+        gb = int(match.group("size")) * (1024 if match.group("unit") == "tb" else 1)
+        if gb >= MIN_STORAGE_GB:
+            refinement["storage"] = gb
+        else:
+            refinement.setdefault("min_ram", gb)
+
+    budget = re.search(BUDGET_PATTERN, text)
+    if budget:
+        refinement["budget"] = int(budget.group("juta")) * BUDGET_UNIT
+    return refinement or None
+
+
+def follow_up_text(user_query):
+    """residual_text tanpa frasa refinement ("lebih mahal", "ram 4", "256gb")"""
+    text = user_query.lower()
+    for pattern in (_CHEAPER, _PRICIER, _RAM_SIZE, _MEMORY_SIZE):
+        text = pattern.sub(" ", text)
+    return residual_text(text)
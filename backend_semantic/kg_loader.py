@@ -0,0 +1,254 @@
+"""
+Load Knowledge Graph (snapshot biner -> fallback Turtle) + hot reload.
+
+KnowledgeGraph adalah satu objek immutable berisi semua yang dipakai request
+(product table, Graph untuk fallback SPARQL, versi). app.py memegang satu
+referensi `kg`; request membaca referensi itu sekali, jadi reload cukup
+mengganti referensinya (atomic) dan request yang sedang jalan tetap memakai
+versi lama sampai selesai.
+
+KGReloader (thread background) mengecek mtime/ukuran knowledge_base.ttl dan
+snapshot-nya tiap `interval` detik. Kalau berubah dan sha256 TTL beda dari
+versi aktif, KG baru di-load di thread itu (bukan di jalur request), lalu
+di-swap. Worker tidak perlu restart setelah generate_rdf_postgres.py jalan.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from rdflib import Graph
+
+import kg_snapshot
+import ngram_index
+import prompt_builder
+import sparql_queries
+from market_sql import model_key
+from product_table import ProductTable, deep_sizeof
+
+log = logging.getLogger("gadgetbot.kg")
+
+KnowledgeGraph = namedtuple("KnowledgeGraph", [
+    "product_table",  # ProductTable, None kalau compile gagal (fallback SPARQL)
+    "graph",          # rdflib Graph (kosong kalau dimuat dari snapshot)
+    "source",         # "snapshot" / "turtle" / None (gagal load)
+    "version",        # sha256 file Turtle (12 hex pertama)
+    "memory",
+    "loaded_at",      # time.time()
+    "load_seconds",
+    "text_index",     # ngram_index.NgramIndex nama model, None kalau numpy/scipy tidak ada
+    "prompt_snippets",  # baris spek prompt per kombinasi spek (prompt_builder.build_snippets)
+])
+
+# Konfigurasi memori & catatan kondisi di nama model ("8/256GB", "(Ex Inter)")
+# bukan bagian nama produk; dibuang supaya tidak mendominasi skor n-gram.
+# Warna juga (market_sql.model_key): "awet" jangan cocok ke "Awesome Blue"
+_MODEL_NOISE = re.compile(r"\([^)]*\)|\b\d+\s*/\s*\d+\s*gb\b|\b\d+\s*(?:gb|tb)\b", re.IGNORECASE)
+
+
+def build_text_index(product_table):
+    """Index n-gram nama model (row = row product table) untuk pencarian fuzzy"""
+    if product_table is None or not len(product_table) or not ngram_index.AVAILABLE:
+        return None
+    started = time.perf_counter()
+    try:
+        index = ngram_index.NgramIndex([_MODEL_NOISE.sub(" ", model_key(model))
+                                        for model in product_table.models])
+    except Exception as e:
+        log.error("❌ Error building n-gram index, pencarian fuzzy nonaktif: %s", e)
+        return None
+    log.info("✅ N-gram index: %d model (%.0f KB, %.2fs)", len(index),
+             index.memory_bytes() / 1024, time.perf_counter() - started)
+    return index
+
+
+def load_knowledge_graph(ttl_path, snapshot_path, shared=False):
+    """
+    Snapshot biner dulu (cold start cepat), fallback parse Turtle + compile product table.
+    shared=True: tabel diubah ke kolom flat (ProductTable.shared) dan Graph rdflib
+    dibuang kalau tabel ada, untuk gunicorn --preload (gunicorn_shared.conf.py).
+    """
+    started = time.perf_counter()
+    graph = Graph()
+    product_table = None
+    source = None
+    version = None
+    memory = {}
+
+    # 1. Coba snapshot biner dulu (cold start jauh lebih cepat dari parse Turtle)
+    try:
+        product_table, snapshot_meta = kg_snapshot.load_snapshot(snapshot_path, source_path=ttl_path)
+        source = "snapshot"
+        version = snapshot_meta.get("source_sha256")
+        memory = {
+            "snapshot_file_bytes": snapshot_meta["bytes"],
+            "product_table_bytes": product_table.memory_bytes(),
+        }
+        log.info("✅ Knowledge Base Loaded from snapshot: %d produk", len(product_table))
+    except kg_snapshot.SnapshotError as e:
+        log.warning("⚠️ Snapshot KG tidak dipakai (%s), parse Turtle...", e)
+
+    # 2. Fallback: parse Turtle + compile product table
+    if product_table is None:
+        try:
+            version = kg_snapshot.file_sha256(ttl_path)
+            graph.parse(ttl_path, format="turtle")
+            source = "turtle"
+            log.info("✅ Knowledge Base Loaded!")
+        except Exception as e:
+            log.error("❌ Error loading RDF: %s", e)
+
+        # Literal brand ternormalisasi untuk filter SPARQL (TTL lama belum punya)
+        sparql_queries.add_brand_keys(graph)
+
+        # Compile Graph jadi tabel produk (sekali saat load, bukan per request)
+        try:
+            product_table = ProductTable.from_graph(graph)
+            memory = {
+                "rdflib_graph_bytes": deep_sizeof(graph),
+                "product_table_bytes": product_table.memory_bytes(),
+            }
+            log.info("✅ Product Table Compiled: %d produk (%.0f KB vs Graph %.0f KB)", len(product_table),
+                     memory['product_table_bytes'] / 1024, memory['rdflib_graph_bytes'] / 1024)
+        except Exception as e:
+            log.error("❌ Error compiling product table, fallback ke SPARQL: %s", e)
+            # Jalur fallback: compile query SPARQL sekarang, bukan di request pertama
+            sparql_queries.prepare_all()
+
+    text_index = build_text_index(product_table)
+    if text_index is not None:
+        memory["text_index_bytes"] = text_index.memory_bytes()
+
+    prompt_snippets = prompt_builder.build_snippets(product_table)
+    if prompt_snippets is not None:
+        memory["prompt_snippets_bytes"] = deep_sizeof(prompt_snippets)
+
+    if shared and product_table is not None:
+        # Index di atas dibangun dari tabel list (lebih cepat); sesudahnya cukup versi flat
+        product_table = product_table.shared()
+        memory["product_table_bytes"] = product_table.memory_bytes()
+        if len(graph):
+            graph = Graph()  # ratusan ribu object rdflib yang tidak dibaca lagi
+            memory.pop("rdflib_graph_bytes", None)
+        log.info("✅ Shared catalog: %.0f KB kolom flat", memory["product_table_bytes"] / 1024)
+
+    return KnowledgeGraph(
+        product_table=product_table,
+        graph=graph,
+        source=source,
+        version=version[:12] if version else None,
+        memory=memory,
+        loaded_at=time.time(),
+        load_seconds=time.perf_counter() - started,
+        text_index=text_index,
+        prompt_snippets=prompt_snippets,
+    )
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class KGReloader:
+    """
+    Polling file KG, load versi baru di background, lalu panggil swap(kg_baru).
+
+    restart_after_fork: thread polling dijalankan lagi di proses hasil fork
+    (worker gunicorn --preload). on_reload: dipanggil setelah swap berhasil.
+    gunicorn_shared.conf.py mematikan yang pertama dan memakai on_reload
+    untuk me-recycle worker dari master.
+    """
+
+    def __init__(self, ttl_path, snapshot_path, get_current, swap, interval=10.0, shared=False,
+                 restart_after_fork=True, on_reload=None):
+        self.ttl_path = ttl_path
+        self.snapshot_path = snapshot_path
+        self.shared = shared
+        self.get_current = get_current
+        self.swap = swap
+        self.interval = interval
+        self.restart_after_fork = restart_after_fork
+        self.on_reload = on_reload
+        self._signature = self._signatures()
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()  # check() bisa dipanggil manual & dari thread
+        self._stats = {"checks": 0, "reloads": 0, "unchanged": 0, "errors": 0,
+                       "last_error": None, "last_reload_s": None, "last_reload_at": None}
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _signatures(self):
+        return _file_signature(self.ttl_path), _file_signature(self.snapshot_path)
+
+    def start(self):
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="kg-reloader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _after_fork(self):
+        # Thread tidak ikut ter-fork (gunicorn --preload): jalankan lagi di worker
+        was_running = self._thread is not None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if was_running and self.restart_after_fork:
+            self.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                self._stats["errors"] += 1
+                self._stats["last_error"] = str(e)
+                log.error("❌ KG reload error: %s", e)
+
+    def check(self):
+        """Reload kalau file KG berubah. Return True kalau KG aktif diganti."""
+        with self._lock:
+            self._stats["checks"] += 1
+            signature = self._signatures()
+            if signature == self._signature or signature[0] is None:
+                return False
+            self._signature = signature
+
+            current = self.get_current()
+            version = kg_snapshot.file_sha256(self.ttl_path)[:12]
+            if version == current.version and current.source == "snapshot":
+                # mtime berubah tapi isi sama (touch / snapshot ditulis ulang)
+                self._stats["unchanged"] += 1
+                return False
+
+            new_kg = load_knowledge_graph(self.ttl_path, self.snapshot_path, shared=self.shared)
+            if new_kg.product_table is None and not len(new_kg.graph):
+                raise RuntimeError(f"KG baru {self.ttl_path} gagal dimuat, tetap pakai versi {current.version}")
+            if new_kg.version == current.version and new_kg.source == current.source:
+                self._stats["unchanged"] += 1
+                return False
+
+            self.swap(new_kg)
+            self._stats["reloads"] += 1
+            self._stats["last_reload_s"] = round(new_kg.load_seconds, 3)
+            self._stats["last_reload_at"] = new_kg.loaded_at
+            log.info("🔄 KG reloaded: versi %s -> %s (%s, %.2fs)",
+                     current.version, new_kg.version, new_kg.source, new_kg.load_seconds)
+            if self.on_reload is not None:
+                self.on_reload()
+            return True
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats["interval_s"] = self.interval
+        stats["running"] = self._thread is not None and self._thread.is_alive()
+        return stats
@@ -0,0 +1,166 @@
+"""
+Snapshot biner Knowledge Graph (product table yang sudah di-compile).
+
+Parse Turtle pakai rdflib makan porsi besar cold start (Vercel/serverless).
+Snapshot menyimpan ProductTable dalam format kolom yang bisa dimuat dalam
+hitungan milidetik: tabel string + array integer mentah.
+
+Format file (little-endian):
+    MAGIC (4 byte) | VERSION (u32) | panjang meta (u32) | meta JSON
+    | kolom array: ram, storage, is_concert, sku, model, processor, brand
+Meta menyimpan sha256 file Turtle sumber; kalau TTL berubah (atau versi format
+beda) snapshot dianggap basi dan app.py fallback ke Turtle.
+
+Buat ulang snapshot dari TTL yang ada:
+    python kg_snapshot.py [knowledge_base.ttl] [knowledge_base.kgsnap]
+"""
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+
+from product_table import ProductTable
+
+MAGIC = b"GBKG"
+VERSION = 1
+DEFAULT_PATH = "knowledge_base.kgsnap"
+
+# Urutan kolom di file: (nama, typecode array)
+_COLUMNS = [
+    ("ram", "i"),
+    ("storage", "i"),
+    ("is_concert", "b"),
+    ("sku", "i"),        # index ke tabel string
+    ("model", "i"),
+    ("processor", "i"),
+    ("brand", "i"),
+]
+
+
+class SnapshotError(Exception):
+    """Snapshot tidak ada, rusak, beda versi, atau sudah basi"""
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_snapshot(table, path=DEFAULT_PATH, source_path=None, triples=None):
+    """Tulis ProductTable ke file snapshot (atomic: tulis .tmp lalu rename)"""
+    strings = []
+    string_ids = {}
+
+    def sid(value):
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    brand_of_row = [None] * len(table)
+    for brand, rows in table.brand_rows.items():
+        for row in rows:
+            brand_of_row[row] = brand
+
+    columns = {
+        "ram": table.ram,
+        "storage": table.storage,
+        "is_concert": table.is_concert,
+        "sku": array("i", (sid(v) for v in table.skus)),
+        "model": array("i", (sid(v) for v in table.models)),
+        "processor": array("i", (sid(v) for v in table.processors)),
+        "brand": array("i", (sid(v) for v in brand_of_row)),
+    }
+    meta = {
+        "rows": len(table),
+        "triples": triples,
+        "source_sha256": file_sha256(source_path) if source_path else None,
+        "byteorder": sys.byteorder,
+        "strings": strings,
+    }
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<II", VERSION, len(meta_bytes)))
+        f.write(meta_bytes)
+        for name, _ in _COLUMNS:
+            f.write(columns[name].tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshot(path=DEFAULT_PATH, source_path=None):
+    """
+    Muat ProductTable dari snapshot. Return (table, meta).
+    Raise SnapshotError kalau file tidak ada/rusak/beda versi, atau kalau
+    source_path diberikan dan isinya sudah berbeda dari saat snapshot dibuat.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise SnapshotError(f"Snapshot tidak bisa dibaca: {e}")
+
+    if len(data) < 12 or data[:4] != MAGIC:
+        raise SnapshotError("Bukan file snapshot GadgetBot")
+    try:
+        return _decode(data, source_path)
+    except (struct.error, UnicodeDecodeError, ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+        # Header / meta / kolom rusak: tetap SnapshotError supaya loader fallback ke Turtle
+        raise SnapshotError(f"Snapshot rusak: {e!r}")
+
+
+def _decode(data, source_path):
+    version, meta_len = struct.unpack_from("<II", data, 4)
+    if version != VERSION:
+        raise SnapshotError(f"Versi snapshot {version} != {VERSION}")
+    offset = 12 + meta_len
+    meta = json.loads(data[12:offset].decode("utf-8"))
+
+    if meta.get("byteorder") != sys.byteorder:
+        raise SnapshotError("Byte order snapshot beda dengan mesin ini")
+    if source_path is not None and meta.get("source_sha256") != file_sha256(source_path):
+        raise SnapshotError(f"Snapshot basi: {source_path} sudah berubah")
+
+    rows = meta["rows"]
+    columns = {}
+    for name, typecode in _COLUMNS:
+        col = array(typecode)
+        size = col.itemsize * rows
+        if offset + size > len(data):
+            raise SnapshotError("Snapshot terpotong")
+        col.frombytes(data[offset:offset + size])
+        columns[name] = col
+        offset += size
+
+    strings = [sys.intern(s) for s in meta.pop("strings")]
+    table = ProductTable.from_columns(
+        skus=[strings[i] for i in columns["sku"]],
+        models=[strings[i] for i in columns["model"]],
+        processors=[strings[i] for i in columns["processor"]],
+        brands=[strings[i] for i in columns["brand"]],
+        ram=columns["ram"],
+        storage=columns["storage"],
+        is_concert=columns["is_concert"],
+    )
+    meta["bytes"] = len(data)
+    return table, meta
+
+
+if __name__ == "__main__":
+    from rdflib import Graph
+
+    source = sys.argv[1] if len(sys.argv) > 1 else "knowledge_base.ttl"
+    target = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PATH
+    g = Graph()
+    g.parse(source, format="turtle")
+    table = ProductTable.from_graph(g)
+    write_snapshot(table, target, source_path=source, triples=len(g))
+    print(f"✅ Snapshot {target}: {len(table)} produk, {os.path.getsize(target) / 1024:.1f} KB")
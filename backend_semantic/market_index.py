@@ -0,0 +1,95 @@
+"""
+Inverted index listing market untuk DATA FUSION.
+
+Dulu fusion = nested loop: tiap kandidat KG di-cek `model in listing_title`
+ke SEMUA listing (O(kandidat x listing)). Sekarang judul listing di-tokenize
+sekali, lalu kandidat dicari lewat irisan posting list.
+
+Semantik match tetap sama (substring, case-insensitive):
+- token tengah model harus jadi token utuh di judul
+- token pertama model = akhiran salah satu token judul
+- token terakhir model = awalan salah satu token judul
+Posting list akhiran/awalan diambil dari vocabulary token yang diurutkan
+sekali (token biasa untuk awalan, token dibalik untuk akhiran): range token
+berawalan X dicari dengan bisect, bukan scan seluruh vocabulary. Hasilnya
+di-cache per potongan (token pertama kandidat biasanya sama: "samsung", ...).
+Hasil irisan diverifikasi lagi dengan `in` sehingga hasilnya identik.
+"""
+from bisect import bisect_left
+
+
+class MarketIndex:
+    def __init__(self, listings, field="listing_title"):
+        self.listings = listings
+        self.titles = [(item.get(field) or "").lower() for item in listings]
+        self.exact = {}      # token -> set index listing
+        self._prefix = {}    # cache: potongan -> listing dgn token berawalan itu
+        self._suffix = {}    # cache: potongan -> listing dgn token berakhiran itu
+        self._sorted = None  # vocabulary urut (awalan) dan urut token dibalik (akhiran), lazy
+        self._reversed = None
+
+        for idx, title in enumerate(self.titles):
+            for token in title.split():
+                self.exact.setdefault(token, set()).add(idx)
+
+    def __len__(self):
+        return len(self.listings)
+
+    def _vocabulary(self):
+        if self._sorted is None:
+            self._sorted = sorted(self.exact)
+            self._reversed = sorted((token[::-1], token) for token in self.exact)
+        return self._sorted, self._reversed
+
+    def _prefix_postings(self, piece):
+        """Listing dengan token berawalan `piece` (range bisect di vocabulary urut)"""
+        ids = self._prefix.get(piece)
+        if ids is None:
+            vocabulary, _ = self._vocabulary()
+            ids = set()
+            for i in range(bisect_left(vocabulary, piece), len(vocabulary)):
+                token = vocabulary[i]
+                if not token.startswith(piece):
+                    break
+                ids |= self.exact[token]
+            self._prefix[piece] = ids
+        return ids
+
+    def _suffix_postings(self, piece):
+        """Listing dengan token berakhiran `piece` (awalan di vocabulary token dibalik)"""
+        ids = self._suffix.get(piece)
+        if ids is None:
+            _, reversed_vocabulary = self._vocabulary()
+            needle = piece[::-1]
+            ids = set()
+            for i in range(bisect_left(reversed_vocabulary, (needle,)), len(reversed_vocabulary)):
+                reversed_token, token = reversed_vocabulary[i]
+                if not reversed_token.startswith(needle):
+                    break
+                ids |= self.exact[token]
+            self._suffix[piece] = ids
+        return ids
+
+    def match_ids(self, model):
+        """Index listing (urut naik) yang judulnya mengandung `model`"""
+        needle = model.lower()
+        tokens = needle.split()
+        if len(tokens) < 2:
+            # Satu token bisa ada di tengah token judul manapun (atau string
+            # kosong yang cocok ke semua): tidak ada index yang pas, scan biasa
+            return [idx for idx, title in enumerate(self.titles) if needle in title]
+
+        postings = [self.exact.get(token) for token in tokens[1:-1]]
+        if any(p is None for p in postings):
+            return []
+        postings.append(self._suffix_postings(tokens[0]))
+        postings.append(self._prefix_postings(tokens[-1]))
+        postings.sort(key=len)
+        ids = postings[0].intersection(*postings[1:])
+
+        titles = self.titles
+        return sorted(idx for idx in ids if needle in titles[idx])
+
+    def match(self, model):
+        """Listing (dict aslinya) yang judulnya mengandung `model`"""
+        return [self.listings[idx] for idx in self.match_ids(model)]
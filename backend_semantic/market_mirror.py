@@ -0,0 +1,240 @@
+"""
+Mirror tb_market_listings di memori (opsional, MARKET_MIRROR=1).
+
+Tabel listing cuma berubah beberapa kali sehari, jadi tidak perlu query ILIKE
+ke Postgres tiap chat. Mirror menyimpan:
+- harga terurut (array) -> window budget pakai bisect
+- trigram index judul/toko -> pencarian substring (semantik ILIKE '%q%')
+- market_sql.model_key per listing -> termurah per model (sama dengan kolom model_key)
+
+Refresh incremental pakai high-water mark kolom updated_at (lihat
+migrate_add_updated_at.py): hanya baris dengan updated_at >= mark - overlap
+yang diambil. updated_at = now() = waktu MULAI transaksi, jadi transaksi
+panjang bisa commit setelah refresh dengan updated_at lebih tua dari mark;
+overlap (WATERMARK_OVERLAP) mengambil ulang jendela itu. Set id di database
+dicocokkan tiap refresh (SELECT id): id yang hilang dibuang dari mirror, id
+baru yang tidak terambil lewat updated_at diambil langsung. Sebagai jaring
+pengaman terakhir, reload penuh tiap `full_reload_interval` detik.
+
+Staleness dibatasi: refresh dicoba tiap `refresh_interval` detik; kalau data
+lebih tua dari `max_age` dan refresh gagal, query() raise MirrorStale supaya
+pemanggil fallback ke database.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import timedelta
+
+from market_sql import model_key
+
+log = logging.getLogger("gadgetbot.market_mirror")
+
+COLUMNS = "id, store_name, listing_title, price_idr, stock, item_condition, updated_at"
+
+# Baris dengan updated_at sampai sekian lebih tua dari high-water mark ikut diambil ulang
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+
+class MirrorStale(Exception):
+    """Data mirror lebih tua dari max_age dan tidak bisa di-refresh"""
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class MarketMirror:
+    def __init__(self, connection_factory, refresh_interval=60.0, max_age=300.0, full_reload_interval=3600.0):
+        """connection_factory() -> context manager koneksi psycopg2 (pool)"""
+        self.connection_factory = connection_factory
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.full_reload_interval = full_reload_interval
+        self._full_loaded_at = None  # reload penuh terakhir (monotonic)
+
+        # Snapshot immutable, diganti utuh tiap refresh (query tidak perlu lock):
+        #   rows        id -> dict listing (format get_market_prices)
+        #   search_text id -> (judul lowercase, toko lowercase, market_sql.model_key)
+        #   trigrams    trigram -> set id
+        #   prices      [(price, id)] terurut
+        self._snapshot = ({}, {}, {}, [])
+        self._high_water = None  # updated_at terbesar yang sudah dimirror
+        self._loaded_at = None   # waktu refresh sukses terakhir (monotonic)
+        self._stats = {"full_loads": 0, "incremental_refreshes": 0, "rows_applied": 0,
+                       "rows_deleted": 0, "rows_missed": 0, "refresh_errors": 0, "queries": 0}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        # Lock bisa saja sedang dipegang thread lain saat fork
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    # --- REFRESH ---
+
+    def refresh(self, full=False):
+        """Sinkronkan mirror dengan database (incremental kalau bisa)"""
+        incremental = (not full and self._high_water is not None
+                       and time.monotonic() - self._full_loaded_at < self.full_reload_interval)
+        with self.connection_factory() as conn, conn.cursor() as cur:
+            cur.execute("SELECT MAX(updated_at) FROM tb_market_listings")
+            db_max = cur.fetchone()[0]
+
+            if not incremental:
+                cur.execute(f"SELECT {COLUMNS} FROM tb_market_listings")
+                changed = cur.fetchall()
+                deleted = missed = ()
+            else:
+                cur.execute(f"SELECT {COLUMNS} FROM tb_market_listings WHERE updated_at >= %s",
+                            (self._high_water - WATERMARK_OVERLAP,))
+                changed = cur.fetchall()
+                # Cocokkan set id: baris terhapus, dan baris baru yang tidak
+                # tertangkap updated_at (transaksi lebih tua dari overlap)
+                cur.execute("SELECT id FROM tb_market_listings")
+                db_ids = {row[0] for row in cur.fetchall()}
+                current = self._snapshot[0]
+                changed_ids = {row[0] for row in changed}
+                deleted = current.keys() - db_ids
+                missed = list(db_ids - current.keys() - changed_ids)
+                if missed:
+                    cur.execute(f"SELECT {COLUMNS} FROM tb_market_listings WHERE id = ANY(%s)", (missed,))
+                    changed += cur.fetchall()
+
+        with self._lock:
+            rows = dict(self._snapshot[0]) if incremental else {}
+            for row_id in deleted:
+                rows.pop(row_id, None)
+            for row in changed:
+                rows[row[0]] = row
+            self._snapshot = self._build_snapshot(rows)
+            if db_max is not None:
+                self._high_water = db_max
+            self._loaded_at = time.monotonic()
+            if not incremental:
+                self._full_loaded_at = self._loaded_at
+            self._stats["incremental_refreshes" if incremental else "full_loads"] += 1
+            self._stats["rows_applied"] += len(changed)
+            self._stats["rows_deleted"] += len(deleted)
+            self._stats["rows_missed"] += len(missed)
+
+    @staticmethod
+    def _build_snapshot(rows):
+        listings = {}
+        for row_id, row in rows.items():
+            if isinstance(row, dict):
+                listings[row_id] = row  # Baris lama yang tidak berubah
+                continue
+            listings[row_id] = {
+                "store_name": row[1],
+                "listing_title": row[2],
+                "price_idr": float(row[3]),
+                "stock": int(row[4]) if row[4] is not None else 0,
+                "item_condition": row[5]
+            }
+
+        search_text = {
+            row_id: ((item["listing_title"] or "").lower(), (item["store_name"] or "").lower(),
+                     model_key(item["listing_title"]))
+            for row_id, item in listings.items()
+        }
+        index = {}
+        for row_id, (title, store, _) in search_text.items():
+            for tri in trigrams(title) | trigrams(store):
+                index.setdefault(tri, set()).add(row_id)
+
+        prices = sorted((item["price_idr"], row_id) for row_id, item in listings.items())
+        return listings, search_text, index, prices
+
+    def age(self):
+        """Umur data mirror dalam detik (None kalau belum pernah load)"""
+        if self._loaded_at is None:
+            return None
+        return time.monotonic() - self._loaded_at
+
+    def ensure_fresh(self):
+        """Refresh kalau sudah lewat refresh_interval; raise MirrorStale kalau terlalu basi"""
+        age = self.age()
+        if age is not None and age < self.refresh_interval:
+            return
+
+        # Satu thread saja yang refresh; thread lain tetap pakai data lama
+        # selama umurnya < max_age (tidak ikut menunggu)
+        blocking = age is None or age >= self.max_age
+        if self._refresh_lock.acquire(blocking=blocking):
+            try:
+                age = self.age()
+                if age is None or age >= self.refresh_interval:
+                    self.refresh()
+            except Exception as e:
+                self._stats["refresh_errors"] += 1
+                log.error("❌ Market mirror refresh error: %s", e)
+            finally:
+                self._refresh_lock.release()
+
+        age = self.age()
+        if age is None or age >= self.max_age:
+            raise MirrorStale(f"Mirror listing lebih tua dari {self.max_age}s")
+
+    # --- QUERY ---
+
+    @staticmethod
+    def _matching_ids(query, search_text, trigram_index):
+        needle = query.lower()
+        if len(needle) < 3:
+            candidates = search_text.keys()
+        else:
+            postings = [trigram_index.get(tri) for tri in trigrams(needle)]
+            if any(p is None for p in postings):
+                return set()
+            postings.sort(key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        return {row_id for row_id in candidates
+                if needle in search_text[row_id][0] or needle in search_text[row_id][1]}
+
+    def query(self, query="", max_price=0, limit=None, after=None, per_model=False):
+        """Sama dengan get_market_prices versi SQL (market_sql.build_market_sql), dilayani dari memori"""
+        self.ensure_fresh()
+        self._stats["queries"] += 1
+        rows, search_text, trigram_index, prices = self._snapshot
+
+        # Window budget: semua harga <= max_price * 1.2 (toleransi 20%)
+        end = bisect_right(prices, (max_price * 1.2, float("inf"))) if max_price > 0 else len(prices)
+        window = prices[:end]
+
+        if query:
+            ids = self._matching_ids(query, search_text, trigram_index)
+            window = [entry for entry in window if entry[1] in ids]
+        if limit is None and not query and max_price == 0:
+            # Tanpa filter sama sekali: 50 item termurah
+            limit = 50
+
+        result = []
+        seen_models = set()
+        for entry in window:
+            row_id = entry[1]
+            if per_model:
+                # Window urut (harga, id): kemunculan pertama = listing termurah model itu
+                model = search_text[row_id][2]
+                if model in seen_models:
+                    continue
+                seen_models.add(model)
+            if after is not None and entry <= tuple(after):
+                continue
+            result.append(dict(rows[row_id], id=row_id))
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats.update({
+            "rows": len(self._snapshot[0]),
+            "age_s": round(self.age(), 1) if self._loaded_at is not None else None,
+            "high_water_mark": str(self._high_water) if self._high_water is not None else None,
+            "refresh_interval_s": self.refresh_interval,
+            "max_age_s": self.max_age,
+        })
+        return stats
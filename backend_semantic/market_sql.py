@@ -0,0 +1,131 @@
+"""
+Query listing toko (tb_market_listings), dipakai app.py, app_async.py dan
+migrate_add_search_indexes.py.
+
+Index yang diharapkan (lihat migrate_add_search_indexes.py):
+- GIN pg_trgm di listing_title dan store_name: ILIKE '%q%' di masing-masing
+  kolom jadi Bitmap Index Scan, digabung BitmapOr (bukan seq scan)
+- btree (price_idr, id): filter budget + ORDER BY ... LIMIT langsung dari index
+
+Pipeline chat mengambil listing per halaman (top-K termurah, satu listing per
+model, keyset pagination) sampai fakta untuk prompt cukup, bukan seluruh
+baris yang cocok.
+
+"Model" = kolom model_key (generated, migrate_add_model_key.py): judul
+lowercase tanpa warna dan tanpa keterangan kurung tanpa angka ("(Resmi)",
+"(Bekas Fullset)"), jadi HP yang sama dengan warna / catatan toko beda
+dihitung satu model. Kurung berangka tetap ("Nothing Phone (3)", "(RTX 5060)").
+model_key() = ekspresi yang sama di Python (market_mirror, SQLite benchmark).
+"""
+import re
+
+COLUMNS = "store_name, listing_title, price_idr, stock, item_condition, id"
+
+# Kata warna / keterangan toko yang dibuang dari model_key
+MODEL_KEY_NOISE = [
+    "black", "white", "blue", "green", "red", "gold", "silver", "gray", "grey", "purple",
+    "yellow", "pink", "orange", "violet", "lavender", "mint", "lime", "coral", "cream",
+    "midnight", "starlight", "graphite", "titanium", "obsidian", "onyx", "cobalt", "khaki",
+    "hazel", "rose", "phantom", "space", "deep", "natural", "awesome", "glowing", "glossy",
+    "velvet", "hitam", "putih", "biru", "hijau", "merah", "emas", "ungu", "kuning",
+    "abu-abu", "abu", "resmi",
+]
+_NOISE_PAREN = r"\([^)0-9]*\)"
+_NOISE_WORDS = "(" + "|".join(MODEL_KEY_NOISE) + ")"
+
+# Ekspresi kolom generated model_key (Postgres, regex ARE: \y = batas kata)
+MODEL_KEY_SQL = (
+    "btrim(regexp_replace(regexp_replace(regexp_replace(lower(listing_title), "
+    f"'{_NOISE_PAREN}', ' ', 'g'), '\\y{_NOISE_WORDS}\\y', ' ', 'g'), '\\s+', ' ', 'g'))"
+)
+_NOISE_PAREN_RE = re.compile(_NOISE_PAREN)
+_NOISE_WORDS_RE = re.compile(rf"\b{_NOISE_WORDS}\b")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def model_key(title):
+    """Key model listing, sama dengan kolom generated model_key (MODEL_KEY_SQL)"""
+    key = _NOISE_PAREN_RE.sub(" ", (title or "").lower())
+    key = _NOISE_WORDS_RE.sub(" ", key)
+    return _SPACES_RE.sub(" ", key).strip()
+
+
+def market_keyword_for(brand_filter):
+    """Keyword pencarian listing untuk brand hasil intent"""
+    # Fix Keyword Apple
+    market_keyword = brand_filter if brand_filter else ""
+    if brand_filter == "Apple": market_keyword = "iPhone"
+    return market_keyword
+
+
+def build_market_sql(query="", max_price=0, limit=None, after=None, per_model=False):
+    """
+    SQL listing toko + parameter (placeholder %s), dipakai mode sync & async.
+    - limit: maksimal baris (top-K termurah); None = semua (kecuali tanpa filter: 50)
+    - after: keyset (price_idr, id) baris terakhir halaman sebelumnya
+    - per_model: hanya listing termurah per model (kolom model_key)
+    """
+    # per_model: model_key ikut dipilih untuk PARTITION BY di luar
+    base_sql = f"SELECT {COLUMNS}{', model_key' if per_model else ''} FROM tb_market_listings WHERE 1=1"
+    params = []
+
+    if query:
+        # Satu ILIKE per kolom (bukan concat) supaya tiap kolom bisa pakai index trigram-nya
+        base_sql += " AND (listing_title ILIKE %s OR store_name ILIKE %s)"
+        search_term = f"%{query}%"
+        params.extend([search_term, search_term])
+
+    if max_price > 0:
+        # Cari yang harganya di bawah budget * 1.2 (toleransi 20%)
+        base_sql += " AND price_idr <= %s"
+        params.append(max_price * 1.2)
+
+    if per_model:
+        # Termurah per model dipilih di database; ROW_NUMBER (bukan DISTINCT ON)
+        # supaya SQL yang sama juga jalan di SQLite (benchmarks/bench_catalog.py)
+        base_sql = (f"SELECT {COLUMNS} FROM ("
+                    f"SELECT {COLUMNS}, ROW_NUMBER() OVER ("
+                    f"PARTITION BY model_key ORDER BY price_idr ASC, id ASC) AS model_rank "
+                    f"FROM ({base_sql}) matched) ranked WHERE model_rank = 1")
+
+    if after is not None:
+        # Keyset: lanjut setelah (harga, id) terakhir, tanpa OFFSET
+        base_sql += " AND (price_idr, id) > (%s, %s)"
+        params.extend([after[0], after[1]])
+
+    # id sebagai tie-breaker: urutan deterministik & sama persis dengan index (price_idr, id)
+    base_sql += " ORDER BY price_idr ASC, id ASC"
+    if limit is None and not query and max_price == 0:
+        # Jika tidak ada filter sama sekali, batasi 50 item (diurutkan dari murah)
+        limit = 50
+    if limit is not None:
+        base_sql += " LIMIT %s"
+        params.append(limit)
+    return base_sql, params
+
+
+def market_row(row):
+    """Baris hasil build_market_sql -> dict listing"""
+    return {
+        "store_name": row[0],
+        "listing_title": row[1],
+        "price_idr": float(row[2]),
+        "stock": int(row[3]) if row[3] is not None else 0,
+        "item_condition": row[4],
+        "id": row[5]
+    }
+
+
+def build_market_batch_sql(lookups, limit=None, per_model=False):
+    """
+    Beberapa lookup (query, max_price) dalam SATU statement (UNION ALL), untuk
+    /chat/batch. Kolom pertama = index lookup; tiap lookup tetap top-K sendiri.
+    """
+    parts = []
+    params = []
+    for i, (query, max_price) in enumerate(lookups):
+        sql, lookup_params = build_market_sql(query, max_price, limit, None, per_model)
+        parts.append(f"SELECT {i} AS lookup, {COLUMNS} FROM ({sql}) lookup_{i}")
+        params.extend(lookup_params)
+    batch_sql = f"SELECT * FROM ({' UNION ALL '.join(parts)}) batch ORDER BY lookup, price_idr ASC, id ASC"
+    return batch_sql, params
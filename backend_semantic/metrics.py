@@ -0,0 +1,170 @@
+"""
+Metrics pipeline chat dalam format text Prometheus (endpoint /metrics).
+
+Histogram latency per stage (intent, kg, fuzzy, db, fusion, prompt, groq) dan
+counter jumlah baris/fakta, tanpa dependency tambahan. Observasi cukup
+murah untuk hot path: satu bisect + increment di bawah lock.
+
+Angka per proses: dengan gunicorn -w N, Prometheus men-scrape tiap worker
+(atau pakai label instance berbeda per worker).
+
+    with STAGE_SECONDS.time("kg"):
+        ...
+    KG_CANDIDATES.inc(amount=len(candidates))
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Detik; cukup rapat di bawah 100 ms (stage lokal) dan sampai 30 s (Groq)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_str(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _num(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_label_str(self.labelnames, labels)} {_num(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}  # labels -> [count per bucket (+Inf terakhir), sum, count]
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        """Ukur durasi blok `with` (tetap dicatat kalau blok raise)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def snapshot(self, *labels):
+        """(count, sum) untuk satu kombinasi label"""
+        with self._lock:
+            series = self._series.get(labels)
+            return (series[2], series[1]) if series else (0, 0.0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = _label_str(self.labelnames, labels, [("le", _num(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            base = _label_str(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {_num(total)}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} sudah terdaftar")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = Registry()
+
+# --- METRICS PIPELINE CHAT ---
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "gadgetbot_stage_seconds", "Durasi per stage pipeline chat", ["stage"])
+REQUEST_SECONDS = REGISTRY.histogram(
+    "gadgetbot_request_seconds", "Durasi request chat end-to-end", ["endpoint"])
+KG_CANDIDATES = REGISTRY.counter(
+    "gadgetbot_kg_candidates_total", "Kandidat produk yang dikembalikan query KG")
+MARKET_ROWS = REGISTRY.counter(
+    "gadgetbot_market_rows_total", "Baris listing toko yang dikembalikan", ["source"])
+FACTS_FUSED = REGISTRY.counter(
+    "gadgetbot_facts_total", "Fakta hasil fusion KG + listing toko")
+FACTS_SELECTED = REGISTRY.counter(
+    "gadgetbot_facts_selected_total", "Fakta yang masuk prompt LLM")
+RESPONSE_CACHE = REGISTRY.counter(
+    "gadgetbot_response_cache_total", "Lookup cache jawaban LLM", ["result"])
+PROMPT_TOKENS = REGISTRY.histogram(
+    "gadgetbot_prompt_tokens", "Estimasi token prompt (system + user) per panggilan Groq",
+    buckets=(100, 250, 500, 750, 1000, 1250, 1500, 2000, 3000, 4000, 8000))
+FACTS_OVER_BUDGET = REGISTRY.counter(
+    "gadgetbot_facts_over_budget_total", "Fakta terpilih yang dilepas karena budget token prompt")
+GROQ_TOKENS = REGISTRY.counter(
+    "gadgetbot_groq_tokens_total", "Token menurut field usage response Groq", ["kind"])
+FUZZY_MATCHES = REGISTRY.counter(
+    "gadgetbot_fuzzy_matches_total", "Pencarian model fuzzy (n-gram) tanpa brand", ["result"])
+SESSION_TURNS = REGISTRY.counter(
+    "gadgetbot_session_turns_total", "Giliran chat ber-session_id", ["kind"])
+COALESCED_CALLS = REGISTRY.counter(
+    "gadgetbot_coalesced_calls_total", "Panggilan yang memakai hasil eksekusi identik yang sedang berjalan (single-flight)", ["call"])
+GROQ_ERRORS = REGISTRY.counter(
+    "gadgetbot_groq_errors_total", "Panggilan Groq yang gagal", ["reason"])
@@ -0,0 +1,68 @@
+"""
+Kolom generated model_key untuk "termurah per model" (market_sql.build_market_sql per_model).
+
+Dulu per_model PARTITION BY lower(listing_title): HP yang sama dengan warna
+atau catatan toko beda ("... Black", "... (Resmi)") dihitung model berbeda.
+model_key = ekspresi market_sql.MODEL_KEY_SQL, dihitung Postgres saat INSERT /
+UPDATE (GENERATED ALWAYS ... STORED). Script ini:
+1. tambah kolom (kalau isinya beda dengan market_sql.model_key, misal daftar
+   kata warna diubah, kolom di-DROP lalu dibuat ulang)
+2. cek kolom == market_sql.model_key (Python, dipakai market_mirror) untuk semua baris
+
+    python migrate_add_model_key.py
+"""
+import os
+import sys
+
+import psycopg2
+from dotenv import load_dotenv
+
+from market_sql import MODEL_KEY_SQL, model_key
+
+load_dotenv()
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+
+def mismatched_keys(cur):
+    """Baris yang kolom model_key-nya beda dengan market_sql.model_key"""
+    cur.execute("SELECT id, listing_title, model_key FROM tb_market_listings")
+    return [(row_id, title, key) for row_id, title, key in cur.fetchall() if key != model_key(title)]
+
+
+def migrate_model_key():
+    print("🔌 Connecting to Neon...")
+    conn = psycopg2.connect(DATABASE_URL)
+    cur = conn.cursor()
+
+    print("➕ Adding generated column model_key...")
+    try:
+        cur.execute("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'tb_market_listings' AND column_name = 'model_key'
+        """)
+        if cur.fetchone() and mismatched_keys(cur):
+            print("♻️ model_key beda dengan market_sql.model_key, kolom dibuat ulang...")
+            cur.execute("ALTER TABLE tb_market_listings DROP COLUMN model_key")
+        cur.execute(f"ALTER TABLE tb_market_listings ADD COLUMN IF NOT EXISTS model_key TEXT "
+                    f"GENERATED ALWAYS AS ({MODEL_KEY_SQL}) STORED")
+        mismatches = mismatched_keys(cur)
+        if mismatches:
+            raise RuntimeError(f"model_key SQL != Python untuk {len(mismatches)} baris, contoh: {mismatches[:3]}")
+        conn.commit()
+    except Exception as e:
+        print(f"❌ Migration error: {e}")
+        conn.rollback()
+        cur.close()
+        conn.close()
+        return False
+
+    cur.execute("SELECT count(DISTINCT lower(listing_title)), count(DISTINCT model_key) FROM tb_market_listings")
+    titles, models = cur.fetchone()
+    cur.close()
+    conn.close()
+    print(f"✅ Column model_key ready! {titles} judul unik -> {models} model")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if migrate_model_key() else 1)
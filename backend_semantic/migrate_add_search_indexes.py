@@ -0,0 +1,159 @@
+"""
+Index pencarian listing toko: pg_trgm GIN (listing_title, store_name) + btree (price_idr, id).
+
+Tanpa index, get_market_prices (ILIKE '%q%' + ORDER BY price_idr) selalu
+seq scan + sort seluruh tb_market_listings. Script ini:
+1. EXPLAIN ANALYZE query contoh SEBELUM index dibuat, simpan hasil query lama
+2. CREATE EXTENSION pg_trgm + CREATE INDEX CONCURRENTLY (tabel tidak dikunci).
+   Build CONCURRENTLY yang gagal / dibatalkan meninggalkan index INVALID yang
+   tidak dipakai planner dan dilewati IF NOT EXISTS, jadi index INVALID
+   di-DROP dulu lalu dibuat ulang
+3. EXPLAIN ANALYZE query baru (market_sql.build_market_sql) SESUDAH index
+4. Cek hasil query baru == query lama untuk semua brand x budget
+
+    python migrate_add_search_indexes.py
+    python migrate_add_search_indexes.py --report explain_search.txt
+"""
+import argparse
+import os
+import sys
+
+import psycopg2
+from dotenv import load_dotenv
+
+from intent_parser import BRAND_ALIASES
+from market_sql import COLUMNS, build_market_sql, market_keyword_for
+
+load_dotenv()
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+INDEXES = [
+    ("idx_market_listings_title_trgm", "USING gin (listing_title gin_trgm_ops)"),
+    ("idx_market_listings_store_trgm", "USING gin (store_name gin_trgm_ops)"),
+    ("idx_market_listings_price", "(price_idr, id)"),
+]
+
+BUDGETS = [0, 2000000, 5000000, 10000000]
+
+# Kasus yang ditampilkan EXPLAIN-nya (semua kasus tetap dicek hasilnya)
+EXPLAIN_CASES = [("iPhone", 0), ("Samsung", 5000000), ("", 2000000), ("", 0)]
+
+
+def legacy_market_sql(query="", max_price=0):
+    """Query get_market_prices sebelum migrasi (pembanding hasil)"""
+    base_sql = f"SELECT {COLUMNS} FROM tb_market_listings WHERE 1=1"
+    params = []
+    if query:
+        base_sql += " AND (listing_title ILIKE %s OR store_name ILIKE %s)"
+        params.extend([f"%{query}%", f"%{query}%"])
+    if max_price > 0:
+        base_sql += " AND price_idr <= %s"
+        params.append(max_price * 1.2)
+    if not query and max_price == 0:
+        base_sql += " ORDER BY price_idr ASC LIMIT 50"
+    else:
+        base_sql += " ORDER BY price_idr ASC"
+    return base_sql, params
+
+
+def all_cases():
+    keywords = [""] + [market_keyword_for(brand) for brand, _ in BRAND_ALIASES]
+    return [(keyword, budget) for keyword in keywords for budget in BUDGETS]
+
+
+def explain(cur, sql, params):
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, tuple(params))
+    return [row[0] for row in cur.fetchall()]
+
+
+def fetch(cur, sql, params):
+    cur.execute(sql, tuple(params))
+    return cur.fetchall()
+
+
+def same_result(query, max_price, old_rows, new_rows):
+    """Query lama tidak punya tie-breaker: harga sama boleh beda urutan"""
+    if [r[2] for r in old_rows] != [r[2] for r in new_rows]:
+        return False
+    if not query and max_price == 0:
+        # LIMIT 50: baris di batas harga yang sama boleh beda, urutan harga harus sama
+        return True
+    return sorted(old_rows, key=repr) == sorted(new_rows, key=repr)
+
+
+def index_valid(cur, name):
+    """True / False (pg_index.indisvalid), None kalau index belum ada"""
+    cur.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (name,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def create_index(cur, name, definition):
+    """CREATE INDEX CONCURRENTLY, index INVALID sisa build gagal dibuat ulang"""
+    if index_valid(cur, name) is False:
+        print(f"♻️ {name} INVALID (build sebelumnya gagal), DROP lalu buat ulang...")
+        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON tb_market_listings {definition}")
+    if not index_valid(cur, name):
+        raise RuntimeError(f"Index {name} tetap INVALID sesudah dibuat")
+
+
+def migrate_search_indexes(report_path=None):
+    print("🔌 Connecting to Neon...")
+    conn = psycopg2.connect(DATABASE_URL)
+    conn.autocommit = True  # CREATE INDEX CONCURRENTLY tidak boleh di dalam transaksi
+    cur = conn.cursor()
+    report = []
+
+    def section(title, lines):
+        report.append(f"=== {title} ===")
+        report.extend(lines)
+        report.append("")
+
+    cases = all_cases()
+
+    print("📋 EXPLAIN ANALYZE sebelum index...")
+    for query, max_price in EXPLAIN_CASES:
+        section(f"SEBELUM query={query!r} max_price={max_price}", explain(cur, *legacy_market_sql(query, max_price)))
+    old_results = {case: fetch(cur, *legacy_market_sql(*case)) for case in cases}
+
+    print("➕ Creating pg_trgm + indexes (CONCURRENTLY)...")
+    try:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, definition in INDEXES:
+            create_index(cur, name, definition)
+        cur.execute("ANALYZE tb_market_listings")
+    except Exception as e:
+        print(f"❌ Migration error: {e}")
+        cur.close()
+        conn.close()
+        return False
+
+    print("📋 EXPLAIN ANALYZE sesudah index...")
+    for query, max_price in EXPLAIN_CASES:
+        section(f"SESUDAH query={query!r} max_price={max_price}", explain(cur, *build_market_sql(query, max_price)))
+
+    mismatches = [case for case in cases
+                  if not same_result(*case, old_results[case], fetch(cur, *build_market_sql(*case)))]
+    cur.close()
+    conn.close()
+
+    text = "\n".join(report)
+    print(text)
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"💾 Report EXPLAIN: {report_path}")
+
+    if mismatches:
+        print(f"❌ Hasil query baru beda untuk {len(mismatches)}/{len(cases)} kasus: {mismatches[:5]}")
+        return False
+    print(f"✅ Index pencarian siap! Hasil query sama untuk {len(cases)} kasus (brand x budget)")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index pg_trgm + btree untuk get_market_prices")
+    parser.add_argument("--report", help="simpan EXPLAIN ANALYZE sebelum/sesudah ke file")
+    args = parser.parse_args()
+    sys.exit(0 if migrate_search_indexes(args.report) else 1)
@@ -0,0 +1,44 @@
+import psycopg2
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+def migrate_updated_at():
+    """Tambah kolom updated_at (+ trigger) untuk refresh incremental market mirror"""
+    print("🔌 Connecting to Neon...")
+    conn = psycopg2.connect(DATABASE_URL)
+    cur = conn.cursor()
+    
+    print("➕ Adding column updated_at + trigger...")
+    try:
+        cur.execute("ALTER TABLE tb_market_listings ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_market_listings_updated_at ON tb_market_listings (updated_at)")
+        
+        # Trigger: setiap UPDATE otomatis menggeser updated_at
+        cur.execute("""
+            CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+            BEGIN
+                NEW.updated_at = now();
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        cur.execute("DROP TRIGGER IF EXISTS trg_market_listings_updated_at ON tb_market_listings")
+        cur.execute("""
+            CREATE TRIGGER trg_market_listings_updated_at
+            BEFORE UPDATE ON tb_market_listings
+            FOR EACH ROW EXECUTE FUNCTION set_updated_at()
+        """)
+        conn.commit()
+        print("✅ Column updated_at + trigger ready!")
+    except Exception as e:
+        print(f"❌ Migration error: {e}")
+        conn.rollback()
+    
+    cur.close()
+    conn.close()
+
+if __name__ == "__main__":
+    migrate_updated_at()
@@ -0,0 +1,162 @@
+"""
+Index char n-gram TF-IDF untuk pencarian model yang toleran typo.
+
+Jalur utama (intent_parser + product_table + substring di fusion) butuh
+keyword yang persis: "ip 15 promax" atau "samsong a55" tidak ketemu apa-apa.
+Index ini memetakan teks bebas ke model KG lewat kemiripan trigram karakter,
+lokal tanpa network:
+
+- teks dinormalisasi (lowercase, selain a-z0-9 jadi spasi, diapit spasi) dan
+  singkatan umum diganti (ALIASES: "ip" -> "iphone", "promax" -> "pro max")
+- trigram di-encode jadi integer (basis 37) langsung dengan NumPy, tanpa
+  vocabulary dict: kolom matrix = kode trigram (37^3 kolom, sparse)
+- token yang mengandung angka ("15", "a55", "s24") juga jadi fitur utuh
+  (kolom hash setelah kolom trigram, dihitung seolah muncul
+  NUMBER_TOKEN_WEIGHT kali): trigram saja hampir tidak membedakan
+  "iphone 15" dari "iphone 17", padahal nomor model justru bagian terpenting
+- bobot: tf sublinear (1 + log tf) x idf, tiap baris dinormalisasi L2
+- query: batch teks -> matrix sparse -> Q @ X.T (cosine) -> top-k per baris
+
+numpy + scipy opsional (requirements-vector.txt). Tanpa keduanya AVAILABLE =
+False dan app tetap jalan dengan jalur exact saja.
+"""
+import re
+import zlib
+
+try:
+    import numpy as np
+    from scipy import sparse
+    AVAILABLE = True
+except ImportError:  # pragma: no cover - dependency opsional
+    np = sparse = None
+    AVAILABLE = False
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Kode karakter: spasi=0, a-z=1..26, 0-9=27..36; pemisah dokumen di luar basis
+_BASE = 37
+_SEPARATOR = b"\n"
+
+# Token nomor model di-hash ke kolom _BASE^3 .. _BASE^3 + _TOKEN_BUCKETS
+_TOKEN_BUCKETS = 1 << 16
+_COLUMNS = _BASE ** 3 + _TOKEN_BUCKETS
+NUMBER_TOKEN_WEIGHT = 4.0
+
+# Singkatan yang sering diketik user, diganti sebelum trigram dihitung
+ALIASES = {
+    "ip": "iphone",
+    "ipon": "iphone",
+    "promax": "pro max",
+    "proplus": "pro plus",
+}
+
+
+def normalize(text):
+    words = _NON_ALNUM.sub(" ", text.lower()).split()
+    return " " + " ".join(ALIASES.get(word, word) for word in words) + " "
+
+
+_SERIES = re.compile(r"^([a-z]+\d+)\d$")
+
+
+def _number_tokens(doc):
+    """
+    {token: bobot} untuk token dengan angka di teks ternormalisasi. Kode model
+    huruf+angka ("a55", "s24") juga menyumbang serinya ("a5", "s2") dengan
+    bobot setengah: model yang tidak ada di KG jatuh ke tetangga serinya.
+    """
+    tokens = {}
+    for word in doc.split():
+        if word.isalpha():
+            continue
+        tokens[word] = NUMBER_TOKEN_WEIGHT
+        series = _SERIES.match(word)
+        if series:
+            tokens.setdefault("~" + series.group(1), NUMBER_TOKEN_WEIGHT / 2)
+    return tokens
+
+
+def _char_codes():
+    table = np.full(256, -1, dtype=np.int64)
+    table[ord(" ")] = 0
+    table[ord("a"):ord("z") + 1] = np.arange(1, 27)
+    table[ord("0"):ord("9") + 1] = np.arange(27, 37)
+    return table
+
+
+class NgramIndex:
+    """Matrix TF-IDF trigram karakter, satu baris per teks (urutan = row product table)"""
+
+    def __init__(self, texts):
+        if not AVAILABLE:
+            raise RuntimeError("ngram_index butuh numpy + scipy (pip install -r requirements-vector.txt)")
+        self._codes = _char_codes()
+        counts = self._counts(texts)
+        # idf halus (seperti scikit-learn): trigram yang ada di semua teks tetap > 0
+        df = np.bincount(counts.indices, minlength=_COLUMNS)
+        self.idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+        self.matrix = self._weigh(counts)
+        # X.T (trigram x produk): Q @ X.T hanya menyentuh baris trigram milik query
+        self._matrix_t = self.matrix.T.tocsr()
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def _counts(self, texts):
+        """Matrix jumlah trigram + token nomor model (CSR) untuk list teks"""
+        normalized = [normalize(text) for text in texts]
+        docs = [doc.encode("ascii") for doc in normalized]
+        chars = self._codes[np.frombuffer(_SEPARATOR.join(docs), dtype=np.uint8)]
+        # Trigram yang melewati pemisah dokumen (kode -1) dibuang
+        valid = (chars[:-2] >= 0) & (chars[1:-1] >= 0) & (chars[2:] >= 0)
+        grams = (chars[:-2] * _BASE + chars[1:-1]) * _BASE + chars[2:]
+        lengths = np.fromiter((len(doc) for doc in docs), dtype=np.int64, count=len(docs))
+        doc_of_char = np.repeat(np.arange(len(docs)), lengths + 1)[:len(chars)]
+        # Token nomor model: satu kolom hash per token (crc32, stabil antar proses)
+        token_rows, token_cols, token_weights = [], [], []
+        for row, doc in enumerate(normalized):
+            for word, weight in _number_tokens(doc).items():
+                token_rows.append(row)
+                token_cols.append(_BASE ** 3 + zlib.crc32(word.encode("ascii")) % _TOKEN_BUCKETS)
+                token_weights.append(weight)
+        values = np.concatenate([np.ones(int(valid.sum()), dtype=np.float32),
+                                 np.asarray(token_weights, dtype=np.float32)])
+        rows = np.concatenate([doc_of_char[:-2][valid], np.asarray(token_rows, dtype=np.int64)])
+        cols = np.concatenate([grams[valid], np.asarray(token_cols, dtype=np.int64)])
+        counts = sparse.csr_matrix((values, (rows, cols)), shape=(len(docs), _COLUMNS))
+        counts.sum_duplicates()
+        return counts
+
+    def _weigh(self, counts):
+        weighted = counts.copy()
+        weighted.data = (1 + np.log(weighted.data)) * self.idf[weighted.indices]
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        weighted.data /= np.repeat(norms, np.diff(weighted.indptr)).astype(np.float32)
+        return weighted
+
+    def transform(self, texts):
+        """Teks -> vektor TF-IDF (idf dari index ini), baris ternormalisasi L2"""
+        return self._weigh(self._counts(texts))
+
+    def search(self, queries, k=10, min_score=0.0):
+        """Top-k (row, skor cosine) per query, batch satu perkalian sparse"""
+        scores = (self.transform(queries) @ self._matrix_t).tocsr()
+        results = []
+        for i in range(len(queries)):
+            start, end = scores.indptr[i], scores.indptr[i + 1]
+            rows, values = scores.indices[start:end], scores.data[start:end]
+            keep = values >= min_score
+            rows, values = rows[keep], values[keep]
+            if len(values) > k:
+                top = np.argpartition(-values, k - 1)[:k]
+                rows, values = rows[top], values[top]
+            order = np.lexsort((rows, -values))  # skor turun, row naik (deterministik)
+            results.append([(int(rows[j]), float(values[j])) for j in order])
+        return results
+
+    def memory_bytes(self):
+        total = self.idf.nbytes
+        for m in (self.matrix, self._matrix_t):
+            total += m.data.nbytes + m.indices.nbytes + m.indptr.nbytes
+        return total
@@ -0,0 +1,255 @@
+"""
+Product table hasil kompilasi Knowledge Graph.
+
+Graph rdflib di-scan SEKALI saat load lalu dipadatkan jadi tabel kolom:
+string di-intern, RAM & storage disimpan di array integer, dan tiap brand
+punya daftar row sendiri. query() menjawab filter brand / min RAM /
+"Ultra|Pro|Max" dengan scan langsung ke index, tanpa SPARQL engine.
+
+Mode shared (gunicorn --preload, lihat gunicorn_shared.conf.py) memakai
+kolom string flat (FlatStrings) supaya page tabel tetap dibagi antar worker.
+"""
+import gc
+import sys
+import types
+from array import array
+
+# URI namespace ex: (rdflib baru di-import di from_graph, supaya load dari
+# snapshot tidak ikut bayar import rdflib)
+EX = "http://example.org/gadget#"
+
+def brand_key(brand):
+    """Normalisasi brand (ex:hasBrandKey, index brand_rows, filter brand query)"""
+    return brand.strip().lower()
+
+
+# Keyword "HP Konser" (sama dengan regex ?nama "Ultra|Pro|Max" di SPARQL lama)
+CONCERT_KEYWORDS = ("ultra", "pro", "max")
+
+
+class ProductTable:
+    """Tabel produk read-only, satu row per ex:Smartphone"""
+
+    def __init__(self):
+        self.skus = []        # sku bersih (tanpa prefix "sku_")
+        self.models = []      # nama model asli
+        self.processors = []
+        self.ram = array("i")
+        self.storage = array("i")
+        self.is_concert = array("b")
+        self.brand_rows = {}  # brand_key(brand) -> array index row
+
+    def __len__(self):
+        return len(self.skus)
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Compile Graph jadi ProductTable (sekali jalan, O(triples))"""
+        from rdflib import RDF, Namespace
+
+        ex = Namespace(EX)
+        table = cls()
+        props = {
+            ex.hasModel: "model",
+            ex.hasBrand: "brand",
+            ex.hasRAM: "ram",
+            ex.hasProcessor: "processor",
+            ex.hasStorage: "storage",
+        }
+
+        for subject in graph.subjects(RDF.type, ex.Smartphone):
+            values = {}
+            for pred, key in props.items():
+                # SPARQL lama pakai join biasa: kalau ada beberapa nilai,
+                # baris terakhir yang menang. Kita ambil nilai terakhir juga.
+                for obj in graph.objects(subject, pred):
+                    values[key] = obj
+            if len(values) < len(props):
+                continue  # Properti wajib tidak lengkap -> SPARQL juga skip
+
+            try:
+                ram = int(values["ram"])
+                storage = int(values["storage"])
+            except (TypeError, ValueError):
+                continue
+
+            subject_str = str(subject)
+            sku = subject_str.split("#", 1)[1] if "#" in subject_str else ""
+            table.add(
+                sku=sku.replace("sku_", ""),
+                model=str(values["model"]),
+                brand=str(values["brand"]),
+                ram=ram,
+                processor=str(values["processor"]),
+                storage=storage,
+            )
+
+        return table
+
+    @classmethod
+    def from_columns(cls, skus, models, processors, brands, ram, storage, is_concert):
+        """Bangun tabel dari kolom jadi (dipakai kg_snapshot), tanpa hitung ulang"""
+        table = cls()
+        table.skus = skus
+        table.models = models
+        table.processors = processors
+        table.ram = ram
+        table.storage = storage
+        table.is_concert = is_concert
+        for row, brand in enumerate(brands):
+            table.brand_rows.setdefault(sys.intern(brand_key(brand)), array("i")).append(row)
+        return table
+
+    def add(self, sku, model, brand, ram, processor, storage):
+        row = len(self.skus)
+        self.skus.append(sys.intern(sku))
+        self.models.append(sys.intern(model))
+        self.processors.append(sys.intern(processor))
+        self.ram.append(ram)
+        self.storage.append(storage)
+        model_lower = model.lower()
+        self.is_concert.append(any(kw in model_lower for kw in CONCERT_KEYWORDS))
+        self.brand_rows.setdefault(sys.intern(brand_key(brand)), array("i")).append(row)
+
+    def _rows_for_brand(self, brand):
+        """Row untuk brand (case-insensitive, substring seperti regex lama; sama dengan sparql_queries)"""
+        needle = brand_key(brand)
+        matches = [rows for key, rows in self.brand_rows.items() if needle in key]
+        if len(matches) == 1:
+            return matches[0]
+        return sorted(row for rows in matches for row in rows)
+
+    def query(self, brand=None, min_ram=0, feature_concert=False):
+        """Sama dengan query_knowledge_graph versi SPARQL, tapi lewat index"""
+        rows = self._rows_for_brand(brand) if brand else range(len(self.skus))
+        ram = self.ram
+        is_concert = self.is_concert
+
+        candidates = {}
+        for i in rows:
+            if min_ram > 0 and ram[i] < min_ram:
+                continue
+            if feature_concert and not is_concert[i]:
+                continue
+            candidates[self.skus[i]] = {
+                "model": self.models[i],
+                "ram": ram[i],
+                "processor": self.processors[i],
+                "storage": self.storage[i],
+            }
+        return candidates
+
+    def shared(self):
+        """
+        Salinan dengan kolom string flat (SharedProductTable) untuk gunicorn
+        --preload: dibangun sekali di master, worker membaca tanpa menulis
+        refcount per row sehingga page memorinya tetap shared (tidak ter-copy).
+        """
+        table = SharedProductTable()
+        table.skus = FlatStrings(self.skus)
+        table.models = FlatStrings(self.models)
+        table.processors = FlatStrings(self.processors)
+        table.ram = self.ram
+        table.storage = self.storage
+        table.is_concert = self.is_concert
+        table.brand_rows = self.brand_rows
+        return table
+
+    def memory_bytes(self):
+        """Perkiraan memori tabel (kolom + index + string unik)"""
+        return deep_sizeof(self)
+
+
+class SharedProductTable(ProductTable):
+    """ProductTable dengan kolom string FlatStrings; query mengambil string per batch"""
+
+    def add(self, *args, **kwargs):
+        raise TypeError("SharedProductTable read-only, bangun lewat ProductTable.shared()")
+
+    def query(self, brand=None, min_ram=0, feature_concert=False):
+        rows = self._rows_for_brand(brand) if brand else range(len(self.skus))
+        ram = self.ram
+        storage = self.storage
+        is_concert = self.is_concert
+
+        if min_ram > 0 or feature_concert:
+            rows = [i for i in rows
+                    if not (min_ram > 0 and ram[i] < min_ram) and not (feature_concert and not is_concert[i])]
+
+        return {
+            sku: {"model": model, "ram": ram[i], "processor": processor, "storage": storage[i]}
+            for i, sku, model, processor in zip(
+                rows, self.skus.take(rows), self.models.take(rows), self.processors.take(rows))
+        }
+
+
+class FlatStrings:
+    """
+    Kolom string read-only tanpa object str per row: string unik disimpan
+    berurutan dalam satu buffer UTF-8 (dipisah NUL, + offset), tiap row hanya
+    kode string unik-nya (array). Seluruh kolom = 3 object; str dibuat saat
+    dibaca dan jadi milik request, bukan page bersama.
+    """
+    __slots__ = ("_blob", "_offsets", "_codes")
+
+    def __init__(self, values):
+        unique = {}
+        codes = array("i")
+        for value in values:
+            codes.append(unique.setdefault(value, len(unique)))
+        if any("\0" in value for value in unique):
+            raise ValueError("FlatStrings tidak bisa menyimpan karakter NUL")
+        encoded = [value.encode("utf-8") for value in unique]
+        offsets = array("q", [0])
+        for item in encoded:
+            offsets.append(offsets[-1] + len(item) + 1)
+        self._blob = b"\0".join(encoded)
+        self._offsets = offsets
+        self._codes = codes
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __getitem__(self, row):
+        code = self._codes[row]
+        return self._blob[self._offsets[code]:self._offsets[code + 1] - 1].decode("utf-8")
+
+    def __iter__(self):
+        return iter(self.take(range(len(self._codes))))
+
+    def take(self, rows):
+        """List string untuk banyak row sekaligus"""
+        codes = self._codes
+        if len(rows) * 8 >= len(self._offsets):
+            # Banyak row: decode seluruh buffer sekali (C), lebih cepat dari slice per row
+            unique = self._blob.decode("utf-8").split("\0")
+            return [unique[codes[row]] for row in rows]
+        blob, offsets = self._blob, self._offsets
+        decoded = {}
+        values = []
+        for row in rows:
+            code = codes[row]
+            value = decoded.get(code)
+            if value is None:
+                value = decoded[code] = blob[offsets[code]:offsets[code + 1] - 1].decode("utf-8")
+            values.append(value)
+        return values
+
+
+# Object "global" yang tidak dihitung sebagai milik tabel/graph
+_SKIP_SIZEOF = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+
+
+def deep_sizeof(obj):
+    """Total sys.getsizeof seluruh object yang bisa dicapai dari obj"""
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _SKIP_SIZEOF):
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        stack.extend(gc.get_referents(o))
+    return total
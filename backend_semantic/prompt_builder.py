@@ -0,0 +1,152 @@
+"""
+Susun system prompt GadgetBot dari bagian yang sudah jadi + budget token.
+
+Dulu tiap request menyusun ulang seluruh prompt (instruksi format panjang +
+f-string per fakta) dan tidak pernah tahu berapa token yang dikirim. Sekarang:
+
+- bagian statis (pembuka, instruksi format) = konstanta, token-nya dihitung
+  sekali saat import; penutup per kombinasi use-case di-cache
+- baris spek produk dirender SEKALI saat KG load (build_snippets, per
+  kombinasi RAM/storage/processor), request hanya menambah nama model dan
+  harga/toko/tags listing; token bagian yang berulang di-cache
+- assemble() mengisi fakta berurutan ranking select_facts sampai budget
+  token system prompt habis (minimal satu fakta tetap masuk)
+
+Token dihitung dengan estimate_tokens (heuristik BPE, tanpa tokenizer);
+jumlah token asli dari `usage` response Groq dicatat terpisah di metrics
+sebagai pembanding.
+"""
+import re
+from functools import lru_cache
+
+SYSTEM_HEADER = """Kamu adalah GadgetBot, asisten penjualan HP yang cerdas dan ramah.
+Tugasmu adalah menjawab pertanyaan user BERDASARKAN data fakta yang diberikan di bawah ini.
+JANGAN mengarang spesifikasi atau harga sendiri. Gunakan HANYA data yang tersedia.
+
+DATA FAKTA (Dari Knowledge Graph & Database Toko):
+"""
+
+NO_FACTS = "Tidak ditemukan produk yang cocok dengan kriteria dalam database kami.\n"
+
+FORMAT_INSTRUCTIONS = """
+
+INSTRUKSI FORMAT JAWABAN:
+Jawab dengan format yang RAPI dan TERSTRUKTUR seperti contoh berikut:
+
+---
+📱 **[Nama HP]**
+💰 **Harga:** Rp X,XXX,XXX
+⚙️ **Spesifikasi:**
+   • RAM: X GB
+   • Storage: X GB  
+   • Processor: [Nama Processor]
+   • Kamera: [Info Kamera jika ada]
+
+✅ **Kenapa Cocok untuk [Kebutuhan User]:**
+[Jelaskan 2-3 alasan spesifik kenapa HP ini cocok untuk kebutuhan mereka berdasarkan speknya]
+
+🏪 **Tersedia di:** [Nama Toko] ([Kondisi: Baru/Bekas])
+---
+
+ATURAN PENTING:
+1. Gunakan emoji untuk mempercantik tampilan
+2. Jelaskan ALASAN kenapa HP itu cocok untuk kebutuhan user (konser, ojol, gaming, dll)
+3. Maksimal rekomendasikan 3 HP saja, pilih yang paling relevan
+4. Jika tidak ada data, minta maaf dan tawarkan pencarian lain dengan sopan
+5. Selalu sebut toko dan kondisi barang
+6. Format harga pakai titik pemisah ribuan (Rp 12.999.000)
+"""
+
+# Potongan yang mirip cara tokenizer BPE memotong teks: kata (maks ~6 huruf
+# per token), angka per 3 digit, tanda baca / emoji per karakter
+_TOKEN_PIECE = re.compile(r"[^\W\d_]{1,6}|\d{1,3}|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """Estimasi jumlah token (tanpa tokenizer model, cukup untuk budget & metrics)"""
+    return len(_TOKEN_PIECE.findall(text))
+
+
+# Nama model, toko, kondisi, kombinasi tags dan harga berulang terus antar request
+_cached_tokens = lru_cache(maxsize=4096)(estimate_tokens)
+
+HEADER_TOKENS = estimate_tokens(SYSTEM_HEADER)
+NO_FACTS_TOKENS = estimate_tokens(NO_FACTS)
+
+
+@lru_cache(maxsize=256)
+def _footer(use_case_tags):
+    """Penutup prompt (konteks use-case + instruksi format) -> (teks, token)"""
+    context = f"\nKonteks Kebutuhan User: {', '.join(use_case_tags)}" if use_case_tags else ""
+    text = f"\n{context}{FORMAT_INSTRUCTIONS}"
+    return text, estimate_tokens(text)
+
+
+def render_specs(ram, storage, processor):
+    """Baris spek fakta -> (teks, token)"""
+    text = f"RAM {ram}GB, Storage {storage}GB, {processor}"
+    return text, estimate_tokens(text)
+
+
+def build_snippets(product_table):
+    """
+    Render baris spek semua produk sekali saat KG load: {(ram, storage, processor): (teks, token)}.
+    Kombinasi spek jauh lebih sedikit dari jumlah produk, jadi satu potongan dipakai banyak produk.
+    """
+    if product_table is None:
+        return None
+    snippets = {}
+    for key in set(zip(product_table.ram, product_table.storage, product_table.processors)):
+        snippets[key] = render_specs(*key)
+    return snippets
+
+
+# Label emoji per baris fakta (token-nya ikut dihitung per fakta)
+_FACT_LABEL_TOKENS = estimate_tokens("\n1. ****\n   💰 Harga: Rp \n   ⚙️ Spek: \n   🏪 Toko:  ()\n   🏷️ Tags: \n")
+
+
+def render_fact(number, fact, snippets=None):
+    """Satu fakta bernomor -> (teks, token); baris spek dari snippets kalau ada"""
+    specs = fact["specs"]
+    key = (specs["ram"], specs["storage"], specs["processor"])
+    snippet = snippets.get(key) if snippets is not None else None
+    if snippet is None:
+        snippet = render_specs(*key)
+    spec, spec_tokens = snippet
+    model = fact["model"]
+    price = f"{fact['price']:,.0f}"
+    listing = f"{fact['store']} ({fact['condition']})"
+    tags = ", ".join(fact.get("tags") or [])
+    text = f"""
+{number}. **{model}**
+   💰 Harga: Rp {price}
+   ⚙️ Spek: {spec}
+   🏪 Toko: {listing}
+   🏷️ Tags: {tags}
+"""
+    tokens = (_FACT_LABEL_TOKENS + spec_tokens + _cached_tokens(model) + _cached_tokens(price)
+              + _cached_tokens(listing) + _cached_tokens(tags))
+    return text, tokens
+
+
+def assemble(selected_facts, use_case_tags=None, snippets=None, budget=None):
+    """
+    System prompt dari fakta urut ranking, dipotong di budget token.
+    Return (prompt, fakta_yang_masuk, estimasi_token).
+    """
+    footer, footer_tokens = _footer(tuple(use_case_tags or ()))
+    parts = [SYSTEM_HEADER]
+    tokens = HEADER_TOKENS + footer_tokens
+    used = []
+    for fact in selected_facts:
+        text, fact_tokens = render_fact(len(used) + 1, fact, snippets)
+        if used and budget is not None and tokens + fact_tokens > budget:
+            break
+        parts.append(text)
+        tokens += fact_tokens
+        used.append(fact)
+    if not used:
+        parts.append(NO_FACTS)
+        tokens += NO_FACTS_TOKENS
+    parts.append(footer)
+    return "".join(parts), used, tokens
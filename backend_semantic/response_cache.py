@@ -0,0 +1,102 @@
+"""
+Cache jawaban LLM (LRU + TTL) di depan call_groq_llm.
+
+Pertanyaan yang hampir sama ("hp gaming 5 juta", "hp ojol murah") tidak perlu
+round trip ke Groq lagi. Key cache = intent yang sudah dinormalisasi + sidik
+jari fakta yang dikirim ke LLM, jadi kalau harga/stok berubah key ikut berubah
+dan entry lama otomatis tidak terpakai (lalu tergusur LRU/TTL).
+"""
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def facts_fingerprint(facts):
+    """Hash stabil dari fakta yang dipilih (model, harga, toko, spek, tags)"""
+    payload = json.dumps(facts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def make_key(intent, selected_facts, model_keywords=()):
+    """Key cache dari intent ter-parse + fakta yang akan masuk prompt"""
+    normalized = {
+        "brand": intent.get("brand"),
+        "min_ram": intent.get("min_ram", 0),
+        "budget": intent.get("budget", 0),
+        "is_concert": intent.get("is_concert", False),
+        "is_gaming": intent.get("is_gaming", False),
+        "is_affordable": intent.get("is_affordable", False),
+        "use_case_tags": sorted(intent.get("use_case_tags", [])),
+        "model_keywords": sorted(set(model_keywords)),
+        "facts": facts_fingerprint(selected_facts),
+    }
+    return facts_fingerprint(normalized)
+
+
+class ResponseCache:
+    """LRU + TTL thread-safe. max_entries=0 berarti cache mati."""
+
+    def __init__(self, max_entries=512, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # key -> (expires_at, value, size_bytes)
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "sets": 0}
+
+    def get(self, key):
+        if self.max_entries <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, value, size = entry
+            if expires_at <= now:
+                del self._data[key]
+                self._bytes -= size
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key, value):
+        if self.max_entries <= 0:
+            return
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (time.monotonic() + self.ttl, value, size)
+            self._bytes += size
+            self._stats["sets"] += 1
+            while len(self._data) > self.max_entries:
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "memory_bytes": self._bytes,
+            })
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,97 @@
+"""
+Memori percakapan per session_id untuk pertanyaan lanjutan di /chat.
+
+Tanpa session, "yang lebih murah?" atau "kalau yang 256GB?" diproses sebagai
+pertanyaan baru (tanpa brand / use-case) dan sering tidak ketemu apa-apa.
+Dengan session_id, tiap giliran menyimpan pertanyaan, intent retrieval
+(budget / min_ram yang dipakai query KG + listing), fakta hasil retrieval dan
+harga fakta yang ditampilkan. Fakta itu BUKAN semua listing: collect_facts
+berhenti di prefix termurah begitu fakta cukup. Karena prefix urut harga,
+menyaring prefix tetap memberi fakta termurah yang lolos constraint, asal:
+
+- constraint gabungan tidak lebih longgar dari intent retrieval (narrows):
+  budget lebih tinggi / min_ram lebih rendah / "lebih mahal" butuh listing
+  yang memang tidak pernah diambil
+- hasil saringan tidak kosong
+
+Kalau tidak, pertanyaan sesi di-retrieve ulang dengan constraint gabungan
+(lihat app.plan_session_turn). Pesan dengan brand atau use-case sendiri
+bukan follow-up: diproses sebagai pertanyaan baru dan mengganti sesi.
+
+Store-nya LRU + TTL (ResponseCache): jumlah session dibatasi, session yang
+tidak dipakai selama TTL hilang sendiri. Per proses, seperti response cache:
+dengan gunicorn -w N follow-up yang jatuh ke worker lain diproses sebagai
+pertanyaan baru (lihat app.get_session_data).
+"""
+from collections import namedtuple
+from statistics import median
+
+from response_cache import ResponseCache
+
+# intent: intent retrieval fakta (parse_intent + constraint gabungan, lihat narrows)
+# constraints: filter kumulatif dari follow-up (storage, min_ram, budget)
+# shown: harga fakta yang ditampilkan di giliran terakhir (acuan "lebih murah/mahal")
+Session = namedtuple("Session", ["query", "intent", "facts", "constraints", "shown"])
+
+# Batas harga dari "lebih murah/mahal" relatif ke giliran terakhir, tidak ikut disimpan
+PRICE_BOUNDS = ("max_price", "min_price")
+
+
+class SessionStore(ResponseCache):
+    """ResponseCache berisi Session per session_id (LRU + TTL, thread-safe)"""
+
+    def __init__(self, max_entries=10000, ttl=1800):
+        super().__init__(max_entries=max_entries, ttl=ttl)
+
+
+def merge_constraints(constraints, refinement, shown):
+    """Constraint sesi + refinement baru (intent_parser.parse_refinement) untuk giliran ini"""
+    merged = {key: value for key, value in constraints.items() if key not in PRICE_BOUNDS}
+    for key in ("storage", "min_ram", "budget"):
+        if key in refinement:
+            merged[key] = refinement[key]
+    # shown = prefix termurah, jadi "lebih murah" = di bawah median yang ditampilkan
+    # (di bawah min(shown) selalu kosong); "lebih mahal" = di atas semua yang
+    # ditampilkan, budget lama tidak berlaku lagi
+    if refinement.get("cheaper") and shown:
+        merged["max_price"] = median(shown)
+    elif refinement.get("pricier") and shown:
+        merged["min_price"] = max(shown)
+        merged["budget"] = 0
+    return merged
+
+
+def narrows(constraints, intent):
+    """True kalau constraint gabungan minimal seketat intent retrieval fakta sesi"""
+    budget = constraints.get("budget", intent["budget"])
+    if intent["budget"] > 0 and (budget == 0 or budget > intent["budget"]):
+        return False
+    return constraints.get("min_ram", intent["min_ram"]) >= intent["min_ram"]
+
+
+def refine_facts(facts, constraints):
+    """Fakta yang lolos semua constraint (urutan harga tetap)"""
+    if not constraints:
+        return list(facts)
+    storage = constraints.get("storage")
+    min_ram = constraints.get("min_ram", 0)
+    budget = constraints.get("budget", 0)
+    max_price = constraints.get("max_price")
+    min_price = constraints.get("min_price")
+    refined = []
+    for fact in facts:
+        specs = fact["specs"]
+        price = fact["price"]
+        if storage is not None and specs["storage"] != storage:
+            continue
+        if specs["ram"] < min_ram:
+            continue
+        # Toleransi budget sama dengan query listing (budget * 1.2)
+        if budget > 0 and price > budget * 1.2:
+            continue
+        if max_price is not None and price >= max_price:
+            continue
+        if min_price is not None and price <= min_price:
+            continue
+        refined.append(fact)
+    return refined
@@ -0,0 +1,119 @@
+"""
+Single-flight: request bersamaan dengan key sama menunggu SATU eksekusi.
+
+Saat link promo tersebar, puluhan user mengirim pertanyaan yang sama dalam
+hitungan detik. Tanpa ini tiap request menjalankan query Postgres, scan KG
+dan panggilan Groq sendiri-sendiri secara paralel, padahal hasilnya sama.
+Dengan single-flight, request pertama (leader) mengeksekusi, request lain
+dengan key sama yang datang selama leader masih berjalan (follower) menunggu
+lalu memakai hasil / exception yang sama. Setelah selesai key dilepas:
+ini bukan cache (hasil lama tidak disimpan, lihat response_cache.py).
+
+- SingleFlight: mode threaded (Flask / gunicorn gthread, juga fungsi sync
+  yang dipanggil lewat asyncio.to_thread)
+- AsyncSingleFlight: mode async (app_async.py), satu event loop per proses
+
+Hasil dipakai bersama antar request, jadi pemanggil tidak boleh mengubahnya.
+Per proses: dengan gunicorn -w N, coalescing terjadi di dalam tiap worker.
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalescing thread-safe; counter (metrics.Counter berlabel) opsional diisi nama + jumlah follower"""
+
+    def __init__(self, name, counter=None):
+        self.name = name
+        self.counter = counter
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """fn(*args, **kwargs) sekali untuk semua pemanggil dengan key sama yang sedang menunggu"""
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            if self.counter is not None:
+                self.counter.inc(self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self._stats["executions"] += 1
+                if call.error is not None:
+                    self._stats["errors"] += 1
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        return stats
+
+
+class AsyncSingleFlight:
+    """
+    Versi asyncio. Eksekusi jalan sebagai task sendiri (di-shield), jadi kalau
+    request leader dibatalkan (client putus) follower tetap dapat hasilnya.
+    """
+
+    def __init__(self, name, counter=None):
+        self.name = name
+        self.counter = counter
+        self._tasks = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    async def do(self, key, fn, *args, **kwargs):
+        """await fn(*args, **kwargs) sekali untuk semua pemanggil dengan key sama yang sedang menunggu"""
+        self._stats["calls"] += 1
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self._stats["coalesced"] += 1
+            if self.counter is not None:
+                self.counter.inc(self.name)
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        self._stats["executions"] += 1
+        # exception() juga menandai exception sudah diambil (tidak ada warning kalau semua pemanggil batal)
+        if task.cancelled() or task.exception() is not None:
+            self._stats["errors"] += 1
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats["in_flight"] = len(self._tasks)
+        return stats
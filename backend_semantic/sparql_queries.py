@@ -0,0 +1,93 @@
+"""
+Query SPARQL yang sudah di-prepare (parse + algebra sekali saja).
+
+Dulu query_knowledge_graph menyusun teks SPARQL pakai f-string, jadi rdflib
+harus parse & algebrize ulang tiap request dan input user masuk langsung ke
+teks query. Sekarang hanya ada beberapa "bentuk" query yang di-prepare sekali
+lalu dijalankan dengan initBindings.
+
+Filter brand case-insensitive memakai literal yang sudah dinormalisasi
+(ex:hasBrandKey = brand_key), bukan regex. Tetap substring (CONTAINS) seperti
+regex lama dan ProductTable._rows_for_brand, jadi fallback SPARQL dan product
+table mengembalikan kandidat yang sama.
+"""
+from rdflib import Literal, Namespace
+from rdflib.namespace import XSD
+from rdflib.plugins.sparql import prepareQuery
+
+from product_table import brand_key
+
+EX = Namespace("http://example.org/gadget#")
+
+_SELECT = """
+SELECT ?sku ?nama ?ram ?prosesor ?storage
+WHERE {{
+    ?hp a ex:Smartphone ;
+        ex:hasModel ?nama ;
+        ex:hasBrand ?brand ;
+        ex:hasRAM ?ram ;
+        ex:hasProcessor ?prosesor ;
+        ex:hasStorage ?storage .
+    {brand_pattern}
+    BIND(STRAFTER(STR(?hp), "#") AS ?sku)
+    FILTER (?ram >= ?minRam)
+    {concert_filter}
+}}
+"""
+
+# Cache query yang sudah di-compile, key = (filter_brand, filter_konser)
+_prepared = {}
+
+
+def add_brand_keys(graph):
+    """Tambah ex:hasBrandKey untuk Graph lama yang belum punya (dari TTL lama)"""
+    added = 0
+    for subject, brand in graph.subject_objects(EX.hasBrand):
+        if (subject, EX.hasBrandKey, None) not in graph:
+            graph.add((subject, EX.hasBrandKey, Literal(brand_key(str(brand)))))
+            added += 1
+    return added
+
+
+def query_text(filter_brand, filter_concert):
+    """Teks SPARQL untuk satu bentuk query (tanpa nilai dari user)"""
+    return _SELECT.format(
+        brand_pattern="?hp ex:hasBrandKey ?key . FILTER (CONTAINS(?key, ?brandKey))" if filter_brand else "",
+        # Konser: nama ada "Ultra" / "Pro" / "Max" (pola konstan, bukan input user)
+        concert_filter='FILTER (regex(?nama, "Ultra|Pro|Max", "i"))' if filter_concert else "",
+    )
+
+
+def get_prepared(filter_brand, filter_concert):
+    shape = (bool(filter_brand), bool(filter_concert))
+    query = _prepared.get(shape)
+    if query is None:
+        query = prepareQuery(query_text(*shape), initNs={"ex": EX})
+        _prepared[shape] = query
+    return query
+
+
+def prepare_all():
+    """Compile semua bentuk query di depan (dipanggil saat load)"""
+    for filter_brand in (False, True):
+        for filter_concert in (False, True):
+            get_prepared(filter_brand, filter_concert)
+
+
+def query_candidates(graph, brand=None, min_ram=0, feature_concert=False):
+    """Jalankan query prepared, hasil sama formatnya dengan query_knowledge_graph"""
+    query = get_prepared(brand, feature_concert)
+    bindings = {"minRam": Literal(int(min_ram), datatype=XSD.integer)}
+    if brand:
+        bindings["brandKey"] = Literal(brand_key(brand))
+
+    candidates = {}
+    for row in graph.query(query, initBindings=bindings):
+        clean_sku = str(row.sku).replace("sku_", "")
+        candidates[clean_sku] = {
+            "model": str(row.nama),
+            "ram": int(row.ram),
+            "processor": str(row.prosesor),
+            "storage": int(row.storage)
+        }
+    return candidates
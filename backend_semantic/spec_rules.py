@@ -0,0 +1,268 @@
+"""
+Rule engine untuk estimasi spek dari judul listing / nama model.
+
+Dulu estimate_processor, estimate_camera, estimate_telephoto,
+estimate_refresh_rate, estimate_brand dan estimate_ram_storage berupa if-chain
+panjang yang tersebar di migrate_add_specs.py, migrate_complete_specs.py dan
+generate_rdf_postgres.py. Sekarang semuanya tabel deklaratif di bawah:
+tiap tabel = daftar (pola, nilai) berurutan, pola pertama yang match menang.
+
+Semua keyword dari semua tabel di-compile jadi SATU regex trie (mesin yang
+sama dengan intent_parser), jadi judul cukup di-scan sekali dan derive()
+mengembalikan semua atribut sekaligus.
+
+Matching sama dengan if-chain lama: substring dari judul lowercase. Pola tuple
+artinya semua bagian harus muncul. Tabel brand diambil dari
+intent_parser.BRAND_ALIASES (spasi = batas kata, lihat docstring di sana).
+"""
+import re
+
+from intent_parser import BRAND_ALIASES, trie_regex, overlap_partners
+
+# --- TABEL RULE ---
+
+PROCESSOR_RULES = [
+    (["s24 ultra"], "Snapdragon 8 Gen 3"),
+    (["s24"], "Exynos 2400"),
+    (["s23 ultra"], "Snapdragon 8 Gen 2"),
+    (["s23"], "Snapdragon 8 Gen 2"),
+    (["iphone 17"], "A19 Pro"),
+    (["iphone 16 pro"], "A18 Pro"),
+    (["iphone 16"], "A18"),
+    (["iphone 15 pro"], "A17 Pro"),
+    (["iphone 15"], "A16 Bionic"),
+    (["iphone 14"], "A15 Bionic"),
+    (["iphone 13"], "A15 Bionic"),
+    (["pixel 9"], "Tensor G4"),
+    (["pixel 8"], "Tensor G3"),
+    (["poco f5"], "Snapdragon 7+ Gen 2"),
+    (["poco"], "MediaTek Dimensity"),
+    (["redmi note 14"], "MediaTek Dimensity 7025"),
+    (["redmi"], "MediaTek Helio"),
+    (["realme gt"], "Snapdragon 8 Gen 4"),
+    (["realme 14 pro"], "MediaTek Dimensity 7300"),
+    (["realme"], "MediaTek Helio G99"),
+    (["infinix gt"], "MediaTek Dimensity 8200"),
+    (["infinix"], "MediaTek Helio G88"),
+    (["tecno camon"], "MediaTek Dimensity 8020"),
+    (["tecno"], "MediaTek Helio G85"),
+    (["itel"], "Unisoc SC9863A"),
+    (["vivo x100"], "MediaTek Dimensity 9300"),
+    (["vivo v"], "Snapdragon 7 Gen 3"),
+    (["vivo"], "MediaTek Dimensity"),
+    (["oppo find x"], "MediaTek Dimensity 9400"),
+    (["oppo reno"], "MediaTek Dimensity 8100"),
+    (["oppo"], "Snapdragon 680"),
+    (["nothing phone"], "Snapdragon 8+ Gen 1"),
+    (["nothing"], "N/A (Aksesori)"),
+    (["galaxy z flip"], "Snapdragon 8 Gen 3"),
+    (["galaxy z fold"], "Snapdragon 8 Gen 3"),
+    (["galaxy a"], "MediaTek Helio G99"),
+    (["samsung", "galaxy"], "Exynos / Snapdragon"),
+    (["macbook m4"], "Apple M4 Pro"),
+    (["macbook m2"], "Apple M2"),
+    (["macbook m1"], "Apple M1"),
+    (["ipad"], "Apple M-Series"),
+    (["nintendo switch"], "NVIDIA Tegra X1+"),
+    (["playstation"], "AMD Zen 2 + RDNA 2"),
+    (["steam deck"], "AMD Zen 2 APU"),
+    (["rog ally"], "AMD Ryzen Z1 Extreme"),
+    (["legion go"], "AMD Ryzen Z1 Extreme"),
+    (["xperia"], "Snapdragon 8 Gen 2"),
+]
+
+CAMERA_RULES = [
+    (["s24 ultra", "s23 ultra"], 200),
+    (["s24", "s23"], 50),
+    (["iphone 16 pro", "iphone 15 pro"], 48),
+    (["iphone"], 12),
+    (["pixel 9 pro"], 50),
+    (["pixel"], 50),
+    (["200mp"], 200),
+    (["108mp"], 108),
+    (["64mp"], 64),
+    (["50mp"], 50),
+    (["pro", "ultra"], 108),
+    (["poco"], 64),
+    (["redmi note"], 108),
+    (["redmi"], 50),
+    (["vivo x100"], 50),      # Zeiss
+    (["oppo find"], 50),      # Hasselblad
+    (["realme gt"], 50),
+    (["nothing phone"], 50),
+    (["ipad", "macbook"], 12),
+    (["ear", "buds", "watch"], 0),  # Aksesori
+]
+
+# Flagship biasanya punya telephoto
+TELEPHOTO_RULES = [
+    (["ultra", "pro max", "pro+", "s24", "s23", "s22", "find x", "x100", "pixel 9 pro",
+      "iphone 15 pro", "iphone 16 pro", "iphone 17 pro",
+      "note 14 pro", "poco f5", "poco f6", "realme gt"], True),
+]
+
+REFRESH_RATE_RULES = [
+    # Flagship biasanya 120Hz
+    (["ultra", "pro", "gaming", "rog", "poco f", "realme gt", "s24", "s23", "iphone 16", "iphone 15",
+      "pixel 9", "pixel 8", "nothing phone", "z flip", "z fold"], 120),
+    # Mid-range biasanya 90Hz
+    (["redmi note", "poco m", "realme", "infinix note", "tecno camon", "vivo v", "oppo reno"], 90),
+]
+
+# Seri gaming (syarat tag "Gaming" di suitable_for)
+GAMING_SERIES_RULES = [
+    (["gaming", "rog", "poco f", "realme gt", "ultra"], True),
+]
+
+# Tag "Pro Camera" di fakta RAG (app.py)
+PRO_CAMERA_RULES = [
+    (["ultra", "pro"], True),
+]
+
+# Atribut -> (rules, default kalau tidak ada yang match)
+SPEC_TABLES = {
+    "brand": ([(aliases, brand) for brand, aliases in BRAND_ALIASES], "Unknown"),
+    "processor": (PROCESSOR_RULES, "Unknown"),
+    "camera_mp": (CAMERA_RULES, 48),
+    "telephoto": (TELEPHOTO_RULES, False),
+    "refresh_rate": (REFRESH_RATE_RULES, 60),
+    "gaming_series": (GAMING_SERIES_RULES, False),
+    "pro_camera": (PRO_CAMERA_RULES, False),
+}
+
+# RAM & storage dari pola angka ("8/256", "8GB", "256GB")
+RAM_PATTERN = re.compile(r'(\d+)\s*(?:gb|/)\s*')
+STORAGE_PATTERN = re.compile(r'(?:/|)(\d+)\s*gb')
+DEFAULT_RAM = 8
+DEFAULT_STORAGE = 128
+
+
+# --- COMPILE ---
+
+def compile_matcher():
+    """Compile semua tabel jadi satu regex + aksi per keyword"""
+    names = list(SPEC_TABLES)
+    keywords = set()
+    single = [{} for _ in names]  # per tabel: keyword -> index rule pertama
+    combos = []                   # (tabel, rule, set keyword) untuk pola tuple
+    values = []
+    for t, name in enumerate(names):
+        rules, default = SPEC_TABLES[name]
+        for r, (patterns, _) in enumerate(rules):
+            for pattern in patterns:
+                if isinstance(pattern, tuple):
+                    keywords.update(pattern)
+                    combos.append((t, r, frozenset(pattern)))
+                else:
+                    keywords.add(pattern)
+                    single[t].setdefault(pattern, r)
+        # Index len(rules) = tidak ada yang match -> default
+        values.append([value for _, value in rules] + [default])
+
+    partners = overlap_partners(keywords)
+
+    # Keyword terpanjang dari regex juga "memuat" keyword yang jadi
+    # substring-nya; rule terbaik per tabel dihitung di sini sekali
+    actions = {}
+    for kw in keywords:
+        implied = frozenset(k for k in keywords if k in kw)
+        hits = []
+        for t in range(len(names)):
+            ranks = [single[t][k] for k in implied if k in single[t]]
+            if ranks:
+                hits.append((t, min(ranks)))
+        actions[kw] = (implied, tuple(hits), tuple(partners.get(kw, ())))
+
+    return {
+        "pattern": re.compile(trie_regex(keywords)),
+        "actions": actions,
+        "combos": combos,
+        "names": names,
+        "values": values,
+        "no_match": [len(v) - 1 for v in values],
+    }
+
+
+_MATCHER = compile_matcher()
+
+
+def derive(title):
+    """Semua atribut hasil estimasi dari satu judul (satu kali scan)"""
+    m = (title or "").lower()
+    text = f" {m} "
+    actions = _MATCHER["actions"]
+    best = list(_MATCHER["no_match"])
+    found = set()
+    recheck = []
+
+    for kw in _MATCHER["pattern"].findall(text):
+        implied, hits, partners = actions[kw]
+        found |= implied
+        for t, r in hits:
+            if r < best[t]:
+                best[t] = r
+        if partners:
+            recheck.extend(partners)
+
+    for kw in recheck:
+        if kw not in found and kw in text:
+            implied, hits, _ = actions[kw]
+            found |= implied
+            for t, r in hits:
+                if r < best[t]:
+                    best[t] = r
+
+    for t, r, combo in _MATCHER["combos"]:
+        if r < best[t] and combo <= found:
+            best[t] = r
+
+    specs = {name: values[r] for name, values, r in zip(_MATCHER["names"], _MATCHER["values"], best)}
+    specs["ram"], specs["storage"] = _ram_storage(m)
+    return specs
+
+
+def _ram_storage(m):
+    ram = DEFAULT_RAM
+    storage = DEFAULT_STORAGE
+    ram_match = RAM_PATTERN.search(m)
+    if ram_match:
+        val = int(ram_match.group(1))
+        if val < 64:
+            ram = val
+    storage_match = STORAGE_PATTERN.search(m)
+    if storage_match:
+        val = int(storage_match.group(1))
+        if val > 16:
+            storage = val
+    return ram, storage
+
+
+def suitable_for(specs, price, battery=5000):
+    """Semantic tags berdasarkan kombinasi spek (hasil derive) + harga"""
+    tags = []
+
+    # OJOL: Baterai besar (>=5000) + Murah (<3jt)
+    if battery >= 5000 and price < 3000000:
+        tags.append("Ojol")
+
+    # CONCERT PHOTOGRAPHY: Punya Telephoto
+    if specs["telephoto"]:
+        tags.append("ConcertPhotography")
+
+    # GAMING: Refresh Rate tinggi + seri gaming (dari nama)
+    if specs["refresh_rate"] >= 120 and specs["gaming_series"]:
+        tags.append("Gaming")
+
+    # ELDERLY: Murah + Entry level
+    if price < 2500000:
+        tags.append("Elderly")
+
+    # STUDENT: Budget friendly
+    if 2000000 <= price <= 5000000:
+        tags.append("Student")
+
+    # PROFESSIONAL: Flagship
+    if price > 15000000:
+        tags.append("Professional")
+
+    return tags
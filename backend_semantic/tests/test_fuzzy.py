@@ -0,0 +1,54 @@
+"""
+Pencarian model fuzzy (ngram_index.py + app.fuzzy_matches) di KG bawaan
+knowledge_base.ttl: contoh typo / singkatan harus ketemu model yang dimaksud.
+
+Jalankan dari folder backend_semantic:
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("KG_RELOAD_INTERVAL", "0")
+
+import ngram_index  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not ngram_index.AVAILABLE, reason="butuh requirements-vector.txt")
+
+
+@pytest.fixture(scope="module")
+def app():
+    import app
+    return app
+
+
+def top_model(app, user_query):
+    """Nama model KG teratas hasil fuzzy (semua model jadi kandidat), None kalau tidak ada"""
+    table = app.kg.product_table
+    matches = app.fuzzy_matches([user_query], [set(table.skus)])[0]
+    if not matches:
+        return None
+    return table.models[table.skus.index(matches[0][0])]
+
+
+@pytest.mark.parametrize("user_query, expected", [
+    ("ip 15 promax", "iPhone 15 "),
+    ("iphone 15 pro max", "iPhone 15 "),
+    ("hp ip 15 buat kuliah", "iPhone 15 "),
+    # KG bawaan tidak punya A55: model terdekat = A56 (seri yang sama)
+    ("samsong a55", "Samsung Galaxy A56 "),
+    ("samsung galaxy s24", "Samsung Galaxy S24 "),
+    ("xiaomi redmi nte 14", "Xiaomi Redmi Note 14 "),
+    ("poco x6 pro", "POCO X8 Pro "),
+    ("vivo v35", "Vivo V35 "),
+])
+def test_typo_resolves_to_model(app, user_query, expected):
+    assert (top_model(app, user_query) or "").startswith(expected)
+
+
+@pytest.mark.parametrize("user_query", ["mantap jiwa", "tahan lama", "yang penting awet"])
+def test_unrelated_text_has_no_match(app, user_query):
+    assert top_model(app, user_query) is None
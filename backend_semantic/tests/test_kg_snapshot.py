@@ -0,0 +1,64 @@
+"""
+Snapshot KG rusak harus fallback ke Turtle, bukan crash saat import app.
+
+Jalankan dari folder backend_semantic:
+    python -m pytest -q tests
+"""
+import json
+import os
+import shutil
+import struct
+import sys
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import kg_loader  # noqa: E402
+import kg_snapshot  # noqa: E402
+
+
+@pytest.fixture
+def kg_files(tmp_path):
+    """knowledge_base.ttl repo + snapshot valid di folder sementara"""
+    ttl_path = str(tmp_path / "knowledge_base.ttl")
+    snapshot_path = str(tmp_path / "knowledge_base.kgsnap")
+    shutil.copy(os.path.join(BASE_DIR, "knowledge_base.ttl"), ttl_path)
+    kg = kg_loader.load_knowledge_graph(ttl_path, snapshot_path)
+    kg_snapshot.write_snapshot(kg.product_table, snapshot_path, source_path=ttl_path)
+    return ttl_path, snapshot_path
+
+
+def meta_snapshot(meta):
+    """Header valid + meta JSON tertentu (tanpa kolom)"""
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    return kg_snapshot.MAGIC + struct.pack("<II", kg_snapshot.VERSION, len(meta_bytes)) + meta_bytes
+
+
+def test_valid_snapshot_is_used(kg_files):
+    ttl_path, snapshot_path = kg_files
+    assert kg_loader.load_knowledge_graph(ttl_path, snapshot_path).source == "snapshot"
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: data[:8],                                # terpotong di dalam header
+    lambda data: data[:20],                               # terpotong di dalam meta
+    lambda data: data[:12] + b"\xff\xfe garbage" * 64,    # meta bukan UTF-8 / JSON
+    lambda data: kg_snapshot.MAGIC + os.urandom(256),     # sisa file acak
+    lambda data: data[:-10],                              # kolom terpotong
+    lambda data: meta_snapshot({"byteorder": sys.byteorder}),  # meta tanpa "rows"
+    lambda data: meta_snapshot([1, 2, 3]),                # meta bukan object
+])
+def test_damaged_snapshot_falls_back_to_turtle(kg_files, damage):
+    ttl_path, snapshot_path = kg_files
+    with open(snapshot_path, "rb") as f:
+        data = f.read()
+    with open(snapshot_path, "wb") as f:
+        f.write(damage(data))
+
+    with pytest.raises(kg_snapshot.SnapshotError):
+        kg_snapshot.load_snapshot(snapshot_path)
+    kg = kg_loader.load_knowledge_graph(ttl_path, snapshot_path)
+    assert kg.source == "turtle"
+    assert len(kg.product_table) > 0
@@ -0,0 +1,84 @@
+"""
+Follow-up dalam session (app.plan_session_turn): pesan yang hanya menyempitkan
+jawaban sebelumnya memakai memori sesi / pertanyaan sesi + constraint, pesan
+dengan brand atau use-case sendiri diproses sebagai pertanyaan baru.
+
+Tanpa database: sesi diisi langsung ke app.session_store.
+
+Jalankan dari folder backend_semantic:
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("KG_RELOAD_INTERVAL", "0")
+
+from session_store import Session  # noqa: E402
+
+SESSION_QUERY = "samsung galaxy 10 juta"
+
+
+def fact(model, price, ram=8, storage=256):
+    return {"model": model, "price": price, "specs": {"ram": ram, "storage": storage}}
+
+
+@pytest.fixture(scope="module")
+def app():
+    import app
+    return app
+
+
+@pytest.fixture
+def session_id(app):
+    """Sesi "samsung galaxy 10 juta" dengan fakta termurah yang sudah ditampilkan"""
+    facts = [fact("Samsung Galaxy A16", 2_500_000, ram=6, storage=128),
+             fact("Samsung Galaxy A36", 4_500_000),
+             fact("Samsung Galaxy A56", 6_000_000),
+             fact("Samsung Galaxy S24", 9_500_000, storage=512)]
+    intent = app.apply_constraints(app.parse_intent(SESSION_QUERY), {})
+    shown = tuple(f["price"] for f in facts)
+    app.session_store.set("test-session", Session(SESSION_QUERY, intent, facts, {}, shown))
+    yield "test-session"
+    app.session_store.clear()
+
+
+@pytest.mark.parametrize("message", ["hp ojol 3 juta", "buat gaming", "iphone 15", "laptop 10 juta"])
+def test_standalone_message_is_new_question(app, session_id, message):
+    served, query, constraints = app.plan_session_turn(message, session_id)
+    assert served is None
+    assert query == message
+    assert constraints == {}
+
+
+def test_cheaper_is_served_from_session(app, session_id):
+    served, query, constraints = app.plan_session_turn("yang lebih murah?", session_id)
+    facts, _ = served
+    # Di bawah median harga yang ditampilkan (5.25 juta)
+    assert [f["model"] for f in facts] == ["Samsung Galaxy A16", "Samsung Galaxy A36"]
+    assert query == SESSION_QUERY
+
+
+@pytest.mark.parametrize("message, delta", [
+    ("kalau di bawah 12 juta?", {"budget": 12_000_000}),  # budget naik: fakta sesi tidak cukup
+    ("yang lebih mahal", {"budget": 0, "min_price": 9_500_000}),
+])
+def test_follow_up_retrieves_session_query_with_constraints(app, session_id, message, delta):
+    served, query, constraints = app.plan_session_turn(message, session_id)
+    assert served is None
+    # Teks follow-up tidak digabung ke query, hanya constraint-nya
+    assert query == SESSION_QUERY
+    assert constraints == delta
+    intent = app.apply_constraints(app.parse_intent(query), constraints)
+    assert intent["brand"] == "Samsung"
+    assert intent["budget"] == delta["budget"]
+
+
+def test_storage_follow_up_filters_session_facts(app, session_id):
+    served, query, constraints = app.plan_session_turn("kalau yang 512gb?", session_id)
+    facts, _ = served
+    assert [f["model"] for f in facts] == ["Samsung Galaxy S24"]
+    assert constraints == {"storage": 512}